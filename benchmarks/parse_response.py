@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+import json
+import statistics
+import time
+from typing import List
+
+from x10.perpetual.orders import OpenOrderModel, PlacedOrderModel
+from x10.utils.http import WrappedApiResponse, parse_response_to_model
+
+ITERATIONS = 20
+CALLS_PER_ITERATION = 2_000
+ORDERS_PER_RESPONSE = 10
+
+PLACED_ORDER_RESPONSE_TEXT = json.dumps(
+    {"status": "OK", "data": {"id": 1775511783722512384, "externalId": "order-0"}}
+)
+OPEN_ORDERS_RESPONSE_TEXT = json.dumps(
+    {
+        "status": "OK",
+        "data": [
+            {
+                "id": 1775511783722512384 + i,
+                "accountId": 3017,
+                "externalId": f"order-{i}",
+                "market": "BTC-USD",
+                "type": "LIMIT",
+                "side": "BUY",
+                "status": "NEW",
+                "price": "39000.00",
+                "averagePrice": "0",
+                "qty": "0.2",
+                "filledQty": "0",
+                "reduceOnly": False,
+                "postOnly": False,
+                "payedFee": "0",
+                "createdTime": 1712006093018,
+                "updatedTime": 1712006093018,
+                "expiryTime": 1712610893018,
+            }
+            for i in range(ORDERS_PER_RESPONSE)
+        ],
+    }
+)
+
+
+def parse_uncached(response_text: str, model_class):
+    # The pre-registry implementation: parametrizes the generic model on every call
+    return WrappedApiResponse[model_class].model_validate_json(response_text)
+
+
+def parse_cached(response_text: str, model_class):
+    return parse_response_to_model(response_text, model_class)
+
+
+def measure(parse, response_text: str, model_class) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS_PER_ITERATION):
+        parse(response_text, model_class)
+    end = time.perf_counter()
+    return (end - start) / CALLS_PER_ITERATION * 1_000_000
+
+
+def compare(title: str, response_text: str, model_class):
+    # Build the validators once, so the first iteration isn't skewed
+    parse_uncached(response_text, model_class)
+    parse_cached(response_text, model_class)
+
+    # Interleave the runs, so that both paths see the same machine conditions
+    uncached = []
+    cached = []
+    for _ in range(ITERATIONS):
+        uncached.append(measure(parse_uncached, response_text, model_class))
+        cached.append(measure(parse_cached, response_text, model_class))
+
+    uncached_avg = statistics.mean(uncached)
+    cached_avg = statistics.mean(cached)
+    improvement = ((uncached_avg - cached_avg) / uncached_avg) * 100
+
+    print(f"=== {title} ===")
+    print("WrappedApiResponse[T].model_validate_json:")
+    print(f"  Average: {uncached_avg:.2f}us")
+    print(f"  Min:     {min(uncached):.2f}us")
+    print("Cached TypeAdapter:")
+    print(f"  Average: {cached_avg:.2f}us")
+    print(f"  Min:     {min(cached):.2f}us")
+    print(f"Performance improvement: {improvement:.2f}%\n")
+
+
+def main():
+    compare("PlacedOrderModel", PLACED_ORDER_RESPONSE_TEXT, PlacedOrderModel)
+    compare(
+        f"List[OpenOrderModel] x{ORDERS_PER_RESPONSE}",
+        OPEN_ORDERS_RESPONSE_TEXT,
+        List[OpenOrderModel],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Compares parsing orderbook stream frames decoded to `str` (the default) with
+parsing them as `bytes` (`bytes_payloads=True`).
+
+Usage: python -m benchmarks.stream_payloads [frames_file]
+
+`frames_file` holds recorded frames, one per line. Synthetic frames are used if
+it's not given.
+"""
+import json
+import statistics
+import sys
+import time
+from typing import List
+
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.utils.http import WrappedStreamResponse
+
+ITERATIONS = 20
+SNAPSHOT_LEVELS = 200
+DELTAS_COUNT = 1_000
+
+MESSAGE_CLASS = WrappedStreamResponse[OrderbookUpdateModel]
+
+
+def create_frame(msg_type: str, seq: int, levels: int) -> bytes:
+    return json.dumps(
+        {
+            "type": msg_type,
+            "data": {
+                "m": "BTC-USD",
+                "b": [
+                    {"p": f"{43547 - i * 0.5:.1f}", "q": f"{0.001 * (i + 1):.4f}"}
+                    for i in range(levels)
+                ],
+                "a": [
+                    {"p": f"{43548 + i * 0.5:.1f}", "q": f"{0.001 * (i + 1):.4f}"}
+                    for i in range(levels)
+                ],
+            },
+            "ts": 1704798222748 + seq,
+            "seq": seq,
+        }
+    ).encode()
+
+
+def create_frames() -> List[bytes]:
+    frames = [create_frame("SNAPSHOT", 1, SNAPSHOT_LEVELS)]
+    for seq in range(2, DELTAS_COUNT + 2):
+        frames.append(create_frame("DELTA", seq, 1 + seq % 3))
+    return frames
+
+
+def load_frames(path: str) -> List[bytes]:
+    with open(path, "rb") as file:
+        return [line.rstrip(b"\n") for line in file if line.strip()]
+
+
+def parse_text(frames: List[bytes]):
+    for frame in frames:
+        MESSAGE_CLASS.model_validate_json(frame.decode("utf-8"))
+
+
+def parse_bytes(frames: List[bytes]):
+    for frame in frames:
+        MESSAGE_CLASS.model_validate_json(frame)
+
+
+def measure(parse, frames: List[bytes]) -> float:
+    start = time.perf_counter()
+    parse(frames)
+    end = time.perf_counter()
+    return (end - start) / len(frames) * 1_000_000
+
+
+def main():
+    frames = load_frames(sys.argv[1]) if len(sys.argv) > 1 else create_frames()
+
+    # Interleave the runs, so that both paths see the same machine conditions
+    text = []
+    raw = []
+    for _ in range(ITERATIONS):
+        text.append(measure(parse_text, frames))
+        raw.append(measure(parse_bytes, frames))
+
+    text_avg = statistics.mean(text)
+    raw_avg = statistics.mean(raw)
+    improvement = ((text_avg - raw_avg) / text_avg) * 100
+
+    print(f"=== {len(frames)} orderbook frames ===")
+    print("UTF-8 decode + model_validate_json(str):")
+    print(f"  Average: {text_avg:.2f}us")
+    print(f"  Min:     {min(text):.2f}us")
+    print("model_validate_json(bytes):")
+    print(f"  Average: {raw_avg:.2f}us")
+    print(f"  Min:     {min(raw):.2f}us")
+    print(f"Performance improvement: {improvement:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
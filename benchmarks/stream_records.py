@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""
+Compares decoding stream messages to pydantic models (`WrappedStreamResponse[T]`)
+and to records (`x10.perpetual.stream_client.records`): time and retained memory
+per message. Also compares applying orderbook deltas to a `TickOrderBook` from
+models and from fixed-point records (`FixedPointOrderbookDecoder`).
+
+Usage: python -m benchmarks.stream_records
+"""
+import json
+import statistics
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import List
+
+from x10.perpetual.candles import CandleModel
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.funding_rates import FundingRateModel
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.stream_client.records import (
+    CANDLES_DECODER,
+    FUNDING_RATE_DECODER,
+    ORDERBOOK_UPDATE_DECODER,
+    PUBLIC_TRADES_DECODER,
+    FixedPointOrderbookDecoder,
+)
+from x10.perpetual.tick_orderbook import TickOrderBook
+from x10.perpetual.trades import PublicTradeModel
+from x10.utils.http import WrappedStreamResponse
+
+ITERATIONS = 10
+MESSAGES_COUNT = 2_000
+
+
+def create_orderbook_message(seq: int) -> str:
+    levels = 1 + seq % 5
+    return json.dumps(
+        {
+            "type": "DELTA",
+            "data": {
+                "m": "BTC-USD",
+                "b": [{"p": f"{43547 - i:.1f}", "q": "0.0100"} for i in range(levels)],
+                "a": [{"p": f"{43548 + i:.1f}", "q": "0.0100"} for i in range(levels)],
+            },
+            "ts": 1704798222748 + seq,
+            "seq": seq,
+        }
+    )
+
+
+def create_trades_message(seq: int) -> str:
+    return json.dumps(
+        {
+            "type": "DELTA",
+            "data": [
+                {
+                    "i": 1844000421446684673 + seq,
+                    "m": "BTC-USD",
+                    "S": "SELL",
+                    "tT": "TRADE",
+                    "T": 1728478428001 + seq,
+                    "p": "62473.0",
+                    "q": "0.01080",
+                }
+            ],
+            "ts": 1728478428063 + seq,
+            "seq": seq,
+        }
+    )
+
+
+def create_candles_message(seq: int) -> str:
+    return json.dumps(
+        {
+            "data": [
+                {
+                    "o": "3458.64",
+                    "l": "3399.07",
+                    "h": "3476.89",
+                    "c": "3414.85",
+                    "v": "3.938",
+                    "T": 1721106000000 + seq,
+                }
+            ],
+            "ts": 1721283121979 + seq,
+            "seq": seq,
+        }
+    )
+
+
+def create_funding_message(seq: int) -> str:
+    return json.dumps(
+        {
+            "data": {"m": "BTC-USD", "f": "0.0001", "T": 1728478800000 + seq},
+            "ts": 1728478800123 + seq,
+            "seq": seq,
+        }
+    )
+
+
+def measure_time(parser, messages: List[str]) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        parser.model_validate_json(message)
+    end = time.perf_counter()
+    return (end - start) / len(messages) * 1_000_000
+
+
+def measure_memory(parser, messages: List[str]) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    decoded = [parser.model_validate_json(message) for message in messages]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del decoded
+    return (after - before) / len(messages)
+
+
+def compare(title: str, create_message, model_class, decoder):
+    messages = [create_message(seq) for seq in range(MESSAGES_COUNT)]
+
+    # Interleave the runs, so that both paths see the same machine conditions
+    models = []
+    records = []
+    for _ in range(ITERATIONS):
+        models.append(measure_time(model_class, messages))
+        records.append(measure_time(decoder, messages))
+
+    models_avg = statistics.mean(models)
+    records_avg = statistics.mean(records)
+    improvement = ((models_avg - records_avg) / models_avg) * 100
+
+    print(f"=== {title} ===")
+    print("WrappedStreamResponse[T].model_validate_json:")
+    print(f"  Average: {models_avg:.2f}us")
+    print(f"  Min:     {min(models):.2f}us")
+    print(f"  Memory:  {measure_memory(model_class, messages):.0f}B")
+    print("StreamRecordDecoder.model_validate_json:")
+    print(f"  Average: {records_avg:.2f}us")
+    print(f"  Min:     {min(records):.2f}us")
+    print(f"  Memory:  {measure_memory(decoder, messages):.0f}B")
+    print(f"Performance improvement: {improvement:.2f}%\n")
+
+
+def measure_apply(parser, orderbook: TickOrderBook, messages: List[str]) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        orderbook.update_orderbook(parser.model_validate_json(message).data)
+    end = time.perf_counter()
+    return (end - start) / len(messages) * 1_000_000
+
+
+def compare_fixed_point():
+    trading_config = TradingConfigModel.model_construct(
+        min_price_change=Decimal("0.1"), min_order_size_change=Decimal("0.0001")
+    )
+    model_class = WrappedStreamResponse[OrderbookUpdateModel]
+    decoder = FixedPointOrderbookDecoder({"BTC-USD": trading_config})
+    messages = [create_orderbook_message(seq) for seq in range(MESSAGES_COUNT)]
+
+    models = []
+    records = []
+    for _ in range(ITERATIONS):
+        orderbook = TickOrderBook(TESTNET_CONFIG, "BTC-USD", trading_config)
+        models.append(measure_apply(model_class, orderbook, messages))
+        orderbook = TickOrderBook(TESTNET_CONFIG, "BTC-USD", trading_config)
+        records.append(measure_apply(decoder, orderbook, messages))
+
+    models_avg = statistics.mean(models)
+    records_avg = statistics.mean(records)
+    improvement = ((models_avg - records_avg) / models_avg) * 100
+
+    print("=== Orderbook deltas applied to TickOrderBook ===")
+    print("WrappedStreamResponse[OrderbookUpdateModel]:")
+    print(f"  Average: {models_avg:.2f}us")
+    print(f"  Min:     {min(models):.2f}us")
+    print("FixedPointOrderbookDecoder:")
+    print(f"  Average: {records_avg:.2f}us")
+    print(f"  Min:     {min(records):.2f}us")
+    print(f"Performance improvement: {improvement:.2f}%\n")
+
+
+def main():
+    compare(
+        "Orderbook deltas",
+        create_orderbook_message,
+        WrappedStreamResponse[OrderbookUpdateModel],
+        ORDERBOOK_UPDATE_DECODER,
+    )
+    compare(
+        "Public trades",
+        create_trades_message,
+        WrappedStreamResponse[List[PublicTradeModel]],
+        PUBLIC_TRADES_DECODER,
+    )
+    compare(
+        "Candles",
+        create_candles_message,
+        WrappedStreamResponse[List[CandleModel]],
+        CANDLES_DECODER,
+    )
+    compare(
+        "Funding rates",
+        create_funding_message,
+        WrappedStreamResponse[FundingRateModel],
+        FUNDING_RATE_DECODER,
+    )
+    compare_fixed_point()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+"""
+Benchmark suite of the SDK hot paths: order signing and creation, REST responses
+parsing, stream messages parsing, orderbook updates and price impact queries, and
+end-to-end place-to-ack latency against the local mock exchange
+(`tests.mock_exchange.MockExchange`).
+
+Usage: python -m benchmarks.suite [--output results.json] [--compare baseline.json]
+                                   [--only name ...] [--rounds N]
+
+Results are written as JSON (one entry per benchmark with its statistics, in
+microseconds per operation), so that runs of different SDK versions can be
+compared with `--compare`: the exit code is non-zero if a benchmark is slower than
+the baseline by more than `--max-regression`.
+
+It's a development tool, not part of the SDK package: run it from the root of a
+checkout of the repository, with the dev dependencies installed (`aiohttp` for the
+mock exchange). The mock exchange and the sample market and account come from
+`tests`.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from tests.fixtures.accounts import create_trading_account
+from tests.fixtures.markets import create_btc_usd_market, get_btc_usd_market_json_data
+from tests.mock_exchange import MockExchange, MockExchangeConfig
+from x10.config import SDK_VERSION
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.order_ladder import LadderLevel, PresignedOrderPool
+from x10.perpetual.order_object import OrderSigningContext, create_order_object
+from x10.perpetual.orderbook import OrderBook
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.orders import OpenOrderModel, OrderSide
+from x10.perpetual.stream_client import PerpetualStreamClient
+from x10.perpetual.stream_client.records import (
+    ORDERBOOK_UPDATE_DECODER,
+    FixedPointOrderbookDecoder,
+)
+from x10.perpetual.tick_orderbook import TickOrderBook
+from x10.perpetual.trading_client import PerpetualTradingClient
+from x10.utils.http import WrappedStreamResponse, parse_response_to_model
+
+DEFAULT_ROUNDS = 20
+# Operations per round of the micro benchmarks, each round gives one sample: the
+# mean time of its operations
+CALLS_PER_ROUND = 500
+# Operations of the end-to-end benchmarks, each one gives one sample
+NETWORK_OPERATIONS = 200
+MAX_REGRESSION = 0.2
+
+MARKET = create_btc_usd_market(get_btc_usd_market_json_data())
+ACCOUNT = create_trading_account()
+ORDERBOOK_LEVELS = 200
+
+OPEN_ORDERS_RESPONSE_TEXT = json.dumps(
+    {
+        "status": "OK",
+        "data": [
+            {
+                "id": 1775511783722512384 + i,
+                "accountId": 3017,
+                "externalId": f"order-{i}",
+                "market": "BTC-USD",
+                "type": "LIMIT",
+                "side": "BUY",
+                "status": "NEW",
+                "price": "39000.00",
+                "qty": "0.2",
+                "filledQty": "0",
+                "reduceOnly": False,
+                "postOnly": False,
+                "createdTime": 1712006093018,
+                "updatedTime": 1712006093018,
+                "expiryTime": 1712610893018,
+            }
+            for i in range(10)
+        ],
+    }
+)
+
+
+def create_orderbook_message(msg_type: str, seq: int, levels: int) -> str:
+    return json.dumps(
+        {
+            "type": msg_type,
+            "data": {
+                "m": "BTC-USD",
+                "b": [
+                    {"p": f"{64000 - i * 0.1:.1f}", "q": f"{0.001 * (1 + i % 7):.3f}"}
+                    for i in range(levels)
+                ],
+                "a": [
+                    {"p": f"{64000.1 + i * 0.1:.1f}", "q": f"{0.001 * (1 + i % 5):.3f}"}
+                    for i in range(levels)
+                ],
+            },
+            "ts": 1704798222748 + seq,
+            "seq": seq,
+        }
+    )
+
+
+SNAPSHOT_MESSAGE = create_orderbook_message("SNAPSHOT", 1, ORDERBOOK_LEVELS)
+DELTA_MESSAGES = [
+    create_orderbook_message("DELTA", seq, 1 + seq % 3) for seq in range(2, 102)
+]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    # Creates the operation to time, async benchmarks are end-to-end ones
+    setup: Callable[[], Callable[[], object]]
+    is_async: bool = False
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, is_async=False):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, is_async))
+        return setup
+
+    return register
+
+
+@benchmark("order_signing")
+def setup_order_signing():
+    msg_hash = 0x2E0D5E7A5E3C1A5F2C0D5E7A5E3C1A5F2C0D5E7A5E3C1A5F2C0D5E7A5E3C1A
+    return lambda: ACCOUNT.sign(msg_hash)
+
+
+@benchmark("create_order_object")
+def setup_create_order_object():
+    return lambda: create_order_object(
+        account=ACCOUNT,
+        market=MARKET,
+        amount_of_synthetic=Decimal("0.001"),
+        price=Decimal("64000.1"),
+        side=OrderSide.BUY,
+        starknet_domain=TESTNET_CONFIG.starknet_domain,
+    )
+
+
+@benchmark("rest_response_parse")
+def setup_rest_response_parse():
+    return lambda: parse_response_to_model(
+        OPEN_ORDERS_RESPONSE_TEXT, List[OpenOrderModel]
+    )
+
+
+@benchmark("stream_parse_model")
+def setup_stream_parse_model():
+    model_class = WrappedStreamResponse[OrderbookUpdateModel]
+    return lambda: model_class.model_validate_json(DELTA_MESSAGES[0])
+
+
+@benchmark("stream_parse_record")
+def setup_stream_parse_record():
+    return lambda: ORDERBOOK_UPDATE_DECODER.model_validate_json(DELTA_MESSAGES[0])
+
+
+@benchmark("stream_parse_fixed_point")
+def setup_stream_parse_fixed_point():
+    decoder = FixedPointOrderbookDecoder({MARKET.name: MARKET.trading_config})
+    return lambda: decoder.model_validate_json(DELTA_MESSAGES[0])
+
+
+def setup_orderbook_apply(orderbook: OrderBook, parser):
+    orderbook.init_orderbook(parser.model_validate_json(SNAPSHOT_MESSAGE).data)
+    deltas = [parser.model_validate_json(message).data for message in DELTA_MESSAGES]
+    index = 0
+
+    def apply():
+        nonlocal index
+        orderbook.update_orderbook(deltas[index])
+        index = (index + 1) % len(deltas)
+
+    return apply
+
+
+@benchmark("orderbook_apply")
+def setup_orderbook_apply_decimal():
+    return setup_orderbook_apply(
+        OrderBook(TESTNET_CONFIG, MARKET.name),
+        WrappedStreamResponse[OrderbookUpdateModel],
+    )
+
+
+@benchmark("tick_orderbook_apply")
+def setup_tick_orderbook_apply():
+    return setup_orderbook_apply(
+        TickOrderBook(TESTNET_CONFIG, MARKET.name, MARKET.trading_config),
+        WrappedStreamResponse[OrderbookUpdateModel],
+    )
+
+
+@benchmark("tick_orderbook_apply_fixed_point")
+def setup_tick_orderbook_apply_fixed_point():
+    return setup_orderbook_apply(
+        TickOrderBook(TESTNET_CONFIG, MARKET.name, MARKET.trading_config),
+        FixedPointOrderbookDecoder({MARKET.name: MARKET.trading_config}),
+    )
+
+
+def create_snapshot_orderbook() -> OrderBook:
+    orderbook = OrderBook(TESTNET_CONFIG, MARKET.name)
+    orderbook.init_orderbook(
+        WrappedStreamResponse[OrderbookUpdateModel]
+        .model_validate_json(SNAPSHOT_MESSAGE)
+        .data
+    )
+    return orderbook
+
+
+@benchmark("price_impact_qty")
+def setup_price_impact_qty():
+    orderbook = create_snapshot_orderbook()
+    return lambda: orderbook.calculate_price_impact_qty(Decimal("0.05"), "BUY")
+
+
+@benchmark("price_impact_notional")
+def setup_price_impact_notional():
+    orderbook = create_snapshot_orderbook()
+    return lambda: orderbook.calculate_price_impact_notional(Decimal("2500"), "SELL")
+
+
+@benchmark("price_impact_qty_batch_100")
+def setup_price_impact_qty_batch():
+    orderbook = create_snapshot_orderbook()
+    # A prebuilt array, so that only the vectorized computation is timed
+    sizes = np.arange(1, 101, dtype=np.float64) * 0.005
+    return lambda: orderbook.calculate_price_impact_qty_batch(sizes, "BUY")
+
+
+async def run_with_exchange(
+    run: Callable[[MockExchange, PerpetualTradingClient], Awaitable[List[float]]]
+) -> List[float]:
+    config = MockExchangeConfig(orderbook_update_rate=0, seed=1)
+    async with MockExchange([MARKET], config) as exchange:
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, ACCOUNT)
+        try:
+            return await run(exchange, trading_client)
+        finally:
+            await trading_client.close()
+
+
+@benchmark("rest_request_parse", is_async=True)
+def setup_rest_request_parse():
+    async def run(_exchange, trading_client: PerpetualTradingClient):
+        samples = []
+        for _ in range(NETWORK_OPERATIONS):
+            start = time.perf_counter()
+            await trading_client.markets_info.get_markets(market_names=[MARKET.name])
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return lambda: run_with_exchange(run)
+
+
+@benchmark("place_to_ack", is_async=True)
+def setup_place_to_ack():
+    """
+    From the order creation (signing included) to its acknowledgement on the
+    account stream.
+    """
+
+    async def run(exchange: MockExchange, trading_client: PerpetualTradingClient):
+        stream_client = PerpetualStreamClient(
+            api_url=exchange.endpoint_config.stream_url
+        )
+        samples = []
+        async with stream_client.subscribe_to_account_updates(
+            ACCOUNT.api_key
+        ) as stream:
+            await stream.recv()
+            for i in range(NETWORK_OPERATIONS):
+                start = time.perf_counter()
+                order = create_order_object(
+                    account=ACCOUNT,
+                    market=MARKET,
+                    amount_of_synthetic=Decimal("0.001"),
+                    price=Decimal("60000") - i,
+                    side=OrderSide.BUY,
+                    starknet_domain=TESTNET_CONFIG.starknet_domain,
+                )
+                await trading_client.orders.place_order(order)
+                acked = False
+                while not acked:
+                    event = await stream.recv()
+                    acked = any(
+                        update.external_id == order.id
+                        for update in event.data.orders or []
+                    )
+                samples.append(time.perf_counter() - start)
+        return samples
+
+    return lambda: run_with_exchange(run)
+
+
+@benchmark("place_to_ack_presigned", is_async=True)
+def setup_place_to_ack_presigned():
+    """
+    Same as `place_to_ack`, with orders taken from a pool signed beforehand.
+    """
+
+    async def run(exchange: MockExchange, trading_client: PerpetualTradingClient):
+        stream_client = PerpetualStreamClient(
+            api_url=exchange.endpoint_config.stream_url
+        )
+        context = OrderSigningContext.create(
+            ACCOUNT, MARKET, exchange.endpoint_config.starknet_domain
+        )
+        prices = [Decimal("60000") - i for i in range(NETWORK_OPERATIONS)]
+        pool = PresignedOrderPool(context)
+        pool.set_ladder(
+            LadderLevel(OrderSide.BUY, price, Decimal("0.001")) for price in prices
+        )
+        pool.fill()
+        samples = []
+        async with stream_client.subscribe_to_account_updates(
+            ACCOUNT.api_key
+        ) as stream:
+            await stream.recv()
+            for price in prices:
+                start = time.perf_counter()
+                order = pool.take(OrderSide.BUY, price, Decimal("0.001"))
+                assert order is not None
+                await trading_client.orders.place_order(order)
+                acked = False
+                while not acked:
+                    event = await stream.recv()
+                    acked = any(
+                        update.external_id == order.id
+                        for update in event.data.orders or []
+                    )
+                samples.append(time.perf_counter() - start)
+        return samples
+
+    return lambda: run_with_exchange(run)
+
+
+def measure(item: Benchmark, rounds: int) -> List[float]:
+    if item.is_async:
+        return asyncio.run(item.setup()())  # type: ignore[arg-type]
+
+    operation = item.setup()
+    operation()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(CALLS_PER_ROUND):
+            operation()
+        samples.append((time.perf_counter() - start) / CALLS_PER_ROUND)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    micros = sorted(sample * 1_000_000 for sample in samples)
+    # Percentiles interpolated between samples, within the min and max: with few
+    # samples (e.g. 20 rounds) the p99 is close to the max
+    percentiles = (
+        statistics.quantiles(micros, n=100, method="inclusive")
+        if len(micros) > 1
+        else [micros[0]] * 99
+    )
+    return {
+        "mean_us": statistics.mean(micros),
+        "median_us": statistics.median(micros),
+        "p90_us": percentiles[89],
+        "p99_us": percentiles[98],
+        "min_us": micros[0],
+        "max_us": micros[-1],
+        "stdev_us": statistics.stdev(micros) if len(micros) > 1 else 0.0,
+        "samples": len(micros),
+    }
+
+
+def get_git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline_path: str, max_regression: float
+) -> bool:
+    with open(baseline_path) as file:
+        baseline = json.load(file)["results"]
+
+    ok = True
+    print(f"\n=== Compared to {baseline_path} (median) ===")
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        change = stats["median_us"] / baseline[name]["median_us"] - 1
+        regressed = change > max_regression
+        ok = ok and not regressed
+        print(f"{name:<36} {change * 100:+8.2f}%{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument("--max-regression", type=float, default=MAX_REGRESSION)
+    parser.add_argument("--only", nargs="+", help="names of the benchmarks to run")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    args = parser.parse_args()
+
+    results = {}
+    for item in BENCHMARKS:
+        if args.only and item.name not in args.only:
+            continue
+        stats = summarize(measure(item, args.rounds))
+        results[item.name] = stats
+        print(
+            f"{item.name:<36} median {stats['median_us']:10.2f}us"
+            f"  p99 {stats['p99_us']:10.2f}us  min {stats['min_us']:10.2f}us"
+        )
+
+    report = {
+        "sdk_version": SDK_VERSION,
+        "git_revision": get_git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
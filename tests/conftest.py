@@ -40,6 +40,15 @@ def create_orderbook_message():
     return _create_orderbook_message
 
 
+@pytest.fixture
+def create_orderbook_update_message():
+    from tests.fixtures.orderbook import (
+        create_orderbook_update_message as _create_orderbook_update_message,
+    )
+
+    return _create_orderbook_update_message
+
+
 @pytest.fixture
 def create_account_update_trade_message():
     from tests.fixtures.accounts import (
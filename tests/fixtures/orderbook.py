@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import List, Tuple
 
 
 def create_orderbook_message():
@@ -22,3 +23,41 @@ def create_orderbook_message():
         ts=1704798222748,
         seq=570,
     )
+
+
+def create_orderbook_update(
+    bid: List[Tuple[str, str]],
+    ask: List[Tuple[str, str]],
+    market: str = "BTC-USD",
+):
+    from x10.perpetual.orderbooks import OrderbookQuantityModel, OrderbookUpdateModel
+
+    return OrderbookUpdateModel(
+        market=market,
+        bid=[
+            OrderbookQuantityModel(price=Decimal(price), qty=Decimal(qty))
+            for price, qty in bid
+        ],
+        ask=[
+            OrderbookQuantityModel(price=Decimal(price), qty=Decimal(qty))
+            for price, qty in ask
+        ],
+    )
+
+
+def create_orderbook_update_message(
+    msg_type: str,
+    seq: int,
+    bid: List[Tuple[str, str]],
+    ask: List[Tuple[str, str]],
+    market: str = "BTC-USD",
+):
+    from x10.perpetual.orderbooks import OrderbookUpdateModel
+    from x10.utils.http import StreamDataType, WrappedStreamResponse
+
+    return WrappedStreamResponse[OrderbookUpdateModel](
+        type=StreamDataType(msg_type),
+        data=create_orderbook_update(bid, ask, market),
+        ts=1704798222748,
+        seq=seq,
+    )
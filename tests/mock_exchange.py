@@ -0,0 +1,542 @@
+"""
+Local stand-in for the exchange, to run the SDK end to end (e.g. load tests) on a
+laptop or in CI, without testnet.
+
+It serves the REST routes used by the trading client modules (markets, orders,
+account) with `aiohttp`, and the orderbooks and account streams with `picows`.
+Orders are accepted without checking their signatures, and never filled. The
+orderbooks are synthetic, updated at a configurable rate.
+
+It's part of the tests, not of the SDK package: `aiohttp` is only installed with
+the dev dependencies.
+"""
+
+import asyncio
+import dataclasses
+import json
+import random
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from aiohttp import web
+from picows import (
+    WSFrame,
+    WSListener,
+    WSMsgType,
+    WSTransport,
+    WSUpgradeRequest,
+    ws_create_server,
+)
+
+from x10.perpetual.configuration import TESTNET_CONFIG, EndpointConfig
+from x10.perpetual.markets import MarketModel
+from x10.perpetual.orders import OpenOrderModel, OrderStatus, PerpetualOrderModel
+from x10.utils.http import RequestHeader, ResponseStatus, StreamDataType
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+API_PATH = "/api/v1"
+STREAM_PATH = "/stream.extended.exchange/v1"
+
+# Error codes returned by the mock, in the `ResponseError` format of the API
+MARKET_NOT_FOUND_ERROR_CODE = 1001
+ORDER_NOT_FOUND_ERROR_CODE = 1002
+INJECTED_ERROR_CODE = 1500
+
+_OPEN_ORDER_STATUSES = (OrderStatus.NEW.value, OrderStatus.PARTIALLY_FILLED.value)
+
+
+@dataclass(frozen=True)
+class MockExchangeConfig:
+    """
+    :param latency: delay added to each REST response, in seconds.
+    :param latency_jitter: the delay varies uniformly by up to this much, in seconds.
+    :param error_rate: probability of a REST request failing with `error_status`,
+    before it's handled.
+    :param orderbook_update_rate: deltas sent per second on each orderbook stream,
+    `0` to only send the snapshots.
+    :param orderbook_levels: levels per side of the synthetic orderbooks.
+    :param seed: seed of the random generator, for reproducible runs.
+    """
+
+    latency: float = 0
+    latency_jitter: float = 0
+    error_rate: float = 0
+    error_status: int = 500
+    orderbook_update_rate: float = 10
+    orderbook_levels: int = 20
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency < 0 or self.latency_jitter < 0:
+            raise ValueError("latency must not be negative")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        if self.orderbook_update_rate < 0:
+            raise ValueError("orderbook_update_rate must not be negative")
+        if self.orderbook_levels < 1:
+            raise ValueError("orderbook_levels must be positive")
+
+
+class _SyntheticOrderbook:
+    """
+    Orderbook of a market around its mark price, random deltas never cross it.
+    """
+
+    def __init__(self, market: MarketModel, levels: int, rng: random.Random):
+        trading_config = market.trading_config
+        self.market_name = market.name
+        self.__price_step = trading_config.min_price_change
+        self.__qty_step = trading_config.min_order_size
+        self.__levels = levels
+        self.__rng = rng
+        mid_price = (
+            market.market_stats.mark_price / self.__price_step
+        ).to_integral_value() * self.__price_step
+        self.__best_bid = mid_price - self.__price_step
+        self.__best_ask = mid_price + self.__price_step
+        self.bids: Dict[Decimal, Decimal] = {}
+        self.asks: Dict[Decimal, Decimal] = {}
+        for i in range(levels):
+            self.bids[self.__best_bid - i * self.__price_step] = self.__qty_step * (i + 1)
+            self.asks[self.__best_ask + i * self.__price_step] = self.__qty_step * (i + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.__to_data(
+            sorted(self.bids.items(), reverse=True), sorted(self.asks.items())
+        )
+
+    def next_delta(self) -> Dict[str, Any]:
+        rng = self.__rng
+        is_bid = rng.random() < 0.5
+        offset = rng.randrange(self.__levels) * self.__price_step
+        price = self.__best_bid - offset if is_bid else self.__best_ask + offset
+        levels = self.bids if is_bid else self.asks
+        qty = levels.get(price)
+        if qty is not None and rng.random() < 0.3:
+            qty_change = -qty
+            del levels[price]
+        else:
+            qty_change = self.__qty_step * rng.randint(1, 10)
+            levels[price] = (qty or 0) + qty_change
+        level = [(price, qty_change)]
+        return self.__to_data(level if is_bid else [], [] if is_bid else level)
+
+    def __to_data(self, bid, ask) -> Dict[str, Any]:
+        return {
+            "m": self.market_name,
+            "b": [{"p": str(price), "q": str(qty)} for price, qty in bid],
+            "a": [{"p": str(price), "q": str(qty)} for price, qty in ask],
+        }
+
+
+class _StreamListener(WSListener):
+    def __init__(self, exchange: "MockExchange", stream: str, market: Optional[str]):
+        self.exchange = exchange
+        self.stream = stream
+        self.market = market
+        self.transport: Optional[WSTransport] = None
+        self.task: Optional[asyncio.Task] = None
+        self.seq = 0
+
+    def send(self, msg_type: Optional[str], data: Any):
+        assert self.transport is not None
+        self.seq += 1
+        message = {"type": msg_type, "data": data, "ts": _now_millis(), "seq": self.seq}
+        self.transport.send(WSMsgType.TEXT, json.dumps(message).encode())
+
+    def on_ws_connected(self, transport: WSTransport):
+        self.transport = transport
+        self.exchange._on_stream_connected(self)
+
+    def on_ws_frame(self, transport: WSTransport, frame: WSFrame):
+        if frame.msg_type == WSMsgType.CLOSE:
+            transport.send_close(frame.get_close_code(), frame.get_close_message())
+            transport.disconnect()
+
+    def on_ws_disconnected(self, transport: WSTransport):
+        self.exchange._on_stream_disconnected(self)
+
+
+class MockExchange:
+    """
+    Serves the REST API and the streams on two local ports, `endpoint_config`
+    points the SDK clients to them once started:
+
+        async with MockExchange(markets, MockExchangeConfig(latency=0.005)) as exchange:
+            trading_client = PerpetualTradingClient(exchange.endpoint_config, account)
+    """
+
+    def __init__(
+        self,
+        markets: Iterable[MarketModel],
+        config: Optional[MockExchangeConfig] = None,
+        host: str = "127.0.0.1",
+    ):
+        self.config = config or MockExchangeConfig()
+        self.__host = host
+        self.__rng = random.Random(self.config.seed)
+        self.__markets = {market.name: market for market in markets}
+        self.__orderbooks = {
+            name: _SyntheticOrderbook(market, self.config.orderbook_levels, self.__rng)
+            for name, market in self.__markets.items()
+        }
+        self.__orders: Dict[int, OpenOrderModel] = {}
+        self.__last_order_id = 0
+        self.__listeners: Set[_StreamListener] = set()
+        self.__runner: Optional[web.AppRunner] = None
+        self.__ws_server: Optional[asyncio.AbstractServer] = None
+        self.__endpoint_config: Optional[EndpointConfig] = None
+        self.__requests_count = 0
+        self.__errors_count = 0
+
+    @property
+    def endpoint_config(self) -> EndpointConfig:
+        assert self.__endpoint_config is not None, "The exchange is not started"
+        return self.__endpoint_config
+
+    @property
+    def orders(self) -> Dict[int, OpenOrderModel]:
+        return self.__orders
+
+    @property
+    def requests_count(self) -> int:
+        return self.__requests_count
+
+    @property
+    def errors_count(self) -> int:
+        """
+        Number of injected errors, see `MockExchangeConfig.error_rate`.
+        """
+
+        return self.__errors_count
+
+    async def start(self):
+        app = web.Application(middlewares=[self.__simulate_network])
+        app.add_routes(
+            [
+                web.get(f"{API_PATH}/info/markets", self.__get_markets),
+                web.get(
+                    f"{API_PATH}/info/markets/{{market}}/orderbook", self.__get_orderbook
+                ),
+                web.post(f"{API_PATH}/user/order", self.__place_order),
+                web.delete(f"{API_PATH}/user/order", self.__cancel_order_by_external_id),
+                web.post(f"{API_PATH}/user/order/massCancel", self.__mass_cancel),
+                web.delete(f"{API_PATH}/user/order/{{order_id}}", self.__cancel_order),
+                web.get(f"{API_PATH}/user/orders", self.__get_open_orders),
+                web.get(
+                    f"{API_PATH}/user/orders/external/{{external_id}}",
+                    self.__get_orders_by_external_id,
+                ),
+                web.get(f"{API_PATH}/user/orders/{{order_id}}", self.__get_order),
+                web.get(f"{API_PATH}/user/balance", self.__get_balance),
+                web.get(f"{API_PATH}/user/positions", self.__get_positions),
+            ]
+        )
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, self.__host, 0)
+        await site.start()
+        api_port = self.__runner.addresses[0][1]
+
+        self.__ws_server = await ws_create_server(
+            self.__create_listener, self.__host, 0
+        )
+        ws_port = self.__ws_server.sockets[0].getsockname()[1]
+
+        self.__endpoint_config = dataclasses.replace(
+            TESTNET_CONFIG,
+            api_base_url=f"http://{self.__host}:{api_port}{API_PATH}",
+            stream_url=f"ws://{self.__host}:{ws_port}{STREAM_PATH}",
+        )
+        LOGGER.info(
+            "Mock exchange started: %s, %s",
+            self.__endpoint_config.api_base_url,
+            self.__endpoint_config.stream_url,
+        )
+
+    async def stop(self):
+        for listener in list(self.__listeners):
+            if listener.transport is not None:
+                listener.transport.disconnect(graceful=False)
+            if listener.task is not None:
+                listener.task.cancel()
+        self.__listeners.clear()
+        if self.__ws_server is not None:
+            self.__ws_server.close()
+            await self.__ws_server.wait_closed()
+            self.__ws_server = None
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+
+    # Streams
+
+    def __create_listener(self, request: WSUpgradeRequest) -> Optional[WSListener]:
+        path = request.path.decode().partition("?")[0]
+        if not path.startswith(STREAM_PATH + "/"):
+            return None
+        stream, _, market = path[len(STREAM_PATH) + 1:].partition("/")
+        if stream not in ("orderbooks", "account"):
+            return None
+        if market and market not in self.__markets:
+            return None
+        return _StreamListener(self, stream, market or None)
+
+    def _on_stream_connected(self, listener: _StreamListener):
+        self.__listeners.add(listener)
+        if listener.stream == "account":
+            listener.send(
+                StreamDataType.SNAPSHOT.value,
+                {
+                    "orders": [
+                        order.to_api_request_json() for order in self.__open_orders()
+                    ],
+                    "positions": [],
+                    "balance": self.__balance(),
+                },
+            )
+        else:
+            orderbooks = (
+                [self.__orderbooks[listener.market]]
+                if listener.market
+                else list(self.__orderbooks.values())
+            )
+            for orderbook in orderbooks:
+                listener.send(StreamDataType.SNAPSHOT.value, orderbook.snapshot())
+            if self.config.orderbook_update_rate > 0:
+                listener.task = asyncio.get_running_loop().create_task(
+                    self.__send_orderbook_updates(listener, orderbooks)
+                )
+
+    def _on_stream_disconnected(self, listener: _StreamListener):
+        self.__listeners.discard(listener)
+        if listener.task is not None:
+            listener.task.cancel()
+
+    async def __send_orderbook_updates(
+        self, listener: _StreamListener, orderbooks: List[_SyntheticOrderbook]
+    ):
+        # Sleeps are at least 1ms, higher rates are reached with several deltas
+        # per wake-up
+        interval = max(1 / self.config.orderbook_update_rate, 0.001)
+        updates_per_interval = interval * self.config.orderbook_update_rate
+        pending = 0.0
+        while True:
+            await asyncio.sleep(interval)
+            pending += updates_per_interval
+            while pending >= 1:
+                pending -= 1
+                orderbook = self.__rng.choice(orderbooks)
+                listener.send(StreamDataType.DELTA.value, orderbook.next_delta())
+
+    def __publish_orders(self, orders: List[OpenOrderModel]):
+        data = {"orders": [order.to_api_request_json() for order in orders]}
+        for listener in self.__listeners:
+            if listener.stream == "account":
+                listener.send(StreamDataType.ORDER.value, data)
+
+    # REST API
+
+    @web.middleware
+    async def __simulate_network(self, request: web.Request, handler):
+        self.__requests_count += 1
+        config = self.config
+        delay = config.latency
+        if config.latency_jitter:
+            delay += self.__rng.uniform(-config.latency_jitter, config.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if config.error_rate and self.__rng.random() < config.error_rate:
+            self.__errors_count += 1
+            return _error_response(
+                INJECTED_ERROR_CODE, "Injected error", config.error_status
+            )
+        if request.path.startswith(f"{API_PATH}/user/") and not request.headers.get(
+            RequestHeader.API_KEY.value
+        ):
+            return _error_response(401, "Missing API key", 401)
+        return await handler(request)
+
+    async def __get_markets(self, request: web.Request):
+        names = request.query.getall("market", None)
+        markets = [
+            market
+            for name, market in self.__markets.items()
+            if names is None or name in names
+        ]
+        return _ok_response([market.to_api_request_json() for market in markets])
+
+    async def __get_orderbook(self, request: web.Request):
+        orderbook = self.__orderbooks.get(request.match_info["market"])
+        if orderbook is None:
+            return _error_response(MARKET_NOT_FOUND_ERROR_CODE, "Market not found")
+        return _ok_response(orderbook.snapshot())
+
+    async def __place_order(self, request: web.Request):
+        order = PerpetualOrderModel.model_validate(await request.json())
+        if order.market not in self.__markets:
+            return _error_response(MARKET_NOT_FOUND_ERROR_CODE, "Market not found")
+
+        updated_orders = []
+        if order.cancel_id is not None:
+            updated_orders.extend(
+                self.__cancel(
+                    open_order
+                    for open_order in self.__open_orders()
+                    if open_order.external_id == order.cancel_id
+                )
+            )
+
+        self.__last_order_id += 1
+        now = _now_millis()
+        open_order = OpenOrderModel(
+            id=self.__last_order_id,
+            account_id=1,
+            external_id=order.id,
+            market=order.market,
+            type=order.type,
+            side=order.side,
+            status=OrderStatus.NEW,
+            price=order.price,
+            qty=order.qty,
+            filled_qty=Decimal(0),
+            reduce_only=order.reduce_only,
+            post_only=order.post_only,
+            created_time=now,
+            updated_time=now,
+            expiry_time=order.expiry_epoch_millis,
+        )
+        self.__orders[open_order.id] = open_order
+        updated_orders.append(open_order)
+        self.__publish_orders(updated_orders)
+        return _ok_response({"id": open_order.id, "externalId": open_order.external_id})
+
+    async def __cancel_order(self, request: web.Request):
+        order = self.__orders.get(int(request.match_info["order_id"]))
+        return self.__cancel_response([order] if order else [])
+
+    async def __cancel_order_by_external_id(self, request: web.Request):
+        external_id = request.query.get("externalId")
+        return self.__cancel_response(
+            order
+            for order in self.__open_orders()
+            if order.external_id == external_id
+        )
+
+    async def __mass_cancel(self, request: web.Request):
+        body = await request.json()
+        order_ids = set(body.get("orderIds") or [])
+        external_ids = set(body.get("externalOrderIds") or [])
+        markets = set(body.get("markets") or [])
+        cancel_all = body.get("cancelAll", False)
+        cancelled = self.__cancel(
+            order
+            for order in self.__open_orders()
+            if cancel_all
+            or order.id in order_ids
+            or order.external_id in external_ids
+            or order.market in markets
+        )
+        self.__publish_orders(cancelled)
+        return _ok_response(None)
+
+    async def __get_open_orders(self, request: web.Request):
+        markets = request.query.getall("market", None)
+        return _ok_response(
+            [
+                order.to_api_request_json()
+                for order in self.__open_orders()
+                if markets is None or order.market in markets
+            ]
+        )
+
+    async def __get_order(self, request: web.Request):
+        order = self.__orders.get(int(request.match_info["order_id"]))
+        if order is None:
+            return _error_response(ORDER_NOT_FOUND_ERROR_CODE, "Order not found", 404)
+        return _ok_response(order.to_api_request_json())
+
+    async def __get_orders_by_external_id(self, request: web.Request):
+        external_id = request.match_info["external_id"]
+        return _ok_response(
+            [
+                order.to_api_request_json()
+                for order in self.__orders.values()
+                if order.external_id == external_id
+            ]
+        )
+
+    async def __get_balance(self, _request: web.Request):
+        return _ok_response(self.__balance())
+
+    async def __get_positions(self, _request: web.Request):
+        return _ok_response([])
+
+    def __open_orders(self) -> List[OpenOrderModel]:
+        return [
+            order
+            for order in self.__orders.values()
+            if order.status in _OPEN_ORDER_STATUSES
+        ]
+
+    def __cancel(self, orders: Iterable[OpenOrderModel]) -> List[OpenOrderModel]:
+        cancelled = []
+        now = _now_millis()
+        for order in list(orders):
+            order = order.model_copy(
+                update={"status": OrderStatus.CANCELLED.value, "updated_time": now}
+            )
+            self.__orders[order.id] = order
+            cancelled.append(order)
+        return cancelled
+
+    def __cancel_response(self, orders: Iterable[OpenOrderModel]) -> web.Response:
+        cancelled = self.__cancel(
+            order for order in orders if order.status in _OPEN_ORDER_STATUSES
+        )
+        if not cancelled:
+            return _error_response(ORDER_NOT_FOUND_ERROR_CODE, "Order not found", 404)
+        self.__publish_orders(cancelled)
+        return _ok_response(None)
+
+    def __balance(self) -> Dict[str, Any]:
+        return {
+            "collateralName": "USD",
+            "balance": "1000000",
+            "equity": "1000000",
+            "availableForTrade": "1000000",
+            "availableForWithdrawal": "1000000",
+            "unrealisedPnl": "0",
+            "initialMargin": "0",
+            "marginRatio": "0",
+            "updatedTime": _now_millis(),
+        }
+
+
+def _now_millis() -> int:
+    return int(time.time() * 1000)
+
+
+def _ok_response(data: Any) -> web.Response:
+    return web.json_response({"status": ResponseStatus.OK.value, "data": data})
+
+
+def _error_response(code: int, message: str, status: int = 400) -> web.Response:
+    return web.json_response(
+        {
+            "status": ResponseStatus.ERROR.value,
+            "error": {"code": code, "message": message},
+        },
+        status=status,
+    )
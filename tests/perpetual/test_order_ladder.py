@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to, has_length, none
+
+from x10.perpetual.orders import OrderSide
+
+PRICE = Decimal("43445.1")
+QTY = Decimal("0.001")
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 5, 1, 8, 57, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.now
+
+
+def create_pool(create_trading_account, create_btc_usd_market, **kwargs):
+    from x10.perpetual.configuration import TESTNET_CONFIG
+    from x10.perpetual.order_ladder import LadderLevel, PresignedOrderPool
+    from x10.perpetual.order_object import OrderSigningContext
+
+    context = OrderSigningContext.create(
+        account=create_trading_account(),
+        market=create_btc_usd_market(),
+        starknet_domain=TESTNET_CONFIG.starknet_domain,
+    )
+    pool = PresignedOrderPool(context, **kwargs)
+    pool.set_ladder(LadderLevel(side, PRICE, QTY) for side in OrderSide)
+    return pool
+
+
+def test_take_presigned_orders(create_trading_account, create_btc_usd_market):
+    clock = Clock()
+    pool = create_pool(create_trading_account, create_btc_usd_market, depth=2, clock=clock)
+
+    assert_that(pool.fill(), equal_to(4))
+    assert_that(pool.fill(), equal_to(0))
+
+    first = pool.take(OrderSide.BUY, PRICE, QTY)
+    second = pool.take(OrderSide.BUY, PRICE, QTY, previous_order_external_id=first.id)
+
+    assert_that(first.side, equal_to(OrderSide.BUY))
+    assert_that(first.price, equal_to(PRICE))
+    assert_that(first.qty, equal_to(QTY))
+    assert_that(first.nonce == second.nonce, equal_to(False))
+    assert_that(second.cancel_id, equal_to(first.id))
+    assert_that(pool.take(OrderSide.BUY, PRICE, QTY), none())
+    assert_that(pool.take(OrderSide.BUY, PRICE + 1, QTY), none())
+    assert_that(pool.available(OrderSide.SELL, PRICE, QTY), equal_to(2))
+    assert_that(pool.fill(), equal_to(2))
+
+
+def test_expiring_orders_are_evicted(create_trading_account, create_btc_usd_market):
+    clock = Clock()
+    pool = create_pool(
+        create_trading_account,
+        create_btc_usd_market,
+        ttl=timedelta(minutes=10),
+        min_time_to_expiry=timedelta(minutes=5),
+        clock=clock,
+    )
+    pool.fill()
+
+    clock.now += timedelta(minutes=5)
+
+    assert_that(pool.take(OrderSide.BUY, PRICE, QTY), none())
+    assert_that(pool.evict_expired(), equal_to(1))
+    assert_that(pool.fill(), equal_to(2))
+    order = pool.take(OrderSide.BUY, PRICE, QTY)
+    assert_that(
+        order.expiry_epoch_millis,
+        equal_to(int((clock.now + timedelta(minutes=10)).timestamp() * 1000)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_refill_on_executor(create_trading_account, create_btc_usd_market):
+    from x10.perpetual.order_ladder import LadderLevel
+
+    pool = create_pool(create_trading_account, create_btc_usd_market, clock=Clock())
+
+    assert_that(await pool.refill(), equal_to(2))
+
+    pool.set_ladder([LadderLevel(OrderSide.SELL, PRICE, QTY), (OrderSide.SELL, PRICE, QTY * 2)])
+
+    assert_that(pool.levels, has_length(2))
+    assert_that(await pool.refill(), equal_to(1))
+    assert_that(pool.available(OrderSide.BUY, PRICE, QTY), equal_to(0))
+    assert_that(pool.available(OrderSide.SELL, PRICE, QTY * 2), equal_to(1))
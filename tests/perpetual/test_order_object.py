@@ -1,4 +1,5 @@
-from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
@@ -258,3 +259,146 @@ async def test_external_order_id(
             }
         ),
     )
+
+
+@pytest.mark.parametrize(
+    "side, expected_id, expected_signature, expected_debugging_amounts",
+    [
+        (
+            OrderSide.BUY,
+            "3583573495408175176607395466863691396477755828833392956854203040808810627592",
+            {
+                "r": "0x40b2e5f24aa46de6b738cb52759824d1733fba2ef1e64a140876a8a6de2d65d",
+                "s": "0x75a15959f6039e799180f18596e470b91a9ac12687782973cfa4ef1b6c44b35",
+            },
+            {"collateralAmount": "-43445117", "feeAmount": "26068", "syntheticAmount": "1000"},
+        ),
+        (
+            OrderSide.SELL,
+            "3157066143703603469254133017802938427036337408427038775084098142647193498261",
+            {
+                "r": "0x43d5b6655270ff017e038d8211e61963b327b0c455c5a05f503c575cbaec0b2",
+                "s": "0x2232559d478a2c0ce25960e88244e38d708fc9cfb9859f70ab9ff3aa15bb1da",
+            },
+            {"collateralAmount": "43445116", "feeAmount": "26068", "syntheticAmount": "-1000"},
+        ),
+    ],
+)
+def test_order_hash_and_signature(
+    side, expected_id, expected_signature, expected_debugging_amounts, create_trading_account, create_btc_usd_market
+):
+    from x10.perpetual.configuration import TESTNET_CONFIG
+    from x10.perpetual.order_object import OrderSigningContext, create_order_object
+
+    trading_account = create_trading_account()
+    btc_usd_market = create_btc_usd_market()
+    order_params = dict(
+        amount_of_synthetic=Decimal("0.00100000"),
+        price=Decimal("43445.11680000"),
+        side=side,
+        expire_time=datetime(2024, 1, 5, 1, 8, 56, 860694, tzinfo=timezone.utc),
+        nonce=FROZEN_NONCE,
+        builder_fee=Decimal("0.0001"),
+        builder_id=1,
+    )
+    context = OrderSigningContext.create(
+        account=trading_account,
+        market=btc_usd_market,
+        starknet_domain=TESTNET_CONFIG.starknet_domain,
+    )
+
+    for order_obj in (
+        create_order_object(
+            account=trading_account,
+            market=btc_usd_market,
+            starknet_domain=TESTNET_CONFIG.starknet_domain,
+            **order_params,
+        ),
+        context.build_order(**order_params),
+    ):
+        assert_that(
+            order_obj.to_api_request_json(),
+            has_entries(
+                {
+                    "id": expected_id,
+                    "expiryEpochMillis": 1704416936861,
+                    "settlement": {
+                        "signature": expected_signature,
+                        "starkKey": "0x61c5e7e8339b7d56f197f54ea91b776776690e3232313de0f2ecbd0ef76f466",
+                        "collateralPosition": "10002",
+                    },
+                    "debuggingAmounts": expected_debugging_amounts,
+                }
+            ),
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+async def test_create_order_objects_in_executor(executor_class, create_trading_account, create_btc_usd_market):
+    from x10.perpetual.configuration import TESTNET_CONFIG
+    from x10.perpetual.order_object import (
+        OrderRequest,
+        create_order_object,
+        create_order_objects,
+    )
+
+    trading_account = create_trading_account()
+    btc_usd_market = create_btc_usd_market()
+    expire_time = utc_now() + timedelta(hours=1)
+    requests = [
+        OrderRequest(
+            market=btc_usd_market,
+            amount_of_synthetic=Decimal("0.001") * (i + 1),
+            price=Decimal("43445.1") - i,
+            side=OrderSide.BUY if i % 2 else OrderSide.SELL,
+            expire_time=expire_time,
+            nonce=FROZEN_NONCE + i,
+        )
+        for i in range(5)
+    ]
+
+    with executor_class(max_workers=2) as executor:
+        orders = await create_order_objects(
+            account=trading_account,
+            requests=requests,
+            starknet_domain=TESTNET_CONFIG.starknet_domain,
+            executor=executor,
+            chunk_size=2,
+        )
+
+    assert_that(
+        orders,
+        equal_to(
+            [
+                create_order_object(
+                    account=trading_account,
+                    market=btc_usd_market,
+                    amount_of_synthetic=request.amount_of_synthetic,
+                    price=request.price,
+                    side=request.side,
+                    starknet_domain=TESTNET_CONFIG.starknet_domain,
+                    expire_time=expire_time,
+                    nonce=request.nonce,
+                )
+                for request in requests
+            ]
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_order_objects_generates_distinct_nonces(create_trading_account, create_btc_usd_market):
+    from x10.perpetual.configuration import TESTNET_CONFIG
+    from x10.perpetual.order_object import OrderRequest, create_order_objects
+
+    btc_usd_market = create_btc_usd_market()
+    orders = await create_order_objects(
+        account=create_trading_account(),
+        requests=[
+            OrderRequest(btc_usd_market, Decimal("0.001"), Decimal("43445.1"), OrderSide.BUY) for _ in range(3)
+        ],
+        starknet_domain=TESTNET_CONFIG.starknet_domain,
+    )
+
+    assert_that(len({order.nonce for order in orders}), equal_to(3))
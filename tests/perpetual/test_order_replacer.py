@@ -0,0 +1,127 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to, none
+
+from x10.perpetual.orders import OrderSide, OrderStatus
+
+QTY = Decimal("0.001")
+
+
+@pytest.mark.asyncio
+async def test_replace_chain(create_btc_usd_market, create_trading_account):
+    from x10.perpetual.order_replacer import OrderReplacer
+    from x10.perpetual.trading_client import PerpetualTradingClient
+    from tests.mock_exchange import MockExchange, MockExchangeConfig
+
+    async with MockExchange([create_btc_usd_market()], MockExchangeConfig(orderbook_update_rate=0)) as exchange:
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, create_trading_account())
+        replacer = OrderReplacer(trading_client)
+
+        first = await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000"), OrderSide.BUY)
+        second = await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000.1"), OrderSide.BUY)
+        ask = await replacer.replace("ask", "BTC-USD", QTY, Decimal("60001"), OrderSide.SELL)
+        live_orders = replacer.live_orders
+        await replacer.cancel("ask")
+        await trading_client.close()
+
+        assert_that(exchange.orders[first.data.id].status, equal_to(OrderStatus.CANCELLED))
+        assert_that(exchange.orders[second.data.id].status, equal_to(OrderStatus.NEW))
+        assert_that(exchange.orders[ask.data.id].status, equal_to(OrderStatus.CANCELLED))
+        assert_that(live_orders, equal_to({"bid": second.data.external_id, "ask": ask.data.external_id}))
+        assert_that(replacer.live_orders, equal_to({"bid": second.data.external_id}))
+        assert_that(replacer.in_flight_orders, equal_to({}))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_replaces_are_coalesced(create_btc_usd_market, create_trading_account):
+    from x10.perpetual.order_replacer import OrderReplacer
+    from x10.perpetual.trading_client import PerpetualTradingClient
+    from tests.mock_exchange import MockExchange, MockExchangeConfig
+
+    async with MockExchange([create_btc_usd_market()], MockExchangeConfig(orderbook_update_rate=0)) as exchange:
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, create_trading_account())
+        replacer = OrderReplacer(trading_client)
+        await trading_client.get_signing_context("BTC-USD")
+
+        first = asyncio.create_task(replacer.replace("bid", "BTC-USD", QTY, Decimal("60000"), OrderSide.BUY))
+        await asyncio.sleep(0)
+        in_flight_orders = replacer.in_flight_orders
+        second = asyncio.create_task(replacer.replace("bid", "BTC-USD", QTY, Decimal("60000.1"), OrderSide.BUY))
+        third = asyncio.create_task(replacer.replace("bid", "BTC-USD", QTY, Decimal("60000.2"), OrderSide.BUY))
+        first_response, second_response, third_response = await asyncio.gather(first, second, third)
+        await trading_client.close()
+
+        assert_that(in_flight_orders, equal_to({"bid": first_response.data.external_id}))
+        assert_that(second_response, none())
+        assert_that(exchange.orders[first_response.data.id].status, equal_to(OrderStatus.CANCELLED))
+        assert_that(exchange.orders[third_response.data.id].price, equal_to(Decimal("60000.2")))
+        assert_that(exchange.orders[third_response.data.id].status, equal_to(OrderStatus.NEW))
+        assert_that(replacer.live_orders, equal_to({"bid": third_response.data.external_id}))
+
+
+@pytest.mark.asyncio
+async def test_failed_cancel_marks_the_chain_failed(create_btc_usd_market, create_trading_account):
+    from x10.perpetual.order_replacer import OrderReplacer, ReplaceChainFailedException
+    from x10.perpetual.trading_client import PerpetualTradingClient
+    from tests.mock_exchange import MockExchange, MockExchangeConfig
+
+    async with MockExchange([create_btc_usd_market()], MockExchangeConfig(orderbook_update_rate=0)) as exchange:
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, create_trading_account())
+        replacer = OrderReplacer(trading_client)
+        # Unknown to the exchange, e.g. already filled
+        replacer.track("bid", "unknown-order")
+
+        with pytest.raises(ValueError):
+            await replacer.cancel("bid")
+        failed_orders = replacer.failed_orders
+        live_orders = replacer.live_orders
+        with pytest.raises(ReplaceChainFailedException):
+            await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000"), OrderSide.BUY)
+        replacer.forget("bid")
+        placed = await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000"), OrderSide.BUY)
+        await trading_client.close()
+
+        assert_that(failed_orders, equal_to({"bid": "unknown-order"}))
+        assert_that(live_orders, equal_to({}))
+        assert_that(exchange.orders[placed.data.id].status, equal_to(OrderStatus.NEW))
+        assert_that(replacer.live_orders, equal_to({"bid": placed.data.external_id}))
+        assert_that(replacer.failed_orders, equal_to({}))
+
+
+@pytest.mark.asyncio
+async def test_failed_replace_marks_the_chain_failed(create_btc_usd_market, create_trading_account):
+    from x10.perpetual.order_replacer import OrderReplacer, ReplaceChainFailedException
+    from x10.perpetual.trading_client import PerpetualTradingClient
+    from tests.mock_exchange import MockExchange, MockExchangeConfig
+
+    async with MockExchange([create_btc_usd_market()], MockExchangeConfig(orderbook_update_rate=0)) as exchange:
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, create_trading_account())
+        replacer = OrderReplacer(trading_client)
+        first = await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000"), OrderSide.BUY)
+        place_order = trading_client.orders.place_order
+
+        # Accepted by the exchange, but the response is lost
+        async def place_order_timing_out(order):
+            await place_order(order)
+            raise asyncio.TimeoutError()
+
+        trading_client.orders.place_order = place_order_timing_out
+        with pytest.raises(asyncio.TimeoutError):
+            await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000.1"), OrderSide.BUY)
+        trading_client.orders.place_order = place_order
+        failed_orders = replacer.failed_orders
+        with pytest.raises(ReplaceChainFailedException):
+            await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000.2"), OrderSide.BUY)
+        replacer.track("bid", failed_orders["bid"])
+        third = await replacer.replace("bid", "BTC-USD", QTY, Decimal("60000.2"), OrderSide.BUY)
+        await trading_client.close()
+
+        second = next(order for order in exchange.orders.values() if order.external_id == failed_orders["bid"])
+        assert_that(exchange.orders[first.data.id].status, equal_to(OrderStatus.CANCELLED))
+        assert_that(second.status, equal_to(OrderStatus.CANCELLED))
+        assert_that(exchange.orders[third.data.id].status, equal_to(OrderStatus.NEW))
+        assert_that(replacer.live_orders, equal_to({"bid": third.data.external_id}))
+        assert_that(replacer.failed_orders, equal_to({}))
+        assert_that(replacer.in_flight_orders, equal_to({}))
@@ -0,0 +1,118 @@
+import asyncio
+import decimal
+
+import pytest
+from hamcrest import assert_that, equal_to, none
+
+from x10.perpetual.orders import (
+    OpenOrderModel,
+    OrderSide,
+    OrderStatus,
+    OrderType,
+    PerpetualOrderModel,
+    SelfTradeProtectionLevel,
+    TimeInForce,
+)
+
+
+def create_open_order(order_id: int, status: OrderStatus, updated_time: int, market="BTC-USD", side=OrderSide.BUY):
+    return OpenOrderModel(
+        id=order_id,
+        account_id=1,
+        external_id=f"order-{order_id}",
+        market=market,
+        type=OrderType.LIMIT,
+        side=side,
+        status=status,
+        price=decimal.Decimal("60000"),
+        qty=decimal.Decimal("0.001"),
+        reduce_only=False,
+        post_only=False,
+        created_time=1,
+        updated_time=updated_time,
+    )
+
+
+def test_status_transitions():
+    from x10.perpetual.order_tracker import OrderTracker
+
+    tracker = OrderTracker(max_closed_orders=1)
+    tracker.apply_snapshot(
+        [
+            create_open_order(1, OrderStatus.NEW, 1),
+            create_open_order(2, OrderStatus.NEW, 1, side=OrderSide.SELL),
+            create_open_order(3, OrderStatus.NEW, 1, market="ETH-USD"),
+        ]
+    )
+
+    assert_that([o.id for o in tracker.get_open_orders("BTC-USD")], equal_to([1, 2]))
+    assert_that([o.id for o in tracker.get_open_orders("BTC-USD", OrderSide.SELL)], equal_to([2]))
+    assert_that([o.id for o in tracker.get_open_orders(side=OrderSide.BUY)], equal_to([1, 3]))
+
+    assert_that(tracker.apply_order(create_open_order(1, OrderStatus.PARTIALLY_FILLED, 2)), equal_to(True))
+    assert_that(tracker.apply_order(create_open_order(1, OrderStatus.FILLED, 3)), equal_to(True))
+    assert_that(tracker.apply_order(create_open_order(1, OrderStatus.PARTIALLY_FILLED, 2)), equal_to(False))
+
+    assert_that(tracker.get_order_by_external_id("order-1").status, equal_to(OrderStatus.FILLED))
+    assert_that(tracker.get_open_orders_count("BTC-USD"), equal_to(1))
+    assert_that(tracker.get_open_orders_count("BTC-USD", OrderSide.BUY), equal_to(0))
+
+    tracker.apply_order(create_open_order(2, OrderStatus.CANCELLED, 2, side=OrderSide.SELL))
+
+    assert_that(tracker.get_order(1), none())
+    assert_that(tracker.get_order(2).status, equal_to(OrderStatus.CANCELLED))
+
+    tracker.apply_snapshot([create_open_order(4, OrderStatus.NEW, 4)])
+
+    assert_that([o.id for o in tracker.get_open_orders()], equal_to([4]))
+    assert_that(tracker.get_order(3), none())
+    assert_that(tracker.get_order_by_external_id("order-3"), none())
+
+
+@pytest.mark.asyncio
+async def test_tracks_account_stream(create_btc_usd_market, create_trading_account):
+    from x10.perpetual.order_tracker import OrderTracker
+    from x10.perpetual.stream_client import PerpetualStreamClient
+    from x10.perpetual.trading_client import PerpetualTradingClient
+    from tests.mock_exchange import MockExchange, MockExchangeConfig
+
+    def create_order(external_id: str):
+        return PerpetualOrderModel(
+            id=external_id,
+            market="BTC-USD",
+            type=OrderType.LIMIT,
+            side=OrderSide.BUY,
+            qty=decimal.Decimal("0.001"),
+            price=decimal.Decimal("60000"),
+            time_in_force=TimeInForce.GTT,
+            expiry_epoch_millis=1700000000000,
+            fee=decimal.Decimal("0.0005"),
+            nonce=decimal.Decimal("1"),
+            self_trade_protection_level=SelfTradeProtectionLevel.ACCOUNT,
+        )
+
+    async def wait_until(predicate):
+        async def poll():
+            while not predicate():
+                await asyncio.sleep(0)
+
+        await asyncio.wait_for(poll(), timeout=5)
+
+    async with MockExchange([create_btc_usd_market()], MockExchangeConfig(orderbook_update_rate=0)) as exchange:
+        account = create_trading_account()
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, account)
+        stream_client = PerpetualStreamClient(api_url=exchange.endpoint_config.stream_url)
+        seeded = await trading_client.orders.place_order(create_order("seeded"))
+
+        tracker = OrderTracker()
+        task = await tracker.start(stream_client, trading_client.account, account.api_key)
+        await wait_until(lambda: tracker.get_order(seeded.data.id) is not None)
+        placed = await trading_client.orders.place_order(create_order("placed"))
+        await wait_until(lambda: tracker.get_order(placed.data.id) is not None)
+        await trading_client.orders.cancel_order(seeded.data.id)
+        await wait_until(lambda: tracker.get_order(seeded.data.id).status == OrderStatus.CANCELLED)
+        tracker.stop()
+        await asyncio.gather(task, return_exceptions=True)
+        await trading_client.close()
+
+        assert_that([o.external_id for o in tracker.get_open_orders("BTC-USD")], equal_to(["placed"]))
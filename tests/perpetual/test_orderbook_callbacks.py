@@ -0,0 +1,64 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from tests.fixtures.orderbook import create_orderbook_update
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBook
+
+
+@pytest.mark.asyncio
+async def test_coalesced_callbacks_receive_latest_top_of_book():
+    best_bids = []
+    best_asks = []
+    notified = asyncio.Event()
+
+    def on_best_ask(entry):
+        best_asks.append(entry.price)
+        notified.set()
+
+    orderbook = OrderBook(
+        TESTNET_CONFIG,
+        "BTC-USD",
+        best_ask_change_callback=on_best_ask,
+        best_bid_change_callback=lambda entry: best_bids.append(entry.price),
+        coalesce_callbacks=True,
+    )
+    orderbook.update_orderbook(create_orderbook_update(bid=[("100", "1")], ask=[("102", "1")]))
+    orderbook.update_orderbook(create_orderbook_update(bid=[("101", "1")], ask=[]))
+    orderbook.update_orderbook(create_orderbook_update(bid=[], ask=[("101.5", "1")]))
+
+    assert_that(best_bids, equal_to([]))
+    await notified.wait()
+    orderbook.stop_orderbook()
+
+    assert_that(best_bids, equal_to([Decimal("101")]))
+    assert_that(best_asks, equal_to([Decimal("101.5")]))
+
+
+@pytest.mark.asyncio
+async def test_failing_coalesced_callback_does_not_stop_notifications():
+    best_bids = []
+    notified = asyncio.Event()
+
+    def on_best_bid(entry):
+        best_bids.append(entry.price)
+        if len(best_bids) == 1:
+            raise ValueError("callback failure")
+        notified.set()
+
+    orderbook = OrderBook(
+        TESTNET_CONFIG,
+        "BTC-USD",
+        best_bid_change_callback=on_best_bid,
+        coalesce_callbacks=True,
+    )
+    orderbook.update_orderbook(create_orderbook_update(bid=[("100", "1")], ask=[]))
+    await asyncio.sleep(0)
+    orderbook.update_orderbook(create_orderbook_update(bid=[("101", "1")], ask=[]))
+    await notified.wait()
+    orderbook.stop_orderbook()
+
+    assert_that(best_bids, equal_to([Decimal("100"), Decimal("101")]))
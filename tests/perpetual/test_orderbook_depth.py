@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to, is_, none
+
+from tests.fixtures.orderbook import create_orderbook_update
+from tests.perpetual.test_tick_orderbook import create_trading_config
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import DepthExceededException, OrderBook
+from x10.perpetual.tick_orderbook import TickOrderBook
+
+
+@pytest.fixture(params=["decimal", "tick"])
+def orderbook(request):
+    if request.param == "tick":
+        orderbook = TickOrderBook(
+            TESTNET_CONFIG, "BTC-USD", create_trading_config("1", "1"), max_depth=2
+        )
+    else:
+        orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", max_depth=2)
+    orderbook.init_orderbook(
+        create_orderbook_update(
+            bid=[("100", "1"), ("99", "1"), ("98", "1")],
+            ask=[("101", "1"), ("102", "1"), ("103", "1")],
+        )
+    )
+    return orderbook
+
+
+def test_snapshot_is_trimmed_to_max_depth(orderbook):
+    assert_that(orderbook.is_truncated("SELL"), is_(True))
+    assert_that(orderbook.is_truncated("BUY"), is_(True))
+    assert_that(
+        orderbook.calculate_price_impact_qty(Decimal("2"), "BUY").price,
+        equal_to(Decimal("101.5")),
+    )
+
+    with pytest.raises(DepthExceededException):
+        orderbook.calculate_price_impact_qty(Decimal("3"), "BUY")
+    with pytest.raises(DepthExceededException):
+        orderbook.calculate_price_impact_notional(Decimal("1000"), "SELL")
+
+
+def test_deltas_beyond_tracked_depth_are_ignored(orderbook):
+    orderbook.update_orderbook(create_orderbook_update(bid=[("98", "5")], ask=[("104", "1")]))
+    orderbook.update_orderbook(create_orderbook_update(bid=[("100", "-1")], ask=[]))
+
+    assert_that(orderbook.best_bid().price, equal_to(Decimal("99")))
+    with pytest.raises(DepthExceededException):
+        orderbook.calculate_price_impact_qty(Decimal("2"), "SELL")
+
+
+def test_inserted_levels_trim_the_worst_ones(orderbook):
+    orderbook.update_orderbook(create_orderbook_update(bid=[], ask=[("100", "1")]))
+
+    assert_that(orderbook.best_ask().price, equal_to(Decimal("100")))
+    assert_that(
+        orderbook.calculate_price_impact_qty(Decimal("2"), "BUY").amount,
+        equal_to(Decimal("2")),
+    )
+    with pytest.raises(DepthExceededException):
+        orderbook.calculate_price_impact_qty(Decimal("2.5"), "BUY")
+
+
+def test_batch_flags_sizes_beyond_depth(orderbook):
+    impact = orderbook.calculate_price_impact_qty_batch([1, 3, -1], "BUY")
+
+    assert_that(impact.beyond_depth.tolist(), equal_to([False, True, False]))
+
+
+def test_untruncated_book_returns_none_when_liquidity_is_missing():
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD", max_depth=5)
+    orderbook.init_orderbook(create_orderbook_update(bid=[("100", "1")], ask=[("101", "1")]))
+
+    assert_that(orderbook.is_truncated("BUY"), is_(False))
+    assert_that(orderbook.calculate_price_impact_qty(Decimal("2"), "BUY"), is_(none()))
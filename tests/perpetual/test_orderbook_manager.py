@@ -0,0 +1,202 @@
+import asyncio
+import dataclasses
+from decimal import Decimal
+
+import pytest
+import websockets
+from hamcrest import assert_that, contains_inanyorder, equal_to, is_, none
+
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBook
+from x10.perpetual.orderbook_manager import OrderBookManager
+
+
+def test_events_are_routed_by_market(create_orderbook_update_message):
+    best_bids = []
+    manager = OrderBookManager(
+        TESTNET_CONFIG,
+        best_bid_change_callback=lambda market, entry: best_bids.append(
+            (market, entry.price)
+        ),
+    )
+
+    manager.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")])
+    )
+    manager.apply_stream_event(
+        create_orderbook_update_message(
+            "SNAPSHOT", 2, [("10", "1")], [("11", "1")], market="ETH-USD"
+        )
+    )
+    manager.apply_stream_event(
+        create_orderbook_update_message("DELTA", 3, [("100.5", "1")], [])
+    )
+    manager.apply_stream_event(
+        create_orderbook_update_message("DELTA", 4, [("10.5", "2")], [], market="ETH-USD")
+    )
+
+    assert_that(manager.markets, contains_inanyorder("BTC-USD", "ETH-USD"))
+    assert_that(manager.best_bid("BTC-USD").price, equal_to(Decimal("100.5")))
+    assert_that(manager.best_bid("ETH-USD").amount, equal_to(Decimal("2")))
+    assert_that(manager.best_ask("ETH-USD").price, equal_to(Decimal("11")))
+    assert_that(manager.get_orderbook("SOL-USD"), is_(none()))
+    assert_that(
+        best_bids,
+        equal_to([("BTC-USD", Decimal("100.5")), ("ETH-USD", Decimal("10.5"))]),
+    )
+
+
+def test_untracked_markets_are_ignored(create_orderbook_update_message):
+    manager = OrderBookManager(TESTNET_CONFIG, markets=["ETH-USD"])
+
+    manager.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")])
+    )
+
+    assert_that(manager.markets, equal_to([]))
+    assert_that(manager.best_bid("BTC-USD"), is_(none()))
+
+
+def test_sequence_gap_unsyncs_all_markets(create_orderbook_update_message):
+    manager = OrderBookManager(TESTNET_CONFIG)
+
+    manager.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")])
+    )
+    manager.apply_stream_event(
+        create_orderbook_update_message(
+            "SNAPSHOT", 2, [("10", "1")], [("11", "1")], market="ETH-USD"
+        )
+    )
+    applied = manager.apply_stream_event(
+        create_orderbook_update_message("DELTA", 4, [("99", "1")], [])
+    )
+
+    assert_that(applied, is_(False))
+    assert_that(manager.gap_count, equal_to(1))
+    assert_that(manager.is_synced("BTC-USD"), is_(False))
+    assert_that(manager.is_synced("ETH-USD"), is_(False))
+    assert_that(manager.best_bid("BTC-USD"), is_(none()))
+
+
+def test_off_grid_update_unsyncs_all_markets(create_orderbook_update_message):
+    from tests.perpetual.test_tick_orderbook import create_trading_config
+    from x10.perpetual.tick_orderbook import TickOrderBook
+
+    trading_config = create_trading_config("1", "1")
+    manager = OrderBookManager(
+        TESTNET_CONFIG,
+        orderbook_factory=lambda market: TickOrderBook(TESTNET_CONFIG, market, trading_config),
+    )
+
+    manager.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")])
+    )
+    applied = manager.apply_stream_event(
+        create_orderbook_update_message("DELTA", 2, [("99", "2"), ("98.5", "1")], [])
+    )
+
+    assert_that(applied, is_(False))
+    assert_that(manager.gap_count, equal_to(1))
+    assert_that(manager.is_synced("BTC-USD"), is_(False))
+    assert_that(manager.get_orderbook("BTC-USD"), is_(none()))
+
+
+@pytest.mark.asyncio
+async def test_manager_reconnects_on_sequence_gap(create_orderbook_update_message):
+    connections = 0
+    resynced = asyncio.Event()
+
+    async def serve(websocket):
+        nonlocal connections
+        connections += 1
+        await websocket.send(
+            create_orderbook_update_message(
+                "SNAPSHOT", 1, [("100", "1")], [("101", "1")]
+            ).model_dump_json()
+        )
+        await websocket.send(
+            create_orderbook_update_message(
+                "SNAPSHOT", 2, [("10", "1")], [("11", "1")], market="ETH-USD"
+            ).model_dump_json()
+        )
+        seq = 4 if connections == 1 else 3
+        await websocket.send(
+            create_orderbook_update_message(
+                "DELTA", seq, [("10.5", "1")], [], market="ETH-USD"
+            ).model_dump_json()
+        )
+        await websocket.wait_closed()
+
+    def on_best_bid(market, entry):
+        if market == "ETH-USD" and entry.price == Decimal("10.5"):
+            resynced.set()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        host, port = server.sockets[0].getsockname()
+        endpoint_config = dataclasses.replace(TESTNET_CONFIG, stream_url=f"ws://{host}:{port}")
+        manager = OrderBookManager(
+            endpoint_config,
+            best_bid_change_callback=on_best_bid,
+            orderbook_factory=lambda market: OrderBook(endpoint_config, market, coalesce_callbacks=True),
+        )
+
+        await manager.start()
+        await resynced.wait()
+        manager.stop()
+        await asyncio.sleep(0)
+
+    pending_tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task() and not task.done()]
+    assert_that(pending_tasks, equal_to([]))
+    assert_that(connections, equal_to(2))
+    assert_that(manager.gap_count, equal_to(1))
+    assert_that(manager.resync_count, equal_to(1))
+
+
+@pytest.mark.asyncio
+async def test_manager_reconnects_on_off_grid_update(create_orderbook_update_message):
+    from tests.perpetual.test_tick_orderbook import create_trading_config
+    from x10.perpetual.stream_client.records import FixedPointOrderbookDecoder
+    from x10.perpetual.tick_orderbook import TickOrderBook
+
+    connections = 0
+    resynced = asyncio.Event()
+    trading_config = create_trading_config("1", "1")
+
+    async def serve(websocket):
+        nonlocal connections
+        connections += 1
+        await websocket.send(
+            create_orderbook_update_message(
+                "SNAPSHOT", 1, [("100", "1")], [("101", "1")]
+            ).model_dump_json(by_alias=True)
+        )
+        price = "98.5" if connections == 1 else "99"
+        await websocket.send(
+            create_orderbook_update_message("DELTA", 2, [(price, "1")], []).model_dump_json(by_alias=True)
+        )
+        await websocket.send(
+            create_orderbook_update_message("DELTA", 3, [("100.0", "1")], []).model_dump_json(by_alias=True)
+        )
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        host, port = server.sockets[0].getsockname()
+        endpoint_config = dataclasses.replace(TESTNET_CONFIG, stream_url=f"ws://{host}:{port}")
+        manager = OrderBookManager(
+            endpoint_config,
+            best_bid_change_callback=lambda market, entry: resynced.set(),
+            orderbook_factory=lambda market: TickOrderBook(endpoint_config, market, trading_config),
+            stream_decoder=FixedPointOrderbookDecoder({"BTC-USD": trading_config}),
+        )
+
+        await manager.start()
+        await asyncio.wait_for(resynced.wait(), timeout=5)
+        orderbook = manager.get_orderbook("BTC-USD")
+        manager.stop()
+
+    assert_that(connections, equal_to(2))
+    assert_that(manager.gap_count, equal_to(1))
+    assert_that(manager.resync_count, equal_to(1))
+    assert_that(orderbook.best_bid().amount, equal_to(Decimal("2")))
+    assert_that(list(orderbook._bid_levels.levels()), equal_to([(100, 2), (99, 1)]))
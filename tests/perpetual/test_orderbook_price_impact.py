@@ -1,4 +1,5 @@
 import decimal
+import math
 from unittest import TestCase
 
 from x10.perpetual.configuration import TESTNET_CONFIG
@@ -211,3 +212,54 @@ class TestOrderBook(TestCase):
         qty = decimal.Decimal("1")
         result = self.orderbook.calculate_price_impact_qty(qty, "INVALID_SIDE")
         self.assertIsNone(result, "Result should be None for invalid side.")
+
+    def test_batch_impact_matches_single_queries(self):
+        qtys = ["0.5", "1", "2", "3.5", "4", "5", "0", "-1"]
+        notionals = ["50", "105", "110", "199", "408", "1000", "0"]
+        for side in ("BUY", "SELL"):
+            qty_batch = self.orderbook.calculate_price_impact_qty_batch(
+                [float(qty) for qty in qtys], side
+            )
+            notional_batch = self.orderbook.calculate_price_impact_notional_batch(
+                [float(notional) for notional in notionals], side
+            )
+
+            for i, qty in enumerate(qtys):
+                single = self.orderbook.calculate_price_impact_qty(
+                    decimal.Decimal(qty), side
+                )
+                self.__assert_batch_item(qty_batch, i, single)
+            for i, notional in enumerate(notionals):
+                single = self.orderbook.calculate_price_impact_notional(
+                    decimal.Decimal(notional), side
+                )
+                self.__assert_batch_item(notional_batch, i, single)
+
+    def test_batch_impact_invalid_side(self):
+        self.assertIsNone(self.orderbook.calculate_price_impact_qty_batch([1], "?"))
+        self.assertIsNone(
+            self.orderbook.calculate_price_impact_notional_batch([1], "?")
+        )
+
+    def test_batch_impact_depth_is_recomputed_after_update(self):
+        before = self.orderbook.calculate_price_impact_qty_batch([2], "BUY")
+        self.assertAlmostEqual(before.price[0], 101.5)
+
+        self.orderbook.update_orderbook(
+            OrderbookUpdateModel(
+                market=self.market_name,
+                bid=[],
+                ask=[{"price": decimal.Decimal("101"), "qty": decimal.Decimal("1")}],
+            )
+        )
+
+        after = self.orderbook.calculate_price_impact_qty_batch([2], "BUY")
+        self.assertAlmostEqual(after.price[0], 101)
+
+    def __assert_batch_item(self, batch, i, single):
+        if single is None:
+            self.assertTrue(math.isnan(batch.price[i]))
+            self.assertTrue(math.isnan(batch.amount[i]))
+        else:
+            self.assertAlmostEqual(batch.price[i], float(single.price))
+            self.assertAlmostEqual(batch.amount[i], float(single.amount))
@@ -0,0 +1,166 @@
+import asyncio
+import dataclasses
+from decimal import Decimal
+
+import pytest
+import websockets
+from hamcrest import assert_that, equal_to, is_
+
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbook import OrderBook
+
+
+def test_delta_with_sequence_gap_is_not_applied(create_orderbook_update_message):
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+
+    orderbook.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")])
+    )
+    applied = orderbook.apply_stream_event(
+        create_orderbook_update_message("DELTA", 3, [("100", "1")], [])
+    )
+
+    assert_that(applied, is_(False))
+    assert_that(orderbook.gap_count, equal_to(1))
+    assert_that(orderbook.is_synced, is_(False))
+    assert_that(orderbook.best_bid().amount, equal_to(Decimal("1")))
+
+
+def test_snapshot_replaces_book_after_gap(create_orderbook_update_message):
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+
+    orderbook.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")])
+    )
+    orderbook.apply_stream_event(
+        create_orderbook_update_message("DELTA", 3, [("99", "1")], [])
+    )
+    orderbook.apply_stream_event(
+        create_orderbook_update_message("DELTA", 4, [("98", "1")], [])
+    )
+    orderbook.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("97", "2")], [("102", "3")])
+    )
+    orderbook.apply_stream_event(
+        create_orderbook_update_message("DELTA", 2, [("97", "-1")], [])
+    )
+
+    assert_that(orderbook.is_synced, is_(True))
+    assert_that(orderbook.best_bid().price, equal_to(Decimal("97")))
+    assert_that(orderbook.best_bid().amount, equal_to(Decimal("1")))
+    assert_that(orderbook.best_ask().price, equal_to(Decimal("102")))
+    assert_that(len(orderbook._bid_prices), equal_to(1))
+
+
+def test_events_without_data(create_orderbook_update_message):
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+
+    orderbook.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")])
+    )
+    delta_applied = orderbook.apply_stream_event(
+        create_orderbook_update_message("DELTA", 2, [], []).model_copy(update={"data": None})
+    )
+    snapshot_applied = orderbook.apply_stream_event(
+        create_orderbook_update_message("SNAPSHOT", 3, [], []).model_copy(update={"data": None})
+    )
+
+    assert_that(delta_applied, is_(True))
+    assert_that(snapshot_applied, is_(False))
+    assert_that(orderbook.is_synced, is_(False))
+    assert_that(orderbook.best_bid().amount, equal_to(Decimal("1")))
+
+
+@pytest.mark.asyncio
+async def test_orderbook_reconnects_on_sequence_gap(create_orderbook_update_message):
+    connections = 0
+    resynced = asyncio.Event()
+
+    async def serve(websocket):
+        nonlocal connections
+        connections += 1
+        await websocket.send(
+            create_orderbook_update_message(
+                "SNAPSHOT", 1, [("100", "1")], [("101", "1")]
+            ).model_dump_json()
+        )
+        if connections == 1:
+            await websocket.send(
+                create_orderbook_update_message("DELTA", 3, [("99", "1")], []).model_dump_json()
+            )
+        else:
+            await websocket.send(
+                create_orderbook_update_message("DELTA", 2, [("100.5", "2")], []).model_dump_json()
+            )
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        host, port = server.sockets[0].getsockname()
+        endpoint_config = dataclasses.replace(TESTNET_CONFIG, stream_url=f"ws://{host}:{port}")
+        orderbook = OrderBook(
+            endpoint_config,
+            "BTC-USD",
+            best_bid_change_callback=lambda _: resynced.set(),
+        )
+
+        await orderbook.start_orderbook()
+        await resynced.wait()
+        orderbook.stop_orderbook()
+
+    assert_that(orderbook.gap_count, equal_to(1))
+    assert_that(orderbook.resync_count, equal_to(1))
+    assert_that(orderbook.best_bid().price, equal_to(Decimal("100.5")))
+    assert_that(orderbook._bid_prices.get(Decimal("99")), is_(None))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixed_point_decoding", [False, True])
+async def test_tick_orderbook_reconnects_on_off_grid_update(create_orderbook_update_message, fixed_point_decoding):
+    from tests.perpetual.test_tick_orderbook import create_trading_config
+    from x10.perpetual.tick_orderbook import TickOrderBook
+
+    connections = 0
+    resynced = asyncio.Event()
+
+    async def serve(websocket):
+        nonlocal connections
+        connections += 1
+        await websocket.send(
+            create_orderbook_update_message(
+                "SNAPSHOT", 1, [("100", "1")], [("101", "1")]
+            ).model_dump_json(by_alias=True)
+        )
+        if connections == 1:
+            await websocket.send(
+                create_orderbook_update_message(
+                    "DELTA", 2, [("99", "2"), ("98.5", "1")], []
+                ).model_dump_json(by_alias=True)
+            )
+        else:
+            await websocket.send(
+                create_orderbook_update_message("DELTA", 2, [("100", "1")], []).model_dump_json(by_alias=True)
+            )
+        await websocket.wait_closed()
+
+    async with websockets.serve(serve, "127.0.0.1", 0) as server:
+        host, port = server.sockets[0].getsockname()
+        endpoint_config = dataclasses.replace(TESTNET_CONFIG, stream_url=f"ws://{host}:{port}")
+        orderbook = TickOrderBook(
+            endpoint_config,
+            "BTC-USD",
+            create_trading_config("1", "1"),
+            best_bid_change_callback=lambda _: resynced.set(),
+            fixed_point_decoding=fixed_point_decoding,
+        )
+
+        task = await orderbook.start_orderbook()
+        await asyncio.wait_for(resynced.wait(), timeout=5)
+        task_done = task.done()
+        orderbook.stop_orderbook()
+
+    assert_that(task_done, is_(False))
+    assert_that(orderbook.gap_count, equal_to(1))
+    assert_that(orderbook.resync_count, equal_to(1))
+    assert_that(orderbook.is_synced, is_(True))
+    assert_that(orderbook.best_bid().amount, equal_to(Decimal("2")))
+    assert_that(list(orderbook._bid_levels.levels()), equal_to([(100, 2)]))
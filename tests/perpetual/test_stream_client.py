@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 import websockets
 from hamcrest import assert_that, equal_to
@@ -46,6 +48,21 @@ async def test_orderbook_stream(create_orderbook_message):
         )
 
 
+@pytest.mark.asyncio
+async def test_orderbook_stream_with_bytes_payloads(create_orderbook_message):
+    from x10.perpetual.stream_client import PerpetualStreamClient
+
+    message_model = create_orderbook_message()
+
+    async with websockets.serve(serve_message(message_model.model_dump_json()), "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(api_url=get_url_from_server(server), bytes_payloads=True)
+        stream = await stream_client.subscribe_to_orderbooks()
+        msg = await stream.recv()
+        await stream.close()
+
+        assert_that(msg, equal_to(message_model))
+
+
 @pytest.mark.asyncio
 async def test_account_update_trade_stream(create_account_update_trade_message):
     from x10.perpetual.stream_client import PerpetualStreamClient
@@ -154,3 +171,95 @@ async def test_candle_stream():
                 }
             ),
         )
+
+
+@pytest.mark.asyncio
+async def test_stream_batches(create_orderbook_update_message):
+    from x10.perpetual.stream_client import PerpetualStreamClient
+
+    async def serve_messages(websocket):
+        for seq in range(1, 6):
+            await websocket.send(
+                create_orderbook_update_message("DELTA", seq, [], []).model_dump_json()
+            )
+
+    async with websockets.serve(serve_messages, "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(api_url=get_url_from_server(server))
+        stream = await stream_client.subscribe_to_orderbooks()
+        first_batch = await stream.recv_batch(max_size=1)
+        seqs = [msg.seq for msg in first_batch]
+        async for batch in stream.batches(max_size=2):
+            assert_that(len(batch) <= 2, equal_to(True))
+            seqs.extend(msg.seq for msg in batch)
+            if len(seqs) == 5:
+                break
+        await stream.close()
+
+        assert_that(seqs, equal_to([1, 2, 3, 4, 5]))
+        assert_that(stream.msgs_count, equal_to(5))
+
+
+@pytest.mark.asyncio
+async def test_stream_reconnects(create_orderbook_update_message):
+    from x10.perpetual.stream_client import PerpetualStreamClient
+    from x10.perpetual.stream_client.reconnect import ReconnectPolicy
+
+    connections = 0
+    reconnected = []
+
+    async def serve_messages(websocket):
+        nonlocal connections
+        connections += 1
+        await websocket.send(
+            create_orderbook_update_message("SNAPSHOT", connections, [], []).model_dump_json()
+        )
+        if connections < 3:
+            websocket.transport.abort()
+        else:
+            await websocket.wait_closed()
+
+    async with websockets.serve(serve_messages, "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(
+            api_url=get_url_from_server(server),
+            reconnect_policy=ReconnectPolicy(initial_delay=0, jitter=0),
+        )
+        stream = await stream_client.subscribe_to_orderbooks()
+        stream.on_reconnect = lambda: reconnected.append(stream.msgs_count)
+        seqs = [(await stream.recv()).seq for _ in range(3)]
+        await stream.close()
+
+        assert_that(seqs, equal_to([1, 2, 3]))
+        assert_that(reconnected, equal_to([1, 2]))
+        assert_that(stream.reconnect_stats.reconnect_count, equal_to(2))
+
+
+@pytest.mark.asyncio
+async def test_stream_messages_handled_in_callback(create_orderbook_update_message):
+    from x10.perpetual.stream_client import PerpetualStreamClient
+
+    async def serve_messages(websocket):
+        for seq in range(1, 4):
+            await websocket.send(
+                create_orderbook_update_message("DELTA", seq, [], []).model_dump_json()
+            )
+        await websocket.wait_closed()
+
+    seqs = []
+    received = asyncio.Event()
+
+    def on_message(msg):
+        seqs.append(msg.seq)
+        if msg.seq == 2:
+            raise ValueError("handler failure")
+        if msg.seq == 3:
+            received.set()
+
+    async with websockets.serve(serve_messages, "127.0.0.1", 0) as server:
+        stream_client = PerpetualStreamClient(api_url=get_url_from_server(server))
+        stream = await stream_client.subscribe_to_orderbooks(on_message=on_message)
+        await received.wait()
+        await stream.close()
+        await stream.wait_closed()
+
+        assert_that(seqs, equal_to([1, 2, 3]))
+        assert_that(stream.msgs_count, equal_to(3))
@@ -0,0 +1,73 @@
+import pytest
+from hamcrest import assert_that, equal_to, is_
+
+from x10.perpetual.stream_client.stream_queue import (
+    OverflowPolicy,
+    StreamMsgQueue,
+    StreamQueueConfig,
+)
+
+
+def drain(queue: StreamMsgQueue):
+    payloads = []
+    while not queue.empty():
+        payloads.append(queue.get_nowait())
+    return payloads
+
+
+def test_unbounded_queue_keeps_everything():
+    queue = StreamMsgQueue()
+    for i in range(5):
+        queue.put_nowait(str(i))
+
+    assert_that(drain(queue), equal_to(["0", "1", "2", "3", "4"]))
+
+
+def test_drop_oldest():
+    queue = StreamMsgQueue(StreamQueueConfig(max_size=2))
+    for i in range(5):
+        assert_that(queue.put_nowait(str(i)), is_(True))
+
+    assert_that(queue.dropped_count, equal_to(3))
+    assert_that(drain(queue), equal_to(["3", "4"]))
+
+
+def test_conflate_replaces_message_with_same_key():
+    queue = StreamMsgQueue(
+        StreamQueueConfig(
+            max_size=2,
+            overflow_policy=OverflowPolicy.CONFLATE,
+            conflation_key=lambda payload: payload.split(":")[0],
+        )
+    )
+    for payload in ["BTC:1", "ETH:1", "BTC:2", "BTC:3", "SOL:1"]:
+        queue.put_nowait(payload)
+
+    assert_that(queue.conflated_count, equal_to(2))
+    assert_that(queue.dropped_count, equal_to(1))
+    assert_that(drain(queue), equal_to(["ETH:1", "SOL:1"]))
+
+    queue.put_nowait("BTC:4")
+    queue.put_nowait("BTC:5")
+    assert_that(drain(queue), equal_to(["BTC:4", "BTC:5"]))
+
+
+def test_disconnect_drops_queued_messages():
+    queue = StreamMsgQueue(
+        StreamQueueConfig(max_size=2, overflow_policy=OverflowPolicy.DISCONNECT)
+    )
+    queue.put_nowait("1")
+    queue.put_nowait("2")
+
+    assert_that(queue.put_nowait("3"), is_(False))
+    assert_that(queue.put_nowait("4"), is_(False))
+    assert_that(queue.overflowed, is_(True))
+    assert_that(queue.dropped_count, equal_to(2))
+
+    queue.put_end()
+    assert_that(drain(queue), equal_to([None]))
+
+
+def test_conflation_requires_a_key():
+    with pytest.raises(ValueError):
+        StreamQueueConfig(max_size=2, overflow_policy=OverflowPolicy.CONFLATE)
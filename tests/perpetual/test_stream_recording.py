@@ -0,0 +1,88 @@
+import decimal
+import itertools
+
+import pytest
+import websockets
+from hamcrest import assert_that, equal_to
+
+from tests.perpetual.test_stream_client import get_url_from_server
+
+
+def create_messages(create_orderbook_update_message):
+    return [
+        create_orderbook_update_message(
+            "SNAPSHOT", 1, [("100", "1"), ("99", "2")], [("101", "1")]
+        ).model_dump_json(by_alias=True),
+        create_orderbook_update_message("DELTA", 2, [("100", "-1")], []).model_dump_json(
+            by_alias=True
+        ),
+        create_orderbook_update_message("DELTA", 3, [], [("100.5", "3")]).model_dump_json(
+            by_alias=True
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bytes_payloads", [False, True])
+async def test_record_and_replay_orderbook_stream(tmp_path, create_orderbook_update_message, bytes_payloads):
+    from x10.perpetual.configuration import TESTNET_CONFIG
+    from x10.perpetual.orderbook import OrderBook
+    from x10.perpetual.orderbooks import OrderbookUpdateModel
+    from x10.perpetual.stream_client import PerpetualStreamClient
+    from x10.perpetual.stream_client.recording import (
+        StreamRecorder,
+        StreamReplay,
+        read_recording,
+    )
+    from x10.utils.http import WrappedStreamResponse
+
+    path = str(tmp_path / "orderbook.stream")
+    messages = create_messages(create_orderbook_update_message)
+
+    async def serve_messages(websocket):
+        for message in messages:
+            await websocket.send(message)
+
+    clock = itertools.count(1_000_000_000, 1_000_000)
+    with StreamRecorder(path, clock=lambda: next(clock)) as recorder:
+        async with websockets.serve(serve_messages, "127.0.0.1", 0) as server:
+            stream_client = PerpetualStreamClient(
+                api_url=get_url_from_server(server), bytes_payloads=bytes_payloads, recorder=recorder
+            )
+            stream = await stream_client.subscribe_to_orderbooks()
+            for _ in messages:
+                await stream.recv()
+            await stream.close()
+
+    assert_that(recorder.frames_count, equal_to(3))
+    assert_that(
+        list(read_recording(path)),
+        equal_to(
+            [(1_000_000_000 + i * 1_000_000, message.encode()) for i, message in enumerate(messages)]
+        ),
+    )
+
+    orderbook = OrderBook(TESTNET_CONFIG, "BTC-USD")
+    async with StreamReplay(path, WrappedStreamResponse[OrderbookUpdateModel]) as replay:
+        async for events in replay.batches():
+            assert_that(orderbook.apply_stream_events(events), equal_to(True))
+
+    assert_that(replay.msgs_count, equal_to(3))
+    assert_that(orderbook.best_bid().price, equal_to(decimal.Decimal("99")))
+    assert_that(orderbook.best_ask().price, equal_to(decimal.Decimal("100.5")))
+
+
+@pytest.mark.asyncio
+async def test_replay_at_original_speed_batches_due_frames(tmp_path, create_orderbook_update_message):
+    from x10.perpetual.stream_client.recording import StreamRecorder, StreamReplay
+    from x10.perpetual.stream_client.records import ORDERBOOK_UPDATE_DECODER
+
+    path = str(tmp_path / "orderbook.stream")
+    with StreamRecorder(path, clock=lambda: 1) as recorder:
+        for message in create_messages(create_orderbook_update_message):
+            recorder.record(message)
+
+    async with StreamReplay(path, ORDERBOOK_UPDATE_DECODER, speed=1, bytes_payloads=True) as replay:
+        batches = [[record.seq for record in batch] async for batch in replay.batches(max_size=2)]
+
+    assert_that(batches, equal_to([[1, 2], [3]]))
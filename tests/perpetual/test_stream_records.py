@@ -0,0 +1,195 @@
+from decimal import Decimal
+
+import pytest
+from hamcrest import assert_that, equal_to
+
+from x10.perpetual.orderbooks import OffGridValueException
+from x10.perpetual.stream_client.records import (
+    CANDLES_DECODER,
+    FUNDING_RATE_DECODER,
+    ORDERBOOK_UPDATE_DECODER,
+    PUBLIC_TRADES_DECODER,
+    FixedPointOrderbookDecoder,
+    FixedPointScale,
+    OrderbookTicksRecord,
+    StreamRecordDecoder,
+)
+
+
+def assert_record_matches_model(decoder: StreamRecordDecoder, message_model):
+    record = decoder.model_validate_json(message_model.model_dump_json(by_alias=True))
+
+    assert_that(record.type, equal_to(message_model.type))
+    assert_that(record.ts, equal_to(message_model.ts))
+    assert_that(record.seq, equal_to(message_model.seq))
+    assert_that(record.error, equal_to(message_model.error))
+    assert_that(_to_dict(record.data), equal_to(message_model.model_dump()["data"]))
+
+
+def _to_dict(value):
+    if isinstance(value, list):
+        return [_to_dict(item) for item in value]
+    if hasattr(value, "_asdict"):
+        return {key: _to_dict(item) for key, item in value._asdict().items()}
+    return value
+
+
+def test_orderbook_update_record(create_orderbook_message):
+    assert_record_matches_model(ORDERBOOK_UPDATE_DECODER, create_orderbook_message())
+
+
+def test_candle_records():
+    from tests.fixtures.candles import create_candle_stream_message
+
+    assert_record_matches_model(CANDLES_DECODER, create_candle_stream_message())
+
+
+def test_public_trade_records():
+    from x10.perpetual.trades import PublicTradeModel
+    from x10.utils.http import WrappedStreamResponse
+
+    message_model = WrappedStreamResponse[list[PublicTradeModel]].model_validate(
+        {
+            "type": "SNAPSHOT",
+            "data": [
+                {
+                    "i": 1844000421446684673,
+                    "m": "BTC-USD",
+                    "S": "SELL",
+                    "tT": "TRADE",
+                    "T": 1728478428001,
+                    "p": "62473.0",
+                    "q": "0.01080",
+                }
+            ],
+            "ts": 1728478428063,
+            "seq": 2,
+        }
+    )
+
+    assert_record_matches_model(PUBLIC_TRADES_DECODER, message_model)
+
+
+def test_public_trade_record_holds_enum_values():
+    from x10.perpetual.orders import OrderSide
+    from x10.perpetual.trades import TradeType
+
+    record = PUBLIC_TRADES_DECODER.model_validate_json(
+        '{"data": [{"i": 1, "m": "BTC-USD", "S": "BUY", "tT": "LIQUIDATION", "T": 1,'
+        ' "p": "62473.0", "q": "0.01"}], "ts": 1, "seq": 1}'
+    )
+
+    assert_that(record.data[0].side, equal_to(OrderSide.BUY.value))
+    assert_that(record.data[0].trade_type, equal_to(TradeType.LIQUIDATION.value))
+
+
+def test_funding_rate_record():
+    from x10.perpetual.funding_rates import FundingRateModel
+    from x10.utils.http import WrappedStreamResponse
+
+    message_model = WrappedStreamResponse[FundingRateModel].model_validate(
+        {
+            "data": {"m": "BTC-USD", "f": "0.0001", "T": 1728478800000},
+            "ts": 1728478800123,
+            "seq": 5,
+        }
+    )
+
+    assert_record_matches_model(FUNDING_RATE_DECODER, message_model)
+
+
+def test_unknown_message_type():
+    record = ORDERBOOK_UPDATE_DECODER.model_validate_json(
+        '{"type": "UNEXPECTED", "ts": 1, "seq": 1}'
+    )
+
+    assert_that(record.type, equal_to("UNKNOWN"))
+    assert_that(record.data, equal_to(None))
+
+
+def test_fixed_point_scale():
+    scale = FixedPointScale(Decimal("0.001"))
+
+    assert_that(scale.to_units("43547.100"), equal_to(43547100))
+    assert_that(scale.to_units("-0.0080000"), equal_to(-8))
+    assert_that(scale.to_units("12"), equal_to(12000))
+    assert_that(scale.to_units("1E+1"), equal_to(10000))
+    assert_that(scale.to_decimal(-8), equal_to(Decimal("-0.008")))
+    for value in ("0.0019", "-0.0019", "1.5E-4"):
+        with pytest.raises(OffGridValueException):
+            scale.to_units(value)
+
+
+def test_fixed_point_scale_with_integer_step():
+    scale = FixedPointScale(Decimal("5"))
+
+    assert_that(scale.to_units("15"), equal_to(3))
+    with pytest.raises(OffGridValueException):
+        scale.to_units("17.5")
+
+
+def test_fixed_point_orderbook_update(create_btc_usd_market, create_orderbook_message):
+    message_model = create_orderbook_message()
+    decoder = FixedPointOrderbookDecoder(
+        {"BTC-USD": create_btc_usd_market().trading_config}
+    )
+
+    record = decoder.model_validate_json(message_model.model_dump_json(by_alias=True))
+
+    assert_that(
+        record.data,
+        equal_to(
+            OrderbookTicksRecord(
+                market="BTC-USD",
+                bid=[(435470, 800), (435480, 700)],
+                ask=[(435460, 800)],
+            )
+        ),
+    )
+    assert_that(decoder.to_model(record.data), equal_to(message_model.data))
+
+
+def test_fixed_point_orderbook_update_of_unknown_market(create_orderbook_message):
+    decoder = FixedPointOrderbookDecoder({})
+
+    record = decoder.model_validate_json(
+        create_orderbook_message().model_dump_json(by_alias=True)
+    )
+
+    assert_that(record.seq, equal_to(570))
+    assert_that(record.data, equal_to(None))
+
+
+def test_updates_of_unknown_markets_are_skipped_by_the_manager(
+    create_orderbook_update_message,
+):
+    from tests.perpetual.test_tick_orderbook import create_trading_config
+    from x10.perpetual.configuration import TESTNET_CONFIG
+    from x10.perpetual.orderbook_manager import OrderBookManager
+    from x10.perpetual.tick_orderbook import TickOrderBook
+
+    trading_config = create_trading_config("0.1", "0.001")
+    decoder = FixedPointOrderbookDecoder({"BTC-USD": trading_config})
+    manager = OrderBookManager(
+        TESTNET_CONFIG,
+        orderbook_factory=lambda market: TickOrderBook(
+            TESTNET_CONFIG, market, trading_config
+        ),
+    )
+    messages = [
+        create_orderbook_update_message("SNAPSHOT", 1, [("100", "1")], [("101", "1")]),
+        create_orderbook_update_message(
+            "SNAPSHOT", 2, [("10", "1")], [("11", "1")], market="ETH-USD"
+        ),
+        create_orderbook_update_message("DELTA", 3, [("100.5", "2")], []),
+    ]
+
+    applied = manager.apply_stream_events(
+        decoder.model_validate_json(message.model_dump_json(by_alias=True))
+        for message in messages
+    )
+
+    assert_that(applied, equal_to(True))
+    assert_that(manager.markets, equal_to(["BTC-USD"]))
+    assert_that(manager.best_bid("BTC-USD").price, equal_to(Decimal("100.5")))
+    assert_that(manager.best_bid("BTC-USD").amount, equal_to(Decimal("2")))
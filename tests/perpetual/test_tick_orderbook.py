@@ -0,0 +1,151 @@
+import decimal
+from unittest import TestCase
+
+from tests.fixtures.markets import create_btc_usd_market, get_btc_usd_market_json_data
+from tests.fixtures.orderbook import create_orderbook_update_message
+from tests.perpetual import test_orderbook_price_impact
+from x10.perpetual.configuration import TESTNET_CONFIG
+from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.stream_client.records import OrderbookTicksRecord
+from x10.perpetual.tick_orderbook import OffGridValueException, TickOrderBook
+
+
+def create_trading_config(min_price_change: str, min_order_size_change: str):
+    market = create_btc_usd_market(get_btc_usd_market_json_data())
+    return market.trading_config.model_copy(
+        update={
+            "min_price_change": decimal.Decimal(min_price_change),
+            "min_order_size_change": decimal.Decimal(min_order_size_change),
+        }
+    )
+
+
+class TestTickOrderBook(test_orderbook_price_impact.TestOrderBook):
+    """
+    Runs the `OrderBook` price impact tests against the integer tick engine.
+    """
+
+    def setUp(self):
+        self.endpoint_config = TESTNET_CONFIG
+        self.market_name = "dummy-market"
+        self.orderbook = TickOrderBook(
+            self.endpoint_config,
+            self.market_name,
+            create_trading_config("1", "1"),
+        )
+        self.populate_dummy_data()
+
+
+class TestTickOrderBookUpdates(TestCase):
+    def setUp(self):
+        self.best_bids = []
+        self.orderbook = TickOrderBook(
+            TESTNET_CONFIG,
+            "BTC-USD",
+            create_trading_config("0.1", "0.00001"),
+            best_bid_change_callback=self.best_bids.append,
+        )
+        self.orderbook.init_orderbook(
+            OrderbookUpdateModel(
+                market="BTC-USD",
+                bid=[
+                    {"price": decimal.Decimal("43547.1"), "qty": decimal.Decimal("0.008")},
+                    {"price": decimal.Decimal("43547.0"), "qty": decimal.Decimal("0.007")},
+                ],
+                ask=[
+                    {"price": decimal.Decimal("43548.5"), "qty": decimal.Decimal("0.5")},
+                    {"price": decimal.Decimal("43548.2"), "qty": decimal.Decimal("0.25")},
+                ],
+            )
+        )
+
+    def test_best_levels_are_converted_back_to_decimals(self):
+        self.assertEqual(self.orderbook.best_bid().price, decimal.Decimal("43547.1"))
+        self.assertEqual(self.orderbook.best_bid().amount, decimal.Decimal("0.008"))
+        self.assertEqual(self.orderbook.best_ask().price, decimal.Decimal("43548.2"))
+        self.assertEqual(self.orderbook.best_ask().amount, decimal.Decimal("0.25"))
+
+    def test_delta_removes_and_inserts_levels(self):
+        self.orderbook.update_orderbook(
+            OrderbookUpdateModel(
+                market="BTC-USD",
+                bid=[
+                    {"price": decimal.Decimal("43547.1"), "qty": decimal.Decimal("-0.008")},
+                    {"price": decimal.Decimal("43546.9"), "qty": decimal.Decimal("1")},
+                ],
+                ask=[],
+            )
+        )
+
+        self.assertEqual(self.orderbook.best_bid().price, decimal.Decimal("43547.0"))
+        self.assertEqual(
+            list(self.orderbook._bid_levels.levels()), [(435470, 700), (435469, 100000)]
+        )
+        self.assertEqual(
+            [entry.price for entry in self.best_bids], [decimal.Decimal("43547.0")]
+        )
+
+    def test_off_grid_values_are_rejected(self):
+        self.assertEqual(self.orderbook.to_ticks(decimal.Decimal("-43547.10")), -435471)
+        with self.assertRaises(OffGridValueException):
+            self.orderbook.to_ticks(decimal.Decimal("43547.15"))
+        with self.assertRaises(OffGridValueException):
+            self.orderbook.to_lots(decimal.Decimal("0.000015"))
+
+    def test_off_grid_delta_is_rejected_as_a_whole(self):
+        self.orderbook.apply_stream_event(
+            create_orderbook_update_message("SNAPSHOT", 1, [("43547.1", "0.008")], [("43548.2", "0.25")])
+        )
+
+        applied = self.orderbook.apply_stream_event(
+            create_orderbook_update_message("DELTA", 2, [("43547.1", "0.002"), ("43547.15", "0.001")], [])
+        )
+
+        self.assertFalse(applied)
+        self.assertFalse(self.orderbook.is_synced)
+        self.assertEqual(self.orderbook.gap_count, 1)
+        self.assertEqual(list(self.orderbook._bid_levels.levels()), [(435471, 800)])
+        self.assertEqual(self.best_bids, [])
+
+    def test_off_grid_snapshot_is_rejected_as_a_whole(self):
+        applied = self.orderbook.apply_stream_event(
+            create_orderbook_update_message("SNAPSHOT", 1, [("43546.0", "0.001")], [("43549.05", "0.001")])
+        )
+
+        self.assertFalse(applied)
+        self.assertFalse(self.orderbook.is_synced)
+        self.assertEqual(self.orderbook.best_bid().price, decimal.Decimal("43547.1"))
+
+    def test_qty_impact_on_fractional_steps(self):
+        result = self.orderbook.calculate_price_impact_qty(decimal.Decimal("0.5"), "BUY")
+
+        self.assertEqual(result.amount, decimal.Decimal("0.5"))
+        self.assertEqual(result.price, decimal.Decimal("43548.35"))
+
+    def test_tick_records_are_applied_without_conversion(self):
+        self.orderbook.update_orderbook(
+            OrderbookTicksRecord(
+                market="BTC-USD",
+                bid=[(435471, -800), (435469, 100000)],
+                ask=[(435482, 100)],
+            )
+        )
+
+        self.assertEqual(
+            list(self.orderbook._bid_levels.levels()), [(435470, 700), (435469, 100000)]
+        )
+        self.assertEqual(self.orderbook.best_ask().amount, decimal.Decimal("0.251"))
+        self.assertEqual(
+            [entry.price for entry in self.best_bids], [decimal.Decimal("43547.0")]
+        )
+
+    def test_init_from_tick_record(self):
+        self.orderbook.init_orderbook(
+            OrderbookTicksRecord(
+                market="BTC-USD", bid=[(435460, 5), (435465, 10)], ask=[(435470, 1)]
+            )
+        )
+
+        self.assertEqual(self.orderbook.best_bid().price, decimal.Decimal("43546.5"))
+        self.assertEqual(self.orderbook.best_bid().amount, decimal.Decimal("0.0001"))
+        self.assertEqual(self.orderbook.best_ask().price, decimal.Decimal("43547.0"))
@@ -170,3 +170,109 @@ async def test_get_asset_operations(aiohttp_server, create_asset_operations, cre
             ]
         ),
     )
+
+
+@pytest.mark.asyncio
+async def test_modules_share_http_client():
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    trading_client = PerpetualTradingClient(endpoint_config=TESTNET_CONFIG)
+    clients = [
+        await trading_client.info.get_client(),
+        await trading_client.markets_info.get_client(),
+        await trading_client.account.get_client(),
+        await trading_client.orders.get_client(),
+    ]
+
+    assert_that(len({id(client) for client in clients}), equal_to(1))
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_pooled_connections(aiohttp_server):
+    from x10.perpetual.trading_client import PerpetualTradingClient
+    from x10.utils.http import HttpPoolConfig
+
+    peers = set()
+
+    async def serve_settings(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.Response(text='{"status": "OK", "data": {"starkExContractAddress": ""}}')
+
+    app = web.Application()
+    app.router.add_get("/info/settings", serve_settings)
+
+    server = await aiohttp_server(app)
+    url = f"http://{server.host}:{server.port}"
+
+    endpoint_config = dataclasses.replace(TESTNET_CONFIG, api_base_url=url)
+    trading_client = PerpetualTradingClient(
+        endpoint_config=endpoint_config,
+        http_pool_config=HttpPoolConfig(size=4, warm_connections=3),
+    )
+    warmed = await trading_client.warm_up()
+    await trading_client.info.get_settings()
+    await trading_client.close()
+
+    assert_that(warmed, equal_to(3))
+    assert_that(peers, has_length(3))
+
+
+@pytest.mark.asyncio
+async def test_place_orders(aiohttp_server, create_trading_account):
+    import asyncio
+    import decimal
+
+    from x10.perpetual.orders import OrderSide, OrderType, PerpetualOrderModel
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def place_order(request: web.Request):
+        nonlocal in_flight, max_in_flight
+        order = await request.json()
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        in_flight -= 1
+        if order["id"] == "order-2":
+            return web.Response(status=500, text="")
+        return web.json_response(
+            {"status": "OK", "data": {"id": int(order["id"][6:]), "externalId": order["id"]}}
+        )
+
+    app = web.Application()
+    app.router.add_post("/user/order", place_order)
+    server = await aiohttp_server(app)
+    endpoint_config = dataclasses.replace(TESTNET_CONFIG, api_base_url=f"http://{server.host}:{server.port}")
+    trading_client = PerpetualTradingClient(endpoint_config=endpoint_config, stark_account=create_trading_account())
+    orders = [
+        PerpetualOrderModel(
+            id=f"order-{i}",
+            market="BTC-USD",
+            type=OrderType.LIMIT,
+            side=OrderSide.BUY,
+            qty=decimal.Decimal("0.001"),
+            price=decimal.Decimal("60000") - i,
+            time_in_force="GTT",
+            expiry_epoch_millis=1700000000000,
+            fee=decimal.Decimal("0.0005"),
+            nonce=decimal.Decimal(i),
+            self_trade_protection_level="ACCOUNT",
+        )
+        for i in range(5)
+    ]
+
+    result = await trading_client.orders.place_orders(orders, max_concurrency=2)
+    await trading_client.close()
+
+    assert_that([r.order.id for r in result.results], equal_to([order.id for order in orders]))
+    assert_that([r.ok for r in result.results], equal_to([True, True, False, True, True]))
+    assert_that(
+        [r.response.data.external_id for r in result.results if r.ok],
+        equal_to(["order-0", "order-1", "order-3", "order-4"]),
+    )
+    assert_that(result.errors_count, equal_to(1))
+    assert_that(max_in_flight <= 2, equal_to(True))
+    assert_that(result.elapsed >= result.max_elapsed, equal_to(True))
@@ -0,0 +1,96 @@
+import decimal
+
+import pytest
+from hamcrest import assert_that, equal_to, has_length
+
+from x10.perpetual.orders import (
+    OrderSide,
+    OrderStatus,
+    OrderType,
+    PerpetualOrderModel,
+    SelfTradeProtectionLevel,
+    TimeInForce,
+)
+from tests.mock_exchange import MockExchange, MockExchangeConfig
+
+
+def create_order(external_id: str, cancel_id: str | None = None):
+    return PerpetualOrderModel(
+        id=external_id,
+        market="BTC-USD",
+        type=OrderType.LIMIT,
+        side=OrderSide.BUY,
+        qty=decimal.Decimal("0.001"),
+        price=decimal.Decimal("60000"),
+        time_in_force=TimeInForce.GTT,
+        expiry_epoch_millis=1700000000000,
+        fee=decimal.Decimal("0.0005"),
+        nonce=decimal.Decimal("1"),
+        self_trade_protection_level=SelfTradeProtectionLevel.ACCOUNT,
+        cancel_id=cancel_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_orders_lifecycle(create_btc_usd_market, create_trading_account):
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    async with MockExchange([create_btc_usd_market()], MockExchangeConfig(seed=1)) as exchange:
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, create_trading_account())
+
+        markets = await trading_client.markets_info.get_markets(market_names=["BTC-USD"])
+        first = await trading_client.orders.place_order(create_order("first"))
+        second = await trading_client.orders.place_order(create_order("second", cancel_id="first"))
+        open_orders = await trading_client.account.get_open_orders()
+        await trading_client.orders.cancel_order(second.data.id)
+        await trading_client.close()
+
+        assert_that(markets.data, has_length(1))
+        assert_that(markets.data[0].name, equal_to("BTC-USD"))
+        assert_that([order.external_id for order in open_orders.data], equal_to(["second"]))
+        assert_that(exchange.orders[first.data.id].status, equal_to(OrderStatus.CANCELLED))
+        assert_that(exchange.orders[second.data.id].status, equal_to(OrderStatus.CANCELLED))
+        assert_that(exchange.requests_count, equal_to(5))
+
+
+@pytest.mark.asyncio
+async def test_injected_errors(create_btc_usd_market):
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    config = MockExchangeConfig(error_rate=1, error_status=503)
+    async with MockExchange([create_btc_usd_market()], config) as exchange:
+        trading_client = PerpetualTradingClient(exchange.endpoint_config)
+
+        with pytest.raises(ValueError) as exc_info:
+            await trading_client.markets_info.get_markets()
+        await trading_client.close()
+
+        assert_that("code 503" in str(exc_info.value), equal_to(True))
+        assert_that(exchange.errors_count, equal_to(1))
+
+
+@pytest.mark.asyncio
+async def test_streams(create_btc_usd_market, create_trading_account):
+    from x10.perpetual.orderbook import OrderBook
+    from x10.perpetual.stream_client import PerpetualStreamClient
+    from x10.perpetual.trading_client import PerpetualTradingClient
+
+    config = MockExchangeConfig(orderbook_update_rate=0, orderbook_levels=5)
+    async with MockExchange([create_btc_usd_market()], config) as exchange:
+        stream_client = PerpetualStreamClient(api_url=exchange.endpoint_config.stream_url)
+        trading_client = PerpetualTradingClient(exchange.endpoint_config, create_trading_account())
+        orderbook = OrderBook(exchange.endpoint_config, "BTC-USD")
+
+        async with stream_client.subscribe_to_orderbooks("BTC-USD") as stream:
+            orderbook.apply_stream_event(await stream.recv())
+        async with stream_client.subscribe_to_account_updates("api_key") as stream:
+            snapshot = await stream.recv()
+            placed = await trading_client.orders.place_order(create_order("first"))
+            update = await stream.recv()
+        await trading_client.close()
+
+        assert_that(orderbook.best_bid().price < orderbook.best_ask().price, equal_to(True))
+        assert_that(orderbook.best_ask().price - orderbook.best_bid().price, equal_to(decimal.Decimal("0.2")))
+        assert_that(snapshot.data.orders, equal_to([]))
+        assert_that(update.type, equal_to("ORDER"))
+        assert_that(update.data.orders[0].id, equal_to(placed.data.id))
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from hamcrest import assert_that, equal_to, raises
+from hamcrest import assert_that, equal_to, raises, same_instance
 
 from x10.utils.http import get_url
 
@@ -49,3 +49,51 @@ def test_generate_valid_url_from_template():
     assert_that(
         get_url("/info/candles/<market?>", market=None), equal_to("/info/candles")
     )
+
+
+def test_response_validator_is_built_once():
+    from typing import List
+
+    from x10.perpetual.orders import PlacedOrderModel
+    from x10.utils.http import get_response_validator, parse_response_to_model
+
+    validator = get_response_validator(List[PlacedOrderModel])
+    response = parse_response_to_model(
+        '{"status": "OK", "data": [{"id": 1, "externalId": "order-1"}]}',
+        List[PlacedOrderModel],
+    )
+
+    assert_that(get_response_validator(List[PlacedOrderModel]), same_instance(validator))
+    assert_that(response.status, equal_to("OK"))
+    assert_that(response.data, equal_to([PlacedOrderModel(id=1, external_id="order-1")]))
+
+
+def test_lazy_stream_response(create_account_update_trade_message):
+    from x10.perpetual.accounts import AccountStreamDataModel
+    from x10.utils.http import LazyStreamResponseParser
+
+    message_model = create_account_update_trade_message()
+    parser = LazyStreamResponseParser(AccountStreamDataModel)
+
+    msg = parser.model_validate_json(message_model.model_dump_json(by_alias=True))
+
+    assert_that(msg.type, equal_to("TRADE"))
+    assert_that(msg.seq, equal_to(570))
+    assert_that(msg.get_data_field("trades"), equal_to(message_model.data.trades))
+    assert_that(msg.get_data_field("orders"), equal_to(None))
+    assert_that(msg.data, equal_to(message_model.data))
+    assert_that(msg.data, same_instance(msg.data))
+
+
+def test_lazy_stream_response_unknown_type(create_account_update_unknown_message):
+    from x10.perpetual.accounts import AccountStreamDataModel
+    from x10.utils.http import LazyStreamResponseParser
+
+    message_model = create_account_update_unknown_message()
+    parser = LazyStreamResponseParser(AccountStreamDataModel)
+
+    msg = parser.model_validate_json(message_model.model_dump_json())
+
+    assert_that(msg.type, equal_to("UNKNOWN"))
+    assert_that(msg.data, equal_to(None))
+    assert_that(msg.get_data_field("orders"), equal_to(None))
@@ -0,0 +1,236 @@
+"""
+Orders built and signed ahead of time, for a ladder of prices and sizes known in
+advance (e.g. by a market maker):
+
+    context = await trading_client.get_signing_context("BTC-USD")
+    pool = PresignedOrderPool(context, depth=2)
+    pool.set_ladder(
+        LadderLevel(side, price, qty)
+        for side, price in itertools.product(OrderSide, prices)
+        for qty in sizes
+    )
+    await pool.start()
+    ...
+    order = pool.take(OrderSide.BUY, Decimal("60000"), Decimal("0.01"))
+    if order is not None:
+        await trading_client.orders.place_order(order)
+
+Hashing and signing run on an executor, the send path only picks a ready order.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional
+
+from x10.perpetual.order_object import OrderSigningContext
+from x10.perpetual.orders import (
+    OrderSide,
+    PerpetualOrderModel,
+    SelfTradeProtectionLevel,
+    TimeInForce,
+)
+from x10.utils.date import to_epoch_millis, utc_now
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+
+class LadderLevel(NamedTuple):
+    side: OrderSide
+    price: Decimal
+    qty: Decimal
+
+
+class PresignedOrderPool:
+    """
+    Keeps `depth` ready orders (each with its own nonce) for every level of a
+    ladder. Orders are created with an expiration of `ttl`, and evicted once they
+    expire within `min_time_to_expiry`, so that a taken order is always valid for at
+    least that long.
+
+    A pre-signed order can only be placed once: `take` removes it from the pool, and
+    the background refill (`start`) or `refill` replaces it.
+    """
+
+    def __init__(
+        self,
+        context: OrderSigningContext,
+        depth: int = 1,
+        ttl: timedelta = timedelta(hours=1),
+        min_time_to_expiry: timedelta = timedelta(minutes=5),
+        post_only: bool = False,
+        time_in_force: TimeInForce = TimeInForce.GTT,
+        self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+        executor: Optional[Executor] = None,
+        clock: Callable[[], datetime] = utc_now,
+    ):
+        """
+        :param executor: executor running the signing in the background, the default
+        executor of the loop if `None`.
+        """
+
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        if ttl <= min_time_to_expiry:
+            raise ValueError("ttl must be longer than min_time_to_expiry")
+        self.__context = context
+        self.__depth = depth
+        self.__ttl = ttl
+        self.__min_time_to_expiry = min_time_to_expiry
+        self.__post_only = post_only
+        self.__time_in_force = time_in_force
+        self.__self_trade_protection_level = self_trade_protection_level
+        self.__executor = executor
+        self.__clock = clock
+        self.__orders: Dict[LadderLevel, Deque[PerpetualOrderModel]] = {}
+        self.__changed = asyncio.Event()
+        self.__task: Optional[asyncio.Task] = None
+
+    @property
+    def levels(self) -> List[LadderLevel]:
+        return list(self.__orders)
+
+    def set_ladder(self, levels: Iterable[LadderLevel]):
+        """
+        Replaces the levels of the ladder. Ready orders of the levels kept are kept.
+        """
+
+        orders: Dict[LadderLevel, Deque[PerpetualOrderModel]] = {}
+        for level in levels:
+            level = LadderLevel(*level)
+            orders[level] = self.__orders.get(level) or deque()
+        self.__orders = orders
+        self.__changed.set()
+
+    def available(self, side: OrderSide, price: Decimal, qty: Decimal) -> int:
+        return len(self.__orders.get(LadderLevel(side, price, qty), ()))
+
+    def take(
+        self,
+        side: OrderSide,
+        price: Decimal,
+        qty: Decimal,
+        previous_order_external_id: Optional[str] = None,
+    ) -> Optional[PerpetualOrderModel]:
+        """
+        Removes a ready order of a level from the pool, `None` if the level has none
+        (or isn't part of the ladder).
+
+        :param previous_order_external_id: order to replace. The cancel id isn't part
+        of the signed payload, so any pre-signed order can replace an order.
+        """
+
+        orders = self.__orders.get(LadderLevel(side, price, qty))
+        if not orders:
+            return None
+        min_expiry_millis = self.__get_min_expiry_millis()
+        order = None
+        while orders:
+            candidate = orders.popleft()
+            if candidate.expiry_epoch_millis > min_expiry_millis:
+                order = candidate
+                break
+        self.__changed.set()
+        if order is None or previous_order_external_id is None:
+            return order
+        return order.model_copy(update={"cancel_id": previous_order_external_id})
+
+    def evict_expired(self) -> int:
+        """
+        Removes the orders expiring within `min_time_to_expiry`, returns their count.
+        """
+
+        min_expiry_millis = self.__get_min_expiry_millis()
+        evicted_count = 0
+        for orders in self.__orders.values():
+            # Orders of a level are created in order, so expire in order
+            while orders and orders[0].expiry_epoch_millis <= min_expiry_millis:
+                orders.popleft()
+                evicted_count += 1
+        if evicted_count:
+            self.__changed.set()
+        return evicted_count
+
+    def fill(self) -> int:
+        """
+        Builds the missing orders on the calling thread, returns their count.
+        """
+
+        self.evict_expired()
+        built_count = 0
+        for level in self.__get_missing_levels():
+            self.__put(level, self.__build(level))
+            built_count += 1
+        return built_count
+
+    async def refill(self) -> int:
+        """
+        Same as `fill`, with the orders built on the executor.
+        """
+
+        loop = asyncio.get_running_loop()
+        self.evict_expired()
+        built_count = 0
+        for level in self.__get_missing_levels():
+            order = await loop.run_in_executor(self.__executor, self.__build, level)
+            self.__put(level, order)
+            built_count += 1
+        return built_count
+
+    async def start(self, interval: float = 1.0) -> asyncio.Task:
+        """
+        Refills the pool in the background: after every `take` or ladder change, and
+        at least every `interval` seconds to replace the expiring orders.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        async def inner():
+            while True:
+                self.__changed.clear()
+                try:
+                    await self.refill()
+                except Exception:
+                    LOGGER.exception("Failed to refill the pre-signed orders")
+                try:
+                    await asyncio.wait_for(self.__changed.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        self.__task = loop.create_task(inner())
+        return self.__task
+
+    def stop(self):
+        if self.__task:
+            self.__task.cancel()
+            self.__task = None
+
+    def __get_min_expiry_millis(self) -> int:
+        return to_epoch_millis(self.__clock() + self.__min_time_to_expiry)
+
+    def __get_missing_levels(self) -> List[LadderLevel]:
+        # Breadth first, so that every level gets a ready order before any second one
+        missing: List[LadderLevel] = []
+        for count in range(self.__depth):
+            missing.extend(level for level, orders in self.__orders.items() if len(orders) <= count)
+        return missing
+
+    def __build(self, level: LadderLevel) -> PerpetualOrderModel:
+        return self.__context.build_order(
+            amount_of_synthetic=level.qty,
+            price=level.price,
+            side=level.side,
+            post_only=self.__post_only,
+            expire_time=self.__clock() + self.__ttl,
+            time_in_force=self.__time_in_force,
+            self_trade_protection_level=self.__self_trade_protection_level,
+        )
+
+    def __put(self, level: LadderLevel, order: PerpetualOrderModel):
+        orders = self.__orders.get(level)
+        # The level may have been removed from the ladder while the order was built
+        if orders is not None and len(orders) < self.__depth:
+            orders.append(order)
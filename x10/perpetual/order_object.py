@@ -1,7 +1,12 @@
+import asyncio
+import dataclasses
+import decimal
 import math
+from concurrent.futures import Executor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Callable, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from fast_stark_crypto import get_order_msg_hash
 
@@ -10,8 +15,6 @@ from x10.perpetual.amounts import (
     ROUNDING_BUY_CONTEXT,
     ROUNDING_FEE_CONTEXT,
     ROUNDING_SELL_CONTEXT,
-    HumanReadableAmount,
-    StarkAmount,
 )
 from x10.perpetual.configuration import StarknetDomain
 from x10.perpetual.fees import DEFAULT_FEES, TradingFeeModel
@@ -52,28 +55,19 @@ def create_order_object(
     Creates an order object to be placed on the exchange using the `place_order` method.
     """
 
-    if expire_time is None:
-        expire_time = utc_now() + timedelta(hours=1)
-
-    fees = account.trading_fee.get(market.name, DEFAULT_FEES)
-
-    return __create_order_object(
-        market=market,
-        synthetic_amount=amount_of_synthetic,
+    context = OrderSigningContext.create(
+        account=account, market=market, starknet_domain=starknet_domain
+    )
+    return context.build_order(
+        amount_of_synthetic=amount_of_synthetic,
         price=price,
         side=side,
-        collateral_position_id=account.vault,
-        fees=fees,
-        signer=account.sign,
-        public_key=account.public_key,
-        exact_only=False,
-        expire_time=expire_time,
         post_only=post_only,
         previous_order_external_id=previous_order_external_id,
+        expire_time=expire_time,
         order_external_id=order_external_id,
         time_in_force=time_in_force,
         self_trade_protection_level=self_trade_protection_level,
-        starknet_domain=starknet_domain,
         nonce=nonce,
         builder_fee=builder_fee,
         builder_id=builder_id,
@@ -81,134 +75,258 @@ def create_order_object(
     )
 
 
-def __create_order_object(
-    market: MarketModel,
-    synthetic_amount: Decimal,
-    price: Decimal,
-    side: OrderSide,
-    collateral_position_id: int,
-    fees: TradingFeeModel,
-    signer: Callable[[int], Tuple[int, int]],
-    public_key: int,
+@dataclass(frozen=True)
+class OrderRequest:
+    """
+    Parameters of an order created by `create_order_objects`, same as the ones of
+    `create_order_object`.
+    """
+
+    market: MarketModel
+    amount_of_synthetic: Decimal
+    price: Decimal
+    side: OrderSide
+    post_only: bool = False
+    previous_order_external_id: Optional[str] = None
+    expire_time: Optional[datetime] = None
+    order_external_id: Optional[str] = None
+    time_in_force: TimeInForce = TimeInForce.GTT
+    self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT
+    nonce: Optional[int] = None
+    builder_fee: Optional[Decimal] = None
+    builder_id: Optional[int] = None
+    reduce_only: bool = False
+
+
+DEFAULT_ORDERS_CHUNK_SIZE = 10
+
+
+async def create_order_objects(
+    account: StarkPerpetualAccount,
+    requests: Sequence[OrderRequest],
     starknet_domain: StarknetDomain,
-    exact_only: bool = False,
-    expire_time: Optional[datetime] = None,
-    post_only: bool = False,
-    previous_order_external_id: Optional[str] = None,
-    order_external_id: Optional[str] = None,
-    time_in_force: TimeInForce = TimeInForce.GTT,
-    self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
-    nonce: Optional[int] = None,
-    builder_fee: Optional[Decimal] = None,
-    builder_id: Optional[int] = None,
-    reduce_only: bool = False,
-) -> PerpetualOrderModel:
-    if exact_only:
-        raise NotImplementedError("`exact_only` option is not supported yet")
-
-    if expire_time is None:
-        raise ValueError("`expire_time` must be provided")
-    if nonce is None:
-        nonce = generate_nonce()
-    is_buying_synthetic = side == OrderSide.BUY
-    rounding_context = ROUNDING_BUY_CONTEXT if is_buying_synthetic else ROUNDING_SELL_CONTEXT
-
-    collateral_amount_human = HumanReadableAmount(synthetic_amount * price, market.collateral_asset)
-    synthetic_amount_human = HumanReadableAmount(synthetic_amount, market.synthetic_asset)
-    total_fee = fees.taker_fee_rate + (builder_fee if builder_fee is not None else 0)
-    fee_amount_human = HumanReadableAmount(
-        total_fee * collateral_amount_human.value,
-        market.collateral_asset,
-    )
-    fee_rate = fees.taker_fee_rate
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_ORDERS_CHUNK_SIZE,
+    signing_contexts: Optional["OrderSigningContexts"] = None,
+) -> List[PerpetualOrderModel]:
+    """
+    Creates a batch of order objects, hashing and signing them on an executor so that
+    the event loop stays free meanwhile. Orders are returned in the requests order.
 
-    stark_collateral_amount: StarkAmount = collateral_amount_human.to_stark_amount(rounding_context=rounding_context)
-    stark_synthetic_amount: StarkAmount = synthetic_amount_human.to_stark_amount(rounding_context=rounding_context)
-    stark_fee_amount: StarkAmount = fee_amount_human.to_stark_amount(rounding_context=ROUNDING_FEE_CONTEXT)
+    :param executor: thread or process pool running the chunks of orders, the default
+    executor of the loop if `None`. With a process pool, the account and the markets
+    are sent to the worker processes.
+    :param chunk_size: number of orders built per executor job.
+    :param signing_contexts: signing contexts of the account to reuse.
+    """
 
-    if is_buying_synthetic:
-        stark_collateral_amount = stark_collateral_amount.negate()
-    else:
-        stark_synthetic_amount = stark_synthetic_amount.negate()
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if signing_contexts is None:
+        signing_contexts = OrderSigningContexts(account, starknet_domain)
 
-    debugging_amounts = StarkDebuggingOrderAmountsModel(
-        collateral_amount=Decimal(stark_collateral_amount.value),
-        fee_amount=Decimal(stark_fee_amount.value),
-        synthetic_amount=Decimal(stark_synthetic_amount.value),
-    )
+    # Defaults are resolved here: worker processes forked from the same parent share
+    # the random state, they would generate the same nonces
+    now = utc_now()
+    jobs: List[List[Tuple[OrderSigningContext, OrderRequest]]] = []
+    for start in range(0, len(requests), chunk_size):
+        jobs.append(
+            [
+                (
+                    signing_contexts.get(request.market),
+                    dataclasses.replace(
+                        request,
+                        expire_time=request.expire_time or now + timedelta(hours=1),
+                        nonce=request.nonce if request.nonce is not None else generate_nonce(),
+                    ),
+                )
+                for request in requests[start:start + chunk_size]
+            ]
+        )
 
-    order_hash = hash_order(
-        amount_synthetic=stark_synthetic_amount,
-        amount_collateral=stark_collateral_amount,
-        max_fee=stark_fee_amount,
-        nonce=nonce,
-        position_id=collateral_position_id,
-        expiration_timestamp=expire_time,
-        public_key=public_key,
-        starknet_domain=starknet_domain,
-    )
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(*(loop.run_in_executor(executor, _build_orders, job) for job in jobs))
+    return [order for chunk in chunks for order in chunk]
 
-    (order_signature_r, order_signature_s) = signer(order_hash)
-    settlement = StarkSettlementModel(
-        signature=SettlementSignatureModel(r=order_signature_r, s=order_signature_s),
-        stark_key=public_key,
-        collateral_position=Decimal(collateral_position_id),
-    )
 
-    order_id = str(order_hash) if order_external_id is None else order_external_id
-    order = PerpetualOrderModel(
-        id=order_id,
-        market=market.name,
-        type=OrderType.LIMIT,
-        side=side,
-        qty=synthetic_amount_human.value,
-        price=price,
-        post_only=post_only,
-        time_in_force=time_in_force,
-        expiry_epoch_millis=to_epoch_millis(expire_time),
-        fee=fee_rate,
-        self_trade_protection_level=self_trade_protection_level,
-        nonce=Decimal(nonce),
-        cancel_id=previous_order_external_id,
-        settlement=settlement,
-        debugging_amounts=debugging_amounts,
-        builderFee=builder_fee,
-        builderId=builder_id,
-        reduce_only=reduce_only,
-    )
+def _build_orders(job: List[Tuple["OrderSigningContext", OrderRequest]]) -> List[PerpetualOrderModel]:
+    return [
+        context.build_order(
+            amount_of_synthetic=request.amount_of_synthetic,
+            price=request.price,
+            side=request.side,
+            post_only=request.post_only,
+            previous_order_external_id=request.previous_order_external_id,
+            expire_time=request.expire_time,
+            order_external_id=request.order_external_id,
+            time_in_force=request.time_in_force,
+            self_trade_protection_level=request.self_trade_protection_level,
+            nonce=request.nonce,
+            builder_fee=request.builder_fee,
+            builder_id=request.builder_id,
+            reduce_only=request.reduce_only,
+        )
+        for context, request in job
+    ]
 
-    return order
 
+@dataclass(frozen=True)
+class OrderSigningContext:
+    """
+    Everything `create_order_object` derives from the market, the account and the
+    signing domain, computed once: parsed asset ids, resolutions, fees and domain
+    fields. Build it once per market and create the orders with `build_order`.
 
-def hash_order(
-    amount_synthetic: StarkAmount,
-    amount_collateral: StarkAmount,
-    max_fee: StarkAmount,
-    nonce: int,
-    position_id: int,
-    expiration_timestamp: datetime,
-    public_key: int,
-    starknet_domain: StarknetDomain,
-) -> int:
-    synthetic_asset = amount_synthetic.asset
-    collateral_asset = amount_collateral.asset
-
-    expire_time_with_buffer = expiration_timestamp + timedelta(days=14)
-    expire_time_as_seconds = math.ceil(expire_time_with_buffer.timestamp())
-
-    return get_order_msg_hash(
-        position_id=position_id,
-        base_asset_id=int(synthetic_asset.settlement_external_id, 16),
-        base_amount=amount_synthetic.value,
-        quote_asset_id=int(collateral_asset.settlement_external_id, 16),
-        quote_amount=amount_collateral.value,
-        fee_amount=max_fee.value,
-        fee_asset_id=int(collateral_asset.settlement_external_id, 16),
-        expiration=expire_time_as_seconds,
-        salt=nonce,
-        user_public_key=public_key,
-        domain_name=starknet_domain.name,
-        domain_version=starknet_domain.version,
-        domain_chain_id=starknet_domain.chain_id,
-        domain_revision=starknet_domain.revision,
-    )
\ No newline at end of file
+    The context has to be re-created when the account fees change.
+    """
+
+    market: MarketModel
+    fees: TradingFeeModel
+    signer: Callable[[int], Tuple[int, int]]
+    public_key: int
+    collateral_position_id: int
+    starknet_domain: StarknetDomain
+    synthetic_asset_id: int
+    collateral_asset_id: int
+    synthetic_resolution: Decimal
+    collateral_resolution: Decimal
+
+    @staticmethod
+    def create(
+        account: StarkPerpetualAccount,
+        market: MarketModel,
+        starknet_domain: StarknetDomain,
+        fees: Optional[TradingFeeModel] = None,
+    ) -> "OrderSigningContext":
+        """
+        :param fees: fees of the market, the account fees by default.
+        """
+
+        return OrderSigningContext(
+            market=market,
+            fees=fees or account.trading_fee.get(market.name, DEFAULT_FEES),
+            signer=account.sign,
+            public_key=account.public_key,
+            collateral_position_id=account.vault,
+            starknet_domain=starknet_domain,
+            synthetic_asset_id=int(market.synthetic_asset.settlement_external_id, 16),
+            collateral_asset_id=int(market.collateral_asset.settlement_external_id, 16),
+            synthetic_resolution=Decimal(market.synthetic_asset.settlement_resolution),
+            collateral_resolution=Decimal(market.collateral_asset.settlement_resolution),
+        )
+
+    def build_order(
+        self,
+        amount_of_synthetic: Decimal,
+        price: Decimal,
+        side: OrderSide,
+        post_only: bool = False,
+        previous_order_external_id: Optional[str] = None,
+        expire_time: Optional[datetime] = None,
+        order_external_id: Optional[str] = None,
+        time_in_force: TimeInForce = TimeInForce.GTT,
+        self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+        nonce: Optional[int] = None,
+        builder_fee: Optional[Decimal] = None,
+        builder_id: Optional[int] = None,
+        reduce_only: bool = False,
+    ) -> PerpetualOrderModel:
+        """
+        Same as `create_order_object`, for the market of the context.
+        """
+
+        if expire_time is None:
+            expire_time = utc_now() + timedelta(hours=1)
+        if nonce is None:
+            nonce = generate_nonce()
+        is_buying_synthetic = side == OrderSide.BUY
+        rounding_context = ROUNDING_BUY_CONTEXT if is_buying_synthetic else ROUNDING_SELL_CONTEXT
+
+        collateral_amount = amount_of_synthetic * price
+        total_fee = self.fees.taker_fee_rate + (builder_fee if builder_fee is not None else 0)
+        stark_collateral_amount = _to_stark_quantity(collateral_amount, self.collateral_resolution, rounding_context)
+        stark_synthetic_amount = _to_stark_quantity(amount_of_synthetic, self.synthetic_resolution, rounding_context)
+        stark_fee_amount = _to_stark_quantity(
+            total_fee * collateral_amount, self.collateral_resolution, ROUNDING_FEE_CONTEXT
+        )
+
+        if is_buying_synthetic:
+            stark_collateral_amount = -stark_collateral_amount
+        else:
+            stark_synthetic_amount = -stark_synthetic_amount
+
+        domain = self.starknet_domain
+        order_hash = get_order_msg_hash(
+            position_id=self.collateral_position_id,
+            base_asset_id=self.synthetic_asset_id,
+            base_amount=stark_synthetic_amount,
+            quote_asset_id=self.collateral_asset_id,
+            quote_amount=stark_collateral_amount,
+            fee_amount=stark_fee_amount,
+            fee_asset_id=self.collateral_asset_id,
+            expiration=math.ceil((expire_time + timedelta(days=14)).timestamp()),
+            salt=nonce,
+            user_public_key=self.public_key,
+            domain_name=domain.name,
+            domain_version=domain.version,
+            domain_chain_id=domain.chain_id,
+            domain_revision=domain.revision,
+        )
+
+        (order_signature_r, order_signature_s) = self.signer(order_hash)
+        settlement = StarkSettlementModel(
+            signature=SettlementSignatureModel(r=order_signature_r, s=order_signature_s),
+            stark_key=self.public_key,
+            collateral_position=Decimal(self.collateral_position_id),
+        )
+        debugging_amounts = StarkDebuggingOrderAmountsModel(
+            collateral_amount=Decimal(stark_collateral_amount),
+            fee_amount=Decimal(stark_fee_amount),
+            synthetic_amount=Decimal(stark_synthetic_amount),
+        )
+
+        return PerpetualOrderModel(
+            id=str(order_hash) if order_external_id is None else order_external_id,
+            market=self.market.name,
+            type=OrderType.LIMIT,
+            side=side,
+            qty=amount_of_synthetic,
+            price=price,
+            post_only=post_only,
+            time_in_force=time_in_force,
+            expiry_epoch_millis=to_epoch_millis(expire_time),
+            fee=self.fees.taker_fee_rate,
+            self_trade_protection_level=self_trade_protection_level,
+            nonce=Decimal(nonce),
+            cancel_id=previous_order_external_id,
+            settlement=settlement,
+            debugging_amounts=debugging_amounts,
+            builderFee=builder_fee,
+            builderId=builder_id,
+            reduce_only=reduce_only,
+        )
+
+
+class OrderSigningContexts:
+    """
+    Signing contexts of an account, by market. A context is re-created when it's
+    requested for another `MarketModel` instance or the account fees have changed.
+    """
+
+    def __init__(self, account: StarkPerpetualAccount, starknet_domain: StarknetDomain):
+        self.__account = account
+        self.__starknet_domain = starknet_domain
+        self.__contexts: Dict[str, OrderSigningContext] = {}
+
+    def get(self, market: MarketModel) -> OrderSigningContext:
+        context = self.__contexts.get(market.name)
+        fees = self.__account.trading_fee.get(market.name, DEFAULT_FEES)
+        if context is None or context.market is not market or context.fees is not fees:
+            context = OrderSigningContext.create(self.__account, market, self.__starknet_domain, fees)
+            self.__contexts[market.name] = context
+        return context
+
+
+def _to_stark_quantity(value: Decimal, resolution: Decimal, rounding_context: decimal.Context) -> int:
+    # Same as `Asset.convert_human_readable_to_stark_quantity`
+    return int(rounding_context.multiply(value, resolution).to_integral(context=rounding_context))
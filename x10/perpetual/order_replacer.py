@@ -0,0 +1,215 @@
+"""
+Replace chains of orders: a chain is a slot (e.g. the first bid level of a quote)
+whose live order is replaced in one request, the replacement cancelling it through
+its `cancel_id`:
+
+    replacer = OrderReplacer(trading_client)
+    await replacer.replace("BTC-USD:bid:0", "BTC-USD", qty, price, OrderSide.BUY)
+    ...
+    await replacer.replace("BTC-USD:bid:0", "BTC-USD", qty, new_price, OrderSide.BUY)
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Hashable, Optional
+
+from x10.errors import X10Error
+from x10.perpetual.orders import (
+    OrderSide,
+    PlacedOrderModel,
+    SelfTradeProtectionLevel,
+    TimeInForce,
+)
+from x10.perpetual.trading_client import PerpetualTradingClient
+from x10.utils.http import WrappedApiResponse
+
+
+class ReplaceChainFailedException(X10Error):
+    """
+    Raised when replacing on a chain whose last request failed (see
+    `OrderReplacer.failed_orders`).
+    """
+
+
+@dataclass
+class _ReplaceChain:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # External id of the last order accepted by the API
+    live_external_id: Optional[str] = None
+    # External id of the order being sent
+    in_flight_external_id: Optional[str] = None
+    # External id of the order whose request (placement or cancel) failed, it may
+    # be live
+    failed_external_id: Optional[str] = None
+    # Sequence number of the last requested replace, the ones requested before it
+    # and still waiting for the chain are superseded
+    last_request: int = 0
+
+
+class OrderReplacer:
+    """
+    Tracks the live order of each chain, and builds its replacement with the right
+    cancel id. A chain has at most one request in flight: a replace waits for the
+    response of the previous one (not for its acknowledgement on the account
+    stream), and replaces requested meanwhile are coalesced, only the latest one is
+    sent. Replaces of different chains are sent concurrently.
+
+    A chain must be forgotten (`forget`) once its live order is filled or cancelled
+    otherwise than through the replacer, the next replace then places a new order.
+
+    A chain whose last request failed (e.g. timed out) is marked failed: the state of
+    its orders is unknown, the failed order may have been accepted anyway, and a
+    failed replacement may or may not have cancelled the previous order. The chain
+    is neither replaced (which could leave an order live next to its replacement)
+    nor cancelled until it's `track`ed again, with its actual live order, or
+    `forget`-ed.
+    """
+
+    def __init__(self, trading_client: PerpetualTradingClient):
+        self.__trading_client = trading_client
+        self.__chains: Dict[Hashable, _ReplaceChain] = {}
+
+    @property
+    def live_orders(self) -> Dict[Hashable, str]:
+        """
+        External ids of the live orders, by chain.
+        """
+
+        return {
+            key: chain.live_external_id
+            for key, chain in self.__chains.items()
+            if chain.live_external_id is not None
+        }
+
+    @property
+    def in_flight_orders(self) -> Dict[Hashable, str]:
+        """
+        External ids of the orders being sent, by chain.
+        """
+
+        return {
+            key: chain.in_flight_external_id
+            for key, chain in self.__chains.items()
+            if chain.in_flight_external_id is not None
+        }
+
+    @property
+    def failed_orders(self) -> Dict[Hashable, str]:
+        """
+        External ids of the orders whose request failed, by chain.
+        """
+
+        return {
+            key: chain.failed_external_id
+            for key, chain in self.__chains.items()
+            if chain.failed_external_id is not None
+        }
+
+    def track(self, key: Hashable, external_id: str):
+        """
+        Makes an order placed without the replacer the live order of a chain.
+        """
+
+        chain = self.__get_chain(key)
+        chain.live_external_id = external_id
+        chain.failed_external_id = None
+
+    def forget(self, key: Hashable):
+        chain = self.__chains.get(key)
+        if chain is not None:
+            chain.live_external_id = None
+            chain.failed_external_id = None
+
+    async def replace(
+        self,
+        key: Hashable,
+        market_name: str,
+        amount_of_synthetic: Decimal,
+        price: Decimal,
+        side: OrderSide,
+        post_only: bool = False,
+        expire_time: Optional[datetime] = None,
+        time_in_force: TimeInForce = TimeInForce.GTT,
+        self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+        external_id: Optional[str] = None,
+        builder_fee: Optional[Decimal] = None,
+        builder_id: Optional[int] = None,
+    ) -> Optional[WrappedApiResponse[PlacedOrderModel]]:
+        """
+        Replaces the live order of a chain (or places its first order), returns the
+        API response, `None` if the replace was superseded by a later one before it
+        could be sent.
+
+        If the request fails, the chain is marked failed and the error is raised.
+        Raises `ReplaceChainFailedException` if the chain is marked failed.
+        """
+
+        chain = self.__get_chain(key)
+        chain.last_request += 1
+        request = chain.last_request
+
+        async with chain.lock:
+            if request != chain.last_request:
+                return None
+            if chain.failed_external_id is not None:
+                raise ReplaceChainFailedException(
+                    f"Request of order {chain.failed_external_id} failed, track or forget the chain {key}"
+                )
+
+            signing_context = await self.__trading_client.get_signing_context(market_name)
+            order = signing_context.build_order(
+                amount_of_synthetic=amount_of_synthetic,
+                price=price,
+                side=side,
+                post_only=post_only,
+                previous_order_external_id=chain.live_external_id,
+                expire_time=expire_time,
+                order_external_id=external_id,
+                time_in_force=time_in_force,
+                self_trade_protection_level=self_trade_protection_level,
+                builder_fee=builder_fee,
+                builder_id=builder_id,
+            )
+
+            chain.in_flight_external_id = order.id
+            try:
+                response = await self.__trading_client.orders.place_order(order)
+            # Including the cancellation of the task, the order may have been sent
+            except BaseException:
+                chain.failed_external_id = order.id
+                chain.live_external_id = None
+                raise
+            finally:
+                chain.in_flight_external_id = None
+            chain.live_external_id = order.id
+            return response
+
+    async def cancel(self, key: Hashable):
+        """
+        Cancels the live order of a chain, and the replaces waiting for it.
+
+        If the request fails, the chain is marked failed and the error is raised.
+        """
+
+        chain = self.__get_chain(key)
+        chain.last_request += 1
+
+        async with chain.lock:
+            if chain.live_external_id is None:
+                return
+            try:
+                await self.__trading_client.orders.cancel_order_by_external_id(chain.live_external_id)
+            except BaseException:
+                chain.failed_external_id = chain.live_external_id
+                raise
+            finally:
+                chain.live_external_id = None
+
+    def __get_chain(self, key: Hashable) -> _ReplaceChain:
+        chain = self.__chains.get(key)
+        if chain is None:
+            chain = _ReplaceChain()
+            self.__chains[key] = chain
+        return chain
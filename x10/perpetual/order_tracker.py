@@ -0,0 +1,189 @@
+"""
+State of the account's own orders, kept in memory from the account stream:
+
+    tracker = OrderTracker()
+    await tracker.start(stream_client, trading_client.account, api_key)
+    ...
+    open_bids = tracker.get_open_orders("BTC-USD", OrderSide.BUY)
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from x10.perpetual.accounts import AccountStreamDataModel
+from x10.perpetual.orders import OpenOrderModel, OrderSide, OrderStatus
+from x10.perpetual.stream_client import PerpetualStreamClient
+from x10.perpetual.trading_client.account_module import AccountModule
+from x10.utils.http import LazyStreamResponse, StreamDataType, WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+OPEN_ORDER_STATUSES = frozenset(
+    [OrderStatus.NEW, OrderStatus.UNTRIGGERED, OrderStatus.PARTIALLY_FILLED]
+)
+DEFAULT_MAX_CLOSED_ORDERS = 1000
+
+AccountStreamEvent = (
+    WrappedStreamResponse[AccountStreamDataModel]
+    | LazyStreamResponse[AccountStreamDataModel]
+)
+
+
+class OrderTracker:
+    """
+    Orders of the account indexed by id, external id, market and side. The state is
+    seeded from the open orders of the REST API (`seed`) and updated from the
+    `ORDER` updates and snapshots of the account stream.
+
+    An update older (by `updated_time`) than the known state of its order is
+    ignored, so that a late update doesn't revert a status transition. Closed
+    orders (filled, cancelled, ...) are kept, the `max_closed_orders` most recent
+    ones, to answer their status and to recognize their late updates.
+    """
+
+    def __init__(self, max_closed_orders: int = DEFAULT_MAX_CLOSED_ORDERS):
+        self.__max_closed_orders = max_closed_orders
+        self.__orders: Dict[int, OpenOrderModel] = {}
+        self.__ids_by_external_id: Dict[str, int] = {}
+        self.__open_by_market: Dict[str, Dict[int, OpenOrderModel]] = {}
+        self.__open_by_market_side: Dict[Tuple[str, OrderSide], Dict[int, OpenOrderModel]] = {}
+        self.__closed_ids: OrderedDict[int, None] = OrderedDict()
+        self.__task: Optional[asyncio.Task] = None
+
+    def get_order(self, order_id: int) -> Optional[OpenOrderModel]:
+        return self.__orders.get(order_id)
+
+    def get_order_by_external_id(self, external_id: str) -> Optional[OpenOrderModel]:
+        order_id = self.__ids_by_external_id.get(external_id)
+        return None if order_id is None else self.__orders.get(order_id)
+
+    def get_open_orders(
+        self, market_name: Optional[str] = None, side: Optional[OrderSide] = None
+    ) -> List[OpenOrderModel]:
+        if market_name is None:
+            return [
+                order
+                for orders in self.__open_by_market.values()
+                for order in orders.values()
+                if side is None or order.side == side
+            ]
+        if side is None:
+            orders = self.__open_by_market.get(market_name)
+        else:
+            orders = self.__open_by_market_side.get((market_name, side))
+        return list(orders.values()) if orders else []
+
+    def get_open_orders_count(
+        self, market_name: str, side: Optional[OrderSide] = None
+    ) -> int:
+        if side is None:
+            return len(self.__open_by_market.get(market_name, ()))
+        return len(self.__open_by_market_side.get((market_name, side), ()))
+
+    def apply_order(self, order: OpenOrderModel) -> bool:
+        """
+        Applies the state of an order, returns `False` if it was older than the known
+        one (and so ignored).
+        """
+
+        current = self.__orders.get(order.id)
+        if current is not None:
+            if order.updated_time < current.updated_time:
+                return False
+            self.__remove_open(current)
+
+        self.__orders[order.id] = order
+        self.__ids_by_external_id[order.external_id] = order.id
+        if order.status in OPEN_ORDER_STATUSES:
+            self.__closed_ids.pop(order.id, None)
+            self.__open_by_market.setdefault(order.market, {})[order.id] = order
+            self.__open_by_market_side.setdefault((order.market, order.side), {})[order.id] = order
+        else:
+            self.__closed_ids[order.id] = None
+            self.__closed_ids.move_to_end(order.id)
+            while len(self.__closed_ids) > self.__max_closed_orders:
+                self.__forget(self.__closed_ids.popitem(last=False)[0])
+        return True
+
+    def apply_orders(self, orders: Iterable[OpenOrderModel]):
+        for order in orders:
+            self.apply_order(order)
+
+    def apply_snapshot(self, orders: Iterable[OpenOrderModel]):
+        """
+        Applies the full list of the open orders: the tracked open orders missing
+        from it are no longer open, their final state is unknown so they're dropped.
+        """
+
+        orders = list(orders)
+        snapshot_ids = {order.id for order in orders}
+        for order in self.get_open_orders():
+            if order.id not in snapshot_ids:
+                self.__remove_open(order)
+                self.__forget(order.id)
+        self.apply_orders(orders)
+
+    def apply_stream_event(self, event: AccountStreamEvent):
+        if event.type not in (StreamDataType.SNAPSHOT.value, StreamDataType.ORDER.value):
+            return
+        if isinstance(event, LazyStreamResponse):
+            orders = event.get_data_field("orders")
+        else:
+            orders = event.data.orders if event.data else None
+        if event.type == StreamDataType.SNAPSHOT.value:
+            self.apply_snapshot(orders or [])
+        elif orders:
+            self.apply_orders(orders)
+
+    async def seed(self, account_module: AccountModule):
+        """
+        Seeds the state from the open orders of the REST API.
+        """
+
+        response = await account_module.get_open_orders()
+        self.apply_snapshot(response.data or [])
+
+    async def start(
+        self,
+        stream_client: PerpetualStreamClient,
+        account_module: AccountModule,
+        api_key: str,
+    ) -> asyncio.Task:
+        """
+        Seeds the state, then keeps it up to date from the account stream. The stream
+        is subscribed to before seeding, so that no update is missed in between.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        async def inner():
+            async with stream_client.subscribe_to_account_updates(api_key, lazy=True) as stream:
+                await self.seed(account_module)
+                async for event in stream:
+                    try:
+                        self.apply_stream_event(event)
+                    except Exception:
+                        LOGGER.exception("Failed to apply an account stream update")
+
+        self.__task = loop.create_task(inner())
+        return self.__task
+
+    def stop(self):
+        if self.__task:
+            self.__task.cancel()
+            self.__task = None
+
+    def __remove_open(self, order: OpenOrderModel):
+        market_orders = self.__open_by_market.get(order.market)
+        if market_orders is not None:
+            market_orders.pop(order.id, None)
+        side_orders = self.__open_by_market_side.get((order.market, order.side))
+        if side_orders is not None:
+            side_orders.pop(order.id, None)
+
+    def __forget(self, order_id: int):
+        order = self.__orders.pop(order_id, None)
+        if order is not None and self.__ids_by_external_id.get(order.external_id) == order_id:
+            del self.__ids_by_external_id[order.external_id]
@@ -1,14 +1,30 @@
 import asyncio
 import dataclasses
 import decimal
-from typing import Callable, Iterable, Tuple
+from typing import Callable, Iterable, Sequence, Tuple
 
+import numpy as np
 from sortedcontainers import SortedDict  # type: ignore[import-untyped]
 
+from x10.errors import X10Error
 from x10.perpetual.configuration import EndpointConfig
-from x10.perpetual.orderbooks import OrderbookUpdateModel
+from x10.perpetual.orderbooks import OffGridValueException, OrderbookUpdateModel
+from x10.perpetual.stream_client.perpetual_stream_connection import StreamMsgParser
 from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
-from x10.utils.http import StreamDataType
+from x10.perpetual.stream_client.stream_queue import (
+    StreamOverflowException,
+    StreamQueueConfig,
+)
+from x10.utils.http import StreamDataType, WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+
+class DepthExceededException(X10Error):
+    """
+    Raised when a query needs more levels than the book tracks (see `max_depth`).
+    """
 
 
 @dataclasses.dataclass
@@ -26,6 +42,98 @@ class ImpactDetails:
     amount: decimal.Decimal
 
 
+@dataclasses.dataclass
+class BatchImpactDetails:
+    """
+    Average fill prices and filled amounts, one per requested size.
+    `NaN` marks sizes that can't be filled by the book (or aren't positive),
+    `beyond_depth` flags the ones that might be filled by levels trimmed off a
+    depth-limited book.
+    """
+
+    price: np.ndarray
+    amount: np.ndarray
+    beyond_depth: np.ndarray
+
+
+@dataclasses.dataclass
+class _CumulativeDepth:
+    """
+    Levels of one side of the book, from the best to the worst one, with the
+    running totals of quantity and notional (both starting with 0).
+    """
+
+    prices: np.ndarray
+    cum_qty: np.ndarray
+    cum_notional: np.ndarray
+
+    @staticmethod
+    def from_levels(prices: np.ndarray, qtys: np.ndarray) -> "_CumulativeDepth":
+        cum_qty = np.zeros(len(qtys) + 1)
+        cum_notional = np.zeros(len(qtys) + 1)
+        np.cumsum(qtys, out=cum_qty[1:])
+        np.cumsum(prices * qtys, out=cum_notional[1:])
+        return _CumulativeDepth(prices, cum_qty, cum_notional)
+
+
+class _TopOfBookNotifier:
+    """
+    Runs the best bid/ask change callbacks of a book on a separate task. Changes
+    are only flagged during ingestion, the callbacks then receive the top of the
+    book as it is when they run: changes made in between are coalesced.
+    """
+
+    def __init__(self, orderbook: "OrderBook", min_interval: float):
+        self.__orderbook = orderbook
+        self.__min_interval = min_interval
+        self.__bid_changed = False
+        self.__ask_changed = False
+        self.__pending = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+
+    def notify(self, *, bid: bool = False, ask: bool = False):
+        self.__bid_changed |= bid
+        self.__ask_changed |= ask
+        if self.__task is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop to run on (e.g. a book updated by hand)
+                self.__dispatch()
+                return
+            self.__task = loop.create_task(self.__run())
+        self.__pending.set()
+
+    def stop(self):
+        if self.__task:
+            self.__task.cancel()
+            self.__task = None
+
+    async def __run(self):
+        while True:
+            await self.__pending.wait()
+            self.__pending.clear()
+            try:
+                self.__dispatch()
+            except Exception:
+                LOGGER.exception("Orderbook callback failed")
+            if self.__min_interval > 0:
+                await asyncio.sleep(self.__min_interval)
+
+    def __dispatch(self):
+        orderbook = self.__orderbook
+        if self.__bid_changed:
+            self.__bid_changed = False
+            best_bid = orderbook.best_bid()
+            if best_bid and orderbook.best_bid_change_callback:
+                orderbook.best_bid_change_callback(best_bid)
+        if self.__ask_changed:
+            self.__ask_changed = False
+            best_ask = orderbook.best_ask()
+            if best_ask and orderbook.best_ask_change_callback:
+                orderbook.best_ask_change_callback(best_ask)
+
+
 class OrderBook:
     @staticmethod
     async def create(
@@ -34,12 +142,20 @@ class OrderBook:
         best_ask_change_callback: Callable[[OrderBookEntry], None] | None = None,
         best_bid_change_callback: Callable[[OrderBookEntry], None] | None = None,
         start=False,
+        max_depth: int | None = None,
+        coalesce_callbacks=False,
+        min_callback_interval: float = 0,
+        stream_queue_config: StreamQueueConfig | None = None,
     ) -> "OrderBook":
         ob = OrderBook(
             endpoint_config,
             market_name,
             best_ask_change_callback,
             best_bid_change_callback,
+            max_depth,
+            coalesce_callbacks,
+            min_callback_interval,
+            stream_queue_config,
         )
         if start:
             await ob.start_orderbook()
@@ -51,18 +167,73 @@ class OrderBook:
         market_name: str,
         best_ask_change_callback: Callable[[OrderBookEntry], None] | None = None,
         best_bid_change_callback: Callable[[OrderBookEntry], None] | None = None,
+        max_depth: int | None = None,
+        coalesce_callbacks=False,
+        min_callback_interval: float = 0,
+        stream_queue_config: StreamQueueConfig | None = None,
     ) -> None:
-        self.__stream_client = PerpetualStreamClient(api_url=endpoint_config.stream_url)
+        """
+        :param max_depth: number of levels tracked per side, all levels if `None`.
+        Deltas are relative, so once a side has been trimmed, levels beyond its worst
+        tracked price are ignored until the next snapshot: the tracked depth can then
+        temporarily shrink below `max_depth`. Queries needing the trimmed levels raise
+        `DepthExceededException`.
+        :param coalesce_callbacks: run the best bid/ask change callbacks on a separate
+        task instead of inside the stream loop. They then receive the latest top of
+        the book only, at most once per `min_callback_interval` seconds.
+        :param stream_queue_config: bounds the queue of the orderbook stream, the book
+        resyncs when it's disconnected by an overflow.
+        """
+
+        if max_depth is not None and max_depth < 1:
+            raise ValueError("max_depth must be positive")
+        self.__stream_client = PerpetualStreamClient(
+            api_url=endpoint_config.stream_url, queue_config=stream_queue_config
+        )
         self.__market_name = market_name
         self.__task: asyncio.Task | None = None
         self._bid_prices: SortedDict[decimal.Decimal, OrderBookEntry] = SortedDict()
         self._ask_prices: SortedDict[decimal.Decimal, OrderBookEntry] = SortedDict()
         self.best_ask_change_callback = best_ask_change_callback
         self.best_bid_change_callback = best_bid_change_callback
+        self.__notifier = (
+            _TopOfBookNotifier(self, min_callback_interval)
+            if coalesce_callbacks
+            else None
+        )
+        self._bid_depth: _CumulativeDepth | None = None
+        self._ask_depth: _CumulativeDepth | None = None
+        self.max_depth = max_depth
+        # Worst tracked price of a trimmed side, levels beyond it are unknown
+        self._bid_boundary: decimal.Decimal | None = None
+        self._ask_boundary: decimal.Decimal | None = None
+        self.__last_seq: int | None = None
+        self.__gap_count = 0
+        self.__resync_count = 0
+
+    @property
+    def is_synced(self) -> bool:
+        """
+        `True` once a snapshot has been applied and no sequence gap has been seen since.
+        """
+
+        return self.__last_seq is not None
+
+    @property
+    def gap_count(self) -> int:
+        return self.__gap_count
+
+    @property
+    def resync_count(self) -> int:
+        return self.__resync_count
 
     def update_orderbook(self, data: OrderbookUpdateModel):
+        self._invalidate_depth(bids=bool(data.bid), asks=bool(data.ask))
         best_bid_before_update = self.best_bid()
+        bid_boundary = self._bid_boundary
         for bid in data.bid:
+            if bid_boundary is not None and bid.price < bid_boundary:
+                continue
             if bid.price in self._bid_prices:
                 existing_bid_entry: OrderBookEntry = self._bid_prices.get(bid.price)
                 existing_bid_entry.amount = existing_bid_entry.amount + bid.qty
@@ -73,13 +244,16 @@ class OrderBook:
                     price=bid.price,
                     amount=bid.qty,
                 )
+        self.__trim_bids()
         now_best_bid = self.best_bid()
         if now_best_bid and best_bid_before_update != now_best_bid:
-            if self.best_bid_change_callback:
-                self.best_bid_change_callback(now_best_bid)
+            self._on_best_bid_change()
 
         best_ask_before_update = self.best_ask()
+        ask_boundary = self._ask_boundary
         for ask in data.ask:
+            if ask_boundary is not None and ask.price > ask_boundary:
+                continue
             if ask.price in self._ask_prices:
                 existing_ask_entry: OrderBookEntry = self._ask_prices.get(ask.price)
                 existing_ask_entry.amount = existing_ask_entry.amount + ask.qty
@@ -90,12 +264,29 @@ class OrderBook:
                     price=ask.price,
                     amount=ask.qty,
                 )
+        self.__trim_asks()
         now_best_ask = self.best_ask()
         if now_best_ask and best_ask_before_update != now_best_ask:
-            if self.best_ask_change_callback:
-                self.best_ask_change_callback(now_best_ask)
+            self._on_best_ask_change()
+
+    def _on_best_bid_change(self):
+        if self.__notifier:
+            self.__notifier.notify(bid=True)
+        elif self.best_bid_change_callback:
+            self.best_bid_change_callback(self.best_bid())
+
+    def _on_best_ask_change(self):
+        if self.__notifier:
+            self.__notifier.notify(ask=True)
+        elif self.best_ask_change_callback:
+            self.best_ask_change_callback(self.best_ask())
 
     def init_orderbook(self, data: OrderbookUpdateModel):
+        self._invalidate_depth(bids=True, asks=True)
+        self._bid_prices.clear()
+        self._ask_prices.clear()
+        self._bid_boundary = None
+        self._ask_boundary = None
         for bid in data.bid:
             self._bid_prices[bid.price] = OrderBookEntry(
                 price=bid.price,
@@ -106,19 +297,136 @@ class OrderBook:
                 price=ask.price,
                 amount=ask.qty,
             )
+        self.__trim_bids()
+        self.__trim_asks()
+
+    def __trim_bids(self):
+        if self.max_depth is None or len(self._bid_prices) <= self.max_depth:
+            return
+        for _ in range(len(self._bid_prices) - self.max_depth):
+            self._bid_prices.popitem(0)
+        self._bid_boundary = self._bid_prices.peekitem(0)[0]
+
+    def __trim_asks(self):
+        if self.max_depth is None or len(self._ask_prices) <= self.max_depth:
+            return
+        for _ in range(len(self._ask_prices) - self.max_depth):
+            self._ask_prices.popitem(-1)
+        self._ask_boundary = self._ask_prices.peekitem(-1)[0]
+
+    def is_truncated(self, side: str) -> bool:
+        """
+        `True` if levels of the side consumed by `side` orders ("SELL" for bids,
+        "BUY" for asks) have been trimmed, so the book only knows part of it.
+        """
+
+        if side == "SELL":
+            return self._bid_boundary is not None
+        elif side == "BUY":
+            return self._ask_boundary is not None
+        return False
+
+    def apply_stream_event(
+        self, event: WrappedStreamResponse[OrderbookUpdateModel]
+    ) -> bool:
+        """
+        Applies a stream message to the book, checking that its `seq` follows the
+        previously applied one.
+
+        Returns `False` if a sequence gap (or a snapshot without data, or an update
+        off the tick and lot grid of the market) was detected. The book is then out
+        of sync and deltas are ignored until the next snapshot is applied.
+        """
+
+        if event.type == StreamDataType.SNAPSHOT.value:
+            if event.data is None:
+                LOGGER.warning("Orderbook %s snapshot without data", self.__market_name)
+                self.__last_seq = None
+                return False
+            try:
+                self.init_orderbook(event.data)
+            except OffGridValueException as exception:
+                return self.__reject_update(exception)
+            self.__last_seq = event.seq
+            return True
+
+        if event.type != StreamDataType.DELTA.value:
+            return True
+
+        if self.__last_seq is None:
+            return True
+
+        if event.seq != self.__last_seq + 1:
+            LOGGER.warning(
+                "Orderbook %s sequence gap: expected %s, received %s",
+                self.__market_name,
+                self.__last_seq + 1,
+                event.seq,
+            )
+            self.__gap_count += 1
+            self.__last_seq = None
+            return False
+
+        # A delta without data has nothing to apply, its `seq` still counts
+        if event.data is not None:
+            try:
+                self.update_orderbook(event.data)
+            except OffGridValueException as exception:
+                return self.__reject_update(exception)
+        self.__last_seq = event.seq
+        return True
+
+    def __reject_update(self, exception: OffGridValueException) -> bool:
+        # The rejected update leaves the book unchanged, but the following deltas
+        # can't be applied without it: counted as a gap, the book resyncs
+        LOGGER.warning("Orderbook %s update rejected: %s", self.__market_name, exception)
+        self.__gap_count += 1
+        self.__last_seq = None
+        return False
+
+    def apply_stream_events(
+        self, events: Iterable[WrappedStreamResponse[OrderbookUpdateModel]]
+    ) -> bool:
+        """
+        Applies a batch of stream messages, stopping at the first sequence gap.
+        """
+
+        for event in events:
+            if not self.apply_stream_event(event):
+                return False
+        return True
+
+    def _stream_decoder(self) -> StreamMsgParser | None:
+        """
+        Parser of the orderbook stream messages, `WrappedStreamResponse` if `None`.
+        """
+
+        return None
 
     async def start_orderbook(self) -> asyncio.Task:
         loop = asyncio.get_running_loop()
 
         async def inner():
-            async with self.__stream_client.subscribe_to_orderbooks(
-                self.__market_name
-            ) as stream:
-                async for event in stream:
-                    if event.type == StreamDataType.SNAPSHOT.value:
-                        self.init_orderbook(event.data)
-                    elif event.type == StreamDataType.DELTA.value:
-                        self.update_orderbook(event.data)
+            # A gap can't be repaired from deltas, so the stream is re-opened,
+            # the server then starts over with a fresh snapshot. Same when the
+            # stream has been disconnected because the book couldn't keep up.
+            while True:
+                try:
+                    async with self.__stream_client.subscribe_to_orderbooks(
+                        self.__market_name, decoder=self._stream_decoder()
+                    ) as stream:
+                        async for events in stream.batches():
+                            if not self.apply_stream_events(events):
+                                break
+                        else:
+                            return
+                except StreamOverflowException:
+                    self.__last_seq = None
+                except OffGridValueException as exception:
+                    # Raised by a fixed-point decoder, while parsing the stream
+                    self.__reject_update(exception)
+                self.__resync_count += 1
+                LOGGER.info("Resyncing orderbook %s", self.__market_name)
 
         self.__task = loop.create_task(inner())
         return self.__task
@@ -127,6 +435,8 @@ class OrderBook:
         if self.__task:
             self.__task.cancel()
             self.__task = None
+        if self.__notifier:
+            self.__notifier.stop()
 
     def best_bid(self) -> OrderBookEntry | None:
         try:
@@ -198,16 +508,22 @@ class OrderBook:
         if notional <= 0:
             return None
         if side == "SELL":
-            if not self._bid_prices:
-                return None
-            return self.__price_impact_notional(
-                notional, reversed(self._bid_prices.items())
+            impact = (
+                self.__price_impact_notional(
+                    notional, reversed(self._bid_prices.items())
+                )
+                if self._bid_prices
+                else None
             )
         elif side == "BUY":
-            if not self._ask_prices:
-                return None
-            return self.__price_impact_notional(notional, self._ask_prices.items())
-        return None
+            impact = (
+                self.__price_impact_notional(notional, self._ask_prices.items())
+                if self._ask_prices
+                else None
+            )
+        else:
+            return None
+        return self._check_tracked_depth(impact, side)
 
     def calculate_price_impact_qty(
         self, qty: decimal.Decimal, side: str
@@ -215,11 +531,132 @@ class OrderBook:
         if qty <= 0:
             return None
         if side == "SELL":
-            if not self._bid_prices:
-                return None
-            return self.__price_impact_qty(qty, reversed(self._bid_prices.items()))
+            impact = (
+                self.__price_impact_qty(qty, reversed(self._bid_prices.items()))
+                if self._bid_prices
+                else None
+            )
         elif side == "BUY":
-            if not self._ask_prices:
-                return None
-            return self.__price_impact_qty(qty, self._ask_prices.items())
+            impact = (
+                self.__price_impact_qty(qty, self._ask_prices.items())
+                if self._ask_prices
+                else None
+            )
+        else:
+            return None
+        return self._check_tracked_depth(impact, side)
+
+    def _check_tracked_depth(
+        self, impact: ImpactDetails | None, side: str
+    ) -> ImpactDetails | None:
+        if impact is None and self.is_truncated(side):
+            raise DepthExceededException(
+                f"Not enough liquidity within the tracked depth of {self.__market_name}"
+            )
+        return impact
+
+    def _invalidate_depth(self, *, bids: bool, asks: bool):
+        if bids:
+            self._bid_depth = None
+        if asks:
+            self._ask_depth = None
+
+    def _depth_levels(self, bids: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the prices and quantities of one side of the book, from the best
+        level to the worst one.
+        """
+
+        levels = (
+            reversed(self._bid_prices.values()) if bids else self._ask_prices.values()
+        )
+        entries = [(entry.price, entry.amount) for entry in levels]
+        if not entries:
+            return np.empty(0), np.empty(0)
+        levels_array = np.array(entries, dtype=np.float64)
+        return levels_array[:, 0], levels_array[:, 1]
+
+    def __get_depth(self, side: str) -> _CumulativeDepth | None:
+        if side == "SELL":
+            if self._bid_depth is None:
+                prices, qtys = self._depth_levels(bids=True)
+                self._bid_depth = _CumulativeDepth.from_levels(prices, qtys)
+            return self._bid_depth
+        elif side == "BUY":
+            if self._ask_depth is None:
+                prices, qtys = self._depth_levels(bids=False)
+                self._ask_depth = _CumulativeDepth.from_levels(prices, qtys)
+            return self._ask_depth
         return None
+
+    def calculate_price_impact_qty_batch(
+        self, qtys: Sequence[float] | np.ndarray, side: str
+    ) -> BatchImpactDetails | None:
+        """
+        Vectorized `calculate_price_impact_qty` for many sizes at once. Computed with
+        `float64` on cumulative depth arrays, which are cached until a delta touches
+        the corresponding side of the book.
+        """
+
+        depth = self.__get_depth(side)
+        if depth is None:
+            return None
+
+        qtys = np.asarray(qtys, dtype=np.float64)
+        # Index of the first level where the cumulative quantity reaches the size
+        level_idx = np.searchsorted(depth.cum_qty, qtys, side="left")
+        fillable = (qtys > 0) & (level_idx < len(depth.cum_qty))
+        beyond_depth = (qtys > 0) & ~fillable & self.is_truncated(side)
+        if not fillable.any():
+            return BatchImpactDetails(
+                price=np.full(len(qtys), np.nan),
+                amount=np.full(len(qtys), np.nan),
+                beyond_depth=beyond_depth,
+            )
+
+        prev_idx = np.clip(level_idx, 1, len(depth.prices)) - 1
+        spent = depth.cum_notional[prev_idx] + (
+            qtys - depth.cum_qty[prev_idx]
+        ) * depth.prices[prev_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average_price = spent / qtys
+        return BatchImpactDetails(
+            price=np.where(fillable, average_price, np.nan),
+            amount=np.where(fillable, qtys, np.nan),
+            beyond_depth=beyond_depth,
+        )
+
+    def calculate_price_impact_notional_batch(
+        self, notionals: Sequence[float] | np.ndarray, side: str
+    ) -> BatchImpactDetails | None:
+        """
+        Vectorized `calculate_price_impact_notional`, see
+        `calculate_price_impact_qty_batch`.
+        """
+
+        depth = self.__get_depth(side)
+        if depth is None:
+            return None
+
+        notionals = np.asarray(notionals, dtype=np.float64)
+        level_idx = np.searchsorted(depth.cum_notional, notionals, side="left")
+        fillable = (notionals > 0) & (level_idx < len(depth.cum_notional))
+        beyond_depth = (notionals > 0) & ~fillable & self.is_truncated(side)
+        if not fillable.any():
+            return BatchImpactDetails(
+                price=np.full(len(notionals), np.nan),
+                amount=np.full(len(notionals), np.nan),
+                beyond_depth=beyond_depth,
+            )
+
+        prev_idx = np.clip(level_idx, 1, len(depth.prices)) - 1
+        amount = depth.cum_qty[prev_idx] + (
+            notionals - depth.cum_notional[prev_idx]
+        ) / depth.prices[prev_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average_price = notionals / amount
+        return BatchImpactDetails(
+            price=np.where(fillable, average_price, np.nan),
+            amount=np.where(fillable, amount, np.nan),
+            beyond_depth=beyond_depth,
+        )
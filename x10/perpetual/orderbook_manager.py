@@ -0,0 +1,210 @@
+import asyncio
+import functools
+from typing import Callable, Dict, Iterable, List, Set
+
+from x10.perpetual.configuration import EndpointConfig
+from x10.perpetual.orderbook import OrderBook, OrderBookEntry
+from x10.perpetual.orderbooks import OffGridValueException, OrderbookUpdateModel
+from x10.perpetual.stream_client.perpetual_stream_connection import StreamMsgParser
+from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
+from x10.perpetual.stream_client.stream_queue import (
+    StreamOverflowException,
+    StreamQueueConfig,
+)
+from x10.utils.http import StreamDataType, WrappedStreamResponse
+from x10.utils.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+
+class OrderBookManager:
+    """
+    Maintains the orderbooks of many markets from a single all-markets stream,
+    instead of one stream (and one task) per `OrderBook`.
+
+    Messages are demultiplexed by `OrderbookUpdateModel.market`. The `seq` of the
+    combined stream is shared by all markets, so a gap invalidates every book: the
+    stream is re-opened and each book is usable again once its snapshot arrives.
+    """
+
+    def __init__(
+        self,
+        endpoint_config: EndpointConfig,
+        markets: Iterable[str] | None = None,
+        best_ask_change_callback: Callable[[str, OrderBookEntry], None] | None = None,
+        best_bid_change_callback: Callable[[str, OrderBookEntry], None] | None = None,
+        orderbook_factory: Callable[[str], OrderBook] | None = None,
+        stream_queue_config: StreamQueueConfig | None = None,
+        stream_decoder: StreamMsgParser | None = None,
+    ) -> None:
+        """
+        :param markets: markets to track, all markets of the stream if `None`.
+        :param orderbook_factory: creates the book of a market, e.g. to use
+        `TickOrderBook`. Callbacks of the created books are set by the manager.
+        :param stream_queue_config: bounds the queue of the stream, the books resync
+        when it's disconnected by an overflow.
+        :param stream_decoder: parser of the stream messages, e.g. a
+        `FixedPointOrderbookDecoder` along with an `orderbook_factory` creating
+        `TickOrderBook` instances with the same trading configs.
+        """
+
+        self.__endpoint_config = endpoint_config
+        self.__stream_client = PerpetualStreamClient(
+            api_url=endpoint_config.stream_url, queue_config=stream_queue_config
+        )
+        self.__stream_decoder = stream_decoder
+        self.__markets = set(markets) if markets is not None else None
+        self.__orderbook_factory = orderbook_factory
+        self.__orderbooks: Dict[str, OrderBook] = {}
+        self.__synced_markets: Set[str] = set()
+        self.__task: asyncio.Task | None = None
+        self.__last_seq: int | None = None
+        self.__gap_count = 0
+        self.__resync_count = 0
+        self.best_ask_change_callback = best_ask_change_callback
+        self.best_bid_change_callback = best_bid_change_callback
+
+    @property
+    def markets(self) -> List[str]:
+        return list(self.__orderbooks)
+
+    @property
+    def gap_count(self) -> int:
+        return self.__gap_count
+
+    @property
+    def resync_count(self) -> int:
+        return self.__resync_count
+
+    def get_orderbook(self, market_name: str) -> OrderBook | None:
+        """
+        Returns the book of a market once its snapshot has been received.
+        """
+
+        if market_name not in self.__synced_markets:
+            return None
+        return self.__orderbooks.get(market_name)
+
+    def is_synced(self, market_name: str) -> bool:
+        return market_name in self.__synced_markets
+
+    def best_bid(self, market_name: str) -> OrderBookEntry | None:
+        orderbook = self.get_orderbook(market_name)
+        return orderbook.best_bid() if orderbook else None
+
+    def best_ask(self, market_name: str) -> OrderBookEntry | None:
+        orderbook = self.get_orderbook(market_name)
+        return orderbook.best_ask() if orderbook else None
+
+    def apply_stream_event(
+        self, event: WrappedStreamResponse[OrderbookUpdateModel]
+    ) -> bool:
+        """
+        Routes a message of the all-markets stream to the book of its market.
+
+        Returns `False` if a sequence gap (or an update off the tick and lot grid of
+        its market) was detected, all books are then out of sync until their next
+        snapshot.
+        """
+
+        if self.__last_seq is not None and event.seq != self.__last_seq + 1:
+            LOGGER.warning(
+                "Orderbooks stream sequence gap: expected %s, received %s",
+                self.__last_seq + 1,
+                event.seq,
+            )
+            self.__gap_count += 1
+            self.__last_seq = None
+            self.__synced_markets.clear()
+            return False
+        self.__last_seq = event.seq
+
+        if event.data is None:
+            return True
+        market_name = event.data.market
+        if self.__markets is not None and market_name not in self.__markets:
+            return True
+
+        try:
+            if event.type == StreamDataType.SNAPSHOT.value:
+                self.__get_or_create_orderbook(market_name).init_orderbook(event.data)
+                self.__synced_markets.add(market_name)
+            elif (
+                event.type == StreamDataType.DELTA.value
+                and market_name in self.__synced_markets
+            ):
+                self.__orderbooks[market_name].update_orderbook(event.data)
+        except OffGridValueException as exception:
+            return self.__reject_update(exception)
+        return True
+
+    def apply_stream_events(
+        self, events: Iterable[WrappedStreamResponse[OrderbookUpdateModel]]
+    ) -> bool:
+        for event in events:
+            if not self.apply_stream_event(event):
+                return False
+        return True
+
+    async def start(self) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+
+        async def inner():
+            while True:
+                try:
+                    async with self.__stream_client.subscribe_to_orderbooks(
+                        decoder=self.__stream_decoder
+                    ) as stream:
+                        async for events in stream.batches():
+                            if not self.apply_stream_events(events):
+                                break
+                        else:
+                            return
+                except StreamOverflowException:
+                    self.__last_seq = None
+                    self.__synced_markets.clear()
+                except OffGridValueException as exception:
+                    # Raised by a fixed-point decoder, while parsing the stream
+                    self.__reject_update(exception)
+                self.__resync_count += 1
+                LOGGER.info("Resyncing orderbooks stream")
+
+        self.__task = loop.create_task(inner())
+        return self.__task
+
+    def stop(self):
+        if self.__task:
+            self.__task.cancel()
+            self.__task = None
+        # Stops the callback tasks of the books (see `coalesce_callbacks`)
+        for orderbook in self.__orderbooks.values():
+            orderbook.stop_orderbook()
+        self.__last_seq = None
+        self.__synced_markets.clear()
+
+    def __reject_update(self, exception: OffGridValueException) -> bool:
+        # The book is left unchanged, and can only get a new snapshot by
+        # resubscribing: handled as a sequence gap
+        LOGGER.warning("Orderbooks stream update rejected: %s", exception)
+        self.__gap_count += 1
+        self.__last_seq = None
+        self.__synced_markets.clear()
+        return False
+
+    def __get_or_create_orderbook(self, market_name: str) -> OrderBook:
+        orderbook = self.__orderbooks.get(market_name)
+        if orderbook is None:
+            if self.__orderbook_factory:
+                orderbook = self.__orderbook_factory(market_name)
+            else:
+                orderbook = OrderBook(self.__endpoint_config, market_name)
+            if self.best_ask_change_callback:
+                orderbook.best_ask_change_callback = functools.partial(
+                    self.best_ask_change_callback, market_name
+                )
+            if self.best_bid_change_callback:
+                orderbook.best_bid_change_callback = functools.partial(
+                    self.best_bid_change_callback, market_name
+                )
+            self.__orderbooks[market_name] = orderbook
+        return orderbook
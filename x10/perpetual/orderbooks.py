@@ -3,9 +3,17 @@ from typing import List
 
 from pydantic import AliasChoices, Field
 
+from x10.errors import X10Error
 from x10.utils.model import X10BaseModel
 
 
+class OffGridValueException(X10Error):
+    """
+    Raised for a price or quantity which isn't a multiple of the market tick or lot
+    size (`min_price_change`, `min_order_size_change`).
+    """
+
+
 class OrderbookQuantityModel(X10BaseModel):
     qty: Decimal = Field(
         validation_alias=AliasChoices("qty", "q"), serialization_alias="q"
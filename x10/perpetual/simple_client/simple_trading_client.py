@@ -8,7 +8,7 @@ from typing import Awaitable, Dict, Union, cast, Optional
 from x10.perpetual.accounts import AccountStreamDataModel, StarkPerpetualAccount
 from x10.perpetual.configuration import EndpointConfig
 from x10.perpetual.markets import MarketModel
-from x10.perpetual.order_object import create_order_object
+from x10.perpetual.order_object import OrderSigningContexts
 from x10.perpetual.orders import (
     OpenOrderModel,
     OrderSide,
@@ -18,12 +18,13 @@ from x10.perpetual.orders import (
 from x10.perpetual.stream_client.perpetual_stream_connection import (
     PerpetualStreamConnection,
 )
+from x10.perpetual.stream_client.reconnect import ReconnectPolicy
 from x10.perpetual.stream_client.stream_client import PerpetualStreamClient
 from x10.perpetual.trading_client.markets_information_module import (
     MarketsInformationModule,
 )
 from x10.perpetual.trading_client.order_management_module import OrderManagementModule
-from x10.utils.http import WrappedStreamResponse
+from x10.utils.http import LazyStreamResponse, create_http_client
 
 
 def condition_to_awaitable(condition: asyncio.Condition) -> Awaitable:
@@ -81,19 +82,23 @@ class BlockingTradingClient:
             )
         self.__endpoint_config = endpoint_config
         self.__account = account
+        self.__signing_contexts = OrderSigningContexts(
+            account, endpoint_config.starknet_domain
+        )
+        self.__http_client = create_http_client()
         self.__market_module = MarketsInformationModule(
-            endpoint_config, api_key=account.api_key
+            endpoint_config, api_key=account.api_key, client=self.__http_client
         )
         self.__orders_module = OrderManagementModule(
-            endpoint_config, api_key=account.api_key
+            endpoint_config, api_key=account.api_key, client=self.__http_client
         )
         self.__markets: Union[None, Dict[str, MarketModel]] = None
         self.__stream_client: PerpetualStreamClient = PerpetualStreamClient(
-            api_url=endpoint_config.stream_url
+            api_url=endpoint_config.stream_url, reconnect_policy=ReconnectPolicy()
         )
         self.__account_stream: Union[
             None,
-            PerpetualStreamConnection[WrappedStreamResponse[AccountStreamDataModel]],
+            PerpetualStreamConnection[LazyStreamResponse[AccountStreamDataModel]],
         ] = None
         self.__order_waiters: Dict[str, OrderWaiter] = {}
         self.__cancel_waiters: Dict[str, CancelWaiter] = {}
@@ -142,15 +147,16 @@ class BlockingTradingClient:
 
     async def ___order_stream(self):
         self.__account_stream = await self.__stream_client.subscribe_to_account_updates(
-            self.__account.api_key
+            self.__account.api_key, lazy=True
         )
+        # The stream reconnects by itself, the iteration only ends once it's closed
         async for event in self.__account_stream:
-            if not (event.data and event.data.orders):
+            # Only the orders are used, the rest of the updates isn't validated
+            orders = event.get_data_field("orders")
+            if not orders:
                 continue
-            for order in event.data.orders:
+            for order in orders:
                 await self.__handle_order(order)
-        print("Order stream closed, reconnecting...")
-        await self.___order_stream()
 
     async def cancel_order(self, order_external_id: str) -> TimedCancel:
         awaitable: Awaitable
@@ -232,15 +238,12 @@ class BlockingTradingClient:
         if not market:
             raise ValueError(f"Market '{market_name}' not found.")
 
-        order: PerpetualOrderModel = create_order_object(
-            account=self.__account,
-            market=market,
+        order: PerpetualOrderModel = self.__signing_contexts.get(market).build_order(
             amount_of_synthetic=amount_of_synthetic,
             price=price,
             side=side,
             post_only=post_only,
             previous_order_external_id=previous_order_external_id,
-            starknet_domain=self.__endpoint_config.starknet_domain,
             order_external_id=external_id,
             builder_fee=builder_fee,
             builder_id=builder_id,
@@ -1,49 +1,144 @@
-from types import TracebackType
-from typing import AsyncIterator, Generic, Optional, Type, TypeVar, List
 import asyncio
+import inspect
+import time
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Optional,
+    Protocol,
+    Type,
+    TypeVar,
+    List,
+)
 from picows import ws_connect, WSListener, WSTransport, WSFrame, WSMsgType
 from x10.config import USER_AGENT
+from x10.perpetual.stream_client.reconnect import ReconnectPolicy, ReconnectStats
+from x10.perpetual.stream_client.stream_queue import (
+    StreamMsgQueue,
+    StreamOverflowException,
+    StreamQueueConfig,
+)
 from x10.utils.http import RequestHeader
 from x10.utils.log import get_logger
-from x10.utils.model import X10BaseModel
+
+if TYPE_CHECKING:
+    from x10.perpetual.stream_client.recording import StreamRecorder
 
 LOGGER = get_logger(__name__)
 
-StreamMsgResponseType = TypeVar("StreamMsgResponseType", bound=X10BaseModel)
+StreamMsgResponseType = TypeVar("StreamMsgResponseType")
+StreamMsgResponseType_co = TypeVar("StreamMsgResponseType_co", covariant=True)
+
+
+class StreamMsgParser(Protocol[StreamMsgResponseType_co]):
+    """
+    Parses the messages of a stream: a model class like `WrappedStreamResponse[T]`,
+    or one of the alternative parsers (e.g. `LazyStreamResponseParser`).
+    """
+
+    def model_validate_json(self, json_data: str | bytes) -> StreamMsgResponseType_co:
+        ...
+
+
+DEFAULT_MAX_BATCH_SIZE = 1000
 
 
 class X10WSListener(WSListener):
-    def __init__(self, msg_queue: asyncio.Queue):
+    def __init__(
+        self,
+        msg_queue: StreamMsgQueue,
+        bytes_payloads: bool = False,
+        on_payload: Optional[Callable[[str | bytes], None]] = None,
+        recorder: Optional["StreamRecorder"] = None,
+    ):
+        """
+        :param on_payload: handles the payloads right away, instead of queueing them.
+        :param recorder: records the payloads as they are received.
+        """
+
         self.msg_queue = msg_queue
+        self.bytes_payloads = bytes_payloads
+        self.on_payload = on_payload
+        self.recorder = recorder
 
     def on_ws_connected(self, transport: WSTransport):
         LOGGER.debug("Connected to stream: %s", transport.request.path)
 
     def on_ws_disconnected(self, transport: WSTransport):
         LOGGER.debug("Stream closed: %s", transport.request.path)
-        self.msg_queue.put_nowait(None)
+        self.msg_queue.put_end()
 
     def on_ws_frame(self, transport: WSTransport, frame: WSFrame):
         if frame.msg_type == WSMsgType.TEXT:
-            payload = frame.get_payload_as_utf8_text()
-            self.msg_queue.put_nowait(payload)
+            # The JSON parser validates UTF-8 itself. A memoryview would save the
+            # copy, but it's only valid until this callback returns.
+            payload: str | bytes
+            if self.bytes_payloads:
+                payload = frame.get_payload_as_bytes()
+            else:
+                payload = frame.get_payload_as_utf8_text()
+            if self.recorder is not None:
+                self.recorder.record(payload)
+            if self.on_payload is not None:
+                self.on_payload(payload)
+            elif not self.msg_queue.put_nowait(payload):
+                LOGGER.warning(
+                    "Stream queue overflowed, disconnecting: %s", transport.request.path
+                )
+                transport.disconnect(graceful=False)
 
 
 class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
     __stream_url: str
-    __msg_model_class: Type[StreamMsgResponseType]
+    __msg_model_class: StreamMsgParser[StreamMsgResponseType]
     __api_key: Optional[str]
     __msgs_count: int
     __transport: Optional[WSTransport]
     __listener: Optional[X10WSListener]
-    __msg_queue: asyncio.Queue
+    __msg_queue: StreamMsgQueue
+    __dropped_msgs_count: int
+    __conflated_msgs_count: int
+    __queue_config: Optional[StreamQueueConfig]
+    __disconnected: bool
+    __closing: bool
+    __reconnect_policy: Optional[ReconnectPolicy]
+    __reconnect_stats: ReconnectStats
+    __bytes_payloads: bool
+    __recorder: Optional["StreamRecorder"]
 
     def __init__(
         self,
         stream_url: str,
-        msg_model_class: Type[StreamMsgResponseType],
+        msg_model_class: StreamMsgParser[StreamMsgResponseType],
         api_key: Optional[str],
+        queue_config: Optional[StreamQueueConfig] = None,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        on_reconnect: Optional[Callable[[], Awaitable[None] | None]] = None,
+        bytes_payloads: bool = False,
+        on_message: Optional[Callable[[StreamMsgResponseType], None]] = None,
+        recorder: Optional["StreamRecorder"] = None,
     ):
+        """
+        :param reconnect_policy: reconnect when the stream is disconnected by the
+        server, the network or a queue overflow, instead of ending the iteration.
+        Messages queued before the disconnection are still received first.
+        :param on_reconnect: called (and awaited if it's a coroutine function) once
+        reconnected, before the new messages are received, so the consumer can
+        resync its state.
+        :param bytes_payloads: pass the frames to the JSON parser as `bytes`, instead
+        of decoding them to `str` first.
+        :param on_message: handles the messages as soon as they are received: they
+        are parsed and passed to it inside the WebSocket callback, without going
+        through the queue and a task switch. It must not block, its exceptions are
+        logged. Use `wait_closed` instead of receiving the messages.
+        :param recorder: records the raw payloads, with their receive time, see
+        `x10.perpetual.stream_client.recording`.
+        """
+
         super().__init__()
         self.__stream_url = stream_url
         self.__msg_model_class = msg_model_class
@@ -51,7 +146,18 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
         self.__msgs_count = 0
         self.__transport = None
         self.__listener = None
-        self.__msg_queue = asyncio.Queue()
+        self.__queue_config = queue_config
+        self.__msg_queue = StreamMsgQueue(queue_config)
+        self.__dropped_msgs_count = 0
+        self.__conflated_msgs_count = 0
+        self.__disconnected = False
+        self.__closing = False
+        self.__reconnect_policy = reconnect_policy
+        self.__reconnect_stats = ReconnectStats()
+        self.on_reconnect = on_reconnect
+        self.__bytes_payloads = bytes_payloads
+        self.on_message = on_message
+        self.__recorder = recorder
 
     async def send(self, data):
         assert self.__transport is not None
@@ -60,8 +166,70 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
     async def recv(self) -> StreamMsgResponseType:
         return await self.__receive()
 
+    async def recv_batch(
+        self, max_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> List[StreamMsgResponseType]:
+        """
+        Waits for at least one message, then also takes the messages already queued
+        (up to `max_size` in total), so they can be processed in a single wake-up.
+
+        Raises `StopAsyncIteration` once the stream has been disconnected and all its
+        messages have been received, `StreamOverflowException` instead if it was
+        disconnected by a queue overflow. Reconnects instead if a `reconnect_policy`
+        is set.
+        """
+
+        payloads: List[str | bytes] = []
+        while not payloads:
+            if self.__disconnected:
+                await self.__handle_disconnection()
+            payload = await self.__msg_queue.get()
+            # `None` marks the end of the stream, it's always the last queued item
+            while payload is not None:
+                payloads.append(payload)
+                if len(payloads) >= max_size or self.__msg_queue.empty():
+                    break
+                payload = self.__msg_queue.get_nowait()
+            if payload is None:
+                self.__disconnected = True
+        self.__msgs_count += len(payloads)
+        return [self.__msg_model_class.model_validate_json(data) for data in payloads]
+
+    async def batches(
+        self, max_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> AsyncIterator[List[StreamMsgResponseType]]:
+        """
+        Iterates over the stream with `recv_batch`, until it's disconnected.
+        """
+
+        if self.__is_finished():
+            return
+        while True:
+            try:
+                batch = await self.recv_batch(max_size)
+            except StopAsyncIteration:
+                return
+            yield batch
+
+    async def wait_closed(self):
+        """
+        Waits until the stream is closed (reconnecting it if a `reconnect_policy` is
+        set), for streams whose messages are handled by `on_message`.
+        """
+
+        while True:
+            if self.__disconnected:
+                try:
+                    await self.__handle_disconnection()
+                except StopAsyncIteration:
+                    return
+            # Only the end of the stream is queued when `on_message` is set
+            if await self.__msg_queue.get() is None:
+                self.__disconnected = True
+
     async def close(self):
         assert self.__transport is not None
+        self.__closing = True
         self.__transport.disconnect(graceful=True)
         await self.__transport.wait_disconnected()
         LOGGER.debug("Stream closed: %s", self.__stream_url)
@@ -70,6 +238,18 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
     def msgs_count(self):
         return self.__msgs_count
 
+    @property
+    def dropped_msgs_count(self) -> int:
+        return self.__dropped_msgs_count + self.__msg_queue.dropped_count
+
+    @property
+    def conflated_msgs_count(self) -> int:
+        return self.__conflated_msgs_count + self.__msg_queue.conflated_count
+
+    @property
+    def reconnect_stats(self) -> ReconnectStats:
+        return self.__reconnect_stats
+
     @property
     def closed(self):
         if self.__transport is None:
@@ -80,17 +260,73 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
         return self
 
     async def __anext__(self) -> StreamMsgResponseType:
-        if self.closed:
+        if self.__is_finished():
             raise StopAsyncIteration
         return await self.__receive()
 
+    def __is_finished(self) -> bool:
+        if self.__closing or self.__reconnect_policy is None:
+            return self.closed
+        return self.__transport is None
+
     async def __receive(self) -> StreamMsgResponseType:
-        data = await self.__msg_queue.get()
-        if data is None:
-            raise StopAsyncIteration
+        data = None
+        while data is None:
+            if self.__disconnected:
+                await self.__handle_disconnection()
+            data = await self.__msg_queue.get()
+            if data is None:
+                self.__disconnected = True
         self.__msgs_count += 1
         return self.__msg_model_class.model_validate_json(data)
 
+    async def __handle_disconnection(self):
+        if self.__reconnect_policy is None or self.__closing:
+            self.__raise_end_of_stream()
+        await self.__reconnect(self.__reconnect_policy)
+
+    async def __reconnect(self, policy: ReconnectPolicy):
+        disconnected_at = time.perf_counter()
+        attempt = 0
+        while True:
+            await asyncio.sleep(policy.get_delay(attempt))
+            try:
+                await self.__connect()
+                break
+            except Exception as exception:
+                attempt += 1
+                LOGGER.warning(
+                    "Stream reconnection attempt %s failed: %s (%s)",
+                    attempt,
+                    self.__stream_url,
+                    exception,
+                )
+                if policy.max_attempts is not None and attempt >= policy.max_attempts:
+                    raise
+
+        self.__disconnected = False
+        self.__reconnect_stats.record(time.perf_counter() - disconnected_at)
+        LOGGER.info("Reconnected to stream: %s", self.__stream_url)
+        if self.on_reconnect:
+            result = self.on_reconnect()
+            if inspect.isawaitable(result):
+                await result
+
+    def __handle_payload(self, payload: str | bytes):
+        assert self.on_message is not None
+        self.__msgs_count += 1
+        try:
+            self.on_message(self.__msg_model_class.model_validate_json(payload))
+        except Exception:
+            LOGGER.exception("Failed to handle stream message: %s", self.__stream_url)
+
+    def __raise_end_of_stream(self):
+        if self.__msg_queue.overflowed:
+            raise StreamOverflowException(
+                f"Stream queue overflowed: {self.__stream_url}"
+            )
+        raise StopAsyncIteration
+
     def __await__(self):
         return self.__await_impl__().__await__()
 
@@ -106,6 +342,16 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
         await self.close()
 
     async def __await_impl__(self):
+        await self.__connect()
+        return self
+
+    async def __connect(self):
+        # Each connection gets its own queue: the previous one may have overflowed
+        if self.__transport is not None:
+            self.__dropped_msgs_count += self.__msg_queue.dropped_count
+            self.__conflated_msgs_count += self.__msg_queue.conflated_count
+            self.__msg_queue = StreamMsgQueue(self.__queue_config)
+
         extra_headers = {
             RequestHeader.USER_AGENT.value: USER_AGENT,
         }
@@ -113,7 +359,12 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
             extra_headers[RequestHeader.API_KEY.value] = self.__api_key
 
         def create_listener():
-            self.__listener = X10WSListener(self.__msg_queue)
+            self.__listener = X10WSListener(
+                self.__msg_queue,
+                self.__bytes_payloads,
+                self.__handle_payload if self.on_message else None,
+                self.__recorder,
+            )
             return self.__listener
 
         # Connect to WebSocket
@@ -126,4 +377,3 @@ class PerpetualStreamConnection(Generic[StreamMsgResponseType]):
         )
 
         LOGGER.debug("Connected to stream: %s", self.__stream_url)
-        return self
@@ -0,0 +1,42 @@
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ReconnectPolicy:
+    """
+    Exponential backoff between the reconnection attempts of a stream. Each delay
+    is randomized by +/- `jitter` (a fraction of the delay), so that many clients
+    disconnected at once don't all reconnect at the same time.
+    """
+
+    initial_delay: float = 0.1
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+    # Consecutive failed attempts before giving up, `None` to retry forever
+    max_attempts: Optional[int] = None
+
+    def get_delay(self, attempt: int) -> float:
+        delay = min(self.initial_delay * self.multiplier**attempt, self.max_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+@dataclass
+class ReconnectStats:
+    """
+    Reconnection latencies are measured from the disconnection being noticed to the
+    stream being connected again, in seconds.
+    """
+
+    reconnect_count: int = 0
+    last_latency: Optional[float] = None
+    max_latency: float = 0.0
+    total_latency: float = 0.0
+
+    def record(self, latency: float):
+        self.reconnect_count += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
@@ -0,0 +1,220 @@
+"""
+Recording of the raw traffic of streams, and its replay through the same parsers
+(and consumers, e.g. `OrderBook.apply_stream_events`) as a live stream:
+
+    with StreamRecorder("btc-usd.stream") as recorder:
+        stream_client = PerpetualStreamClient(api_url=..., recorder=recorder)
+        async with stream_client.subscribe_to_orderbooks("BTC-USD") as stream:
+            ...
+
+    async with StreamReplay(
+        "btc-usd.stream", WrappedStreamResponse[OrderbookUpdateModel]
+    ) as replay:
+        async for events in replay.batches():
+            orderbook.apply_stream_events(events)
+
+A recording is an append-only file of frames, each one being a
+`<received_at> <length>` header line (receive time in nanoseconds since the epoch,
+payload length in bytes) followed by the payload and a newline.
+"""
+
+import asyncio
+import time
+from types import TracebackType
+from typing import (
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Generic,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Type,
+)
+
+from x10.perpetual.stream_client.perpetual_stream_connection import (
+    DEFAULT_MAX_BATCH_SIZE,
+    StreamMsgParser,
+    StreamMsgResponseType,
+)
+
+
+class RecordedFrame(NamedTuple):
+    received_at: int
+    payload: bytes
+
+
+class StreamRecorder:
+    """
+    Appends the frames received by streams to a recording file. Frames are written
+    as received, so a recorder should be used by a single stream.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], int] = time.time_ns):
+        """
+        :param clock: receive time of the frames, in nanoseconds.
+        """
+
+        self.__file: BinaryIO = open(path, "ab")
+        self.__clock = clock
+        self.__frames_count = 0
+
+    @property
+    def frames_count(self) -> int:
+        return self.__frames_count
+
+    def record(self, payload: str | bytes):
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self.__file.write(b"%d %d\n%b\n" % (self.__clock(), len(payload), payload))
+        self.__frames_count += 1
+
+    def flush(self):
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ):
+        self.close()
+
+
+def read_recording(path: str) -> Iterator[RecordedFrame]:
+    with open(path, "rb") as file:
+        while header := file.readline():
+            received_at, length = header.split()
+            payload = file.read(int(length))
+            file.read(1)
+            yield RecordedFrame(int(received_at), payload)
+
+
+class StreamReplay(Generic[StreamMsgResponseType]):
+    """
+    Replays a recording as a stream, with the receiving API of
+    `PerpetualStreamConnection`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        msg_model_class: StreamMsgParser[StreamMsgResponseType],
+        speed: float | None = None,
+        bytes_payloads: bool = False,
+    ):
+        """
+        :param speed: replay speed relative to the recording (e.g. `1` for the
+        original pace, `2` twice faster), as fast as possible if `None`.
+        :param bytes_payloads: pass the payloads to the parser as `bytes`, instead of
+        decoding them to `str` first.
+        """
+
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self.__frames = read_recording(path)
+        self.__msg_model_class = msg_model_class
+        self.__speed = speed
+        self.__bytes_payloads = bytes_payloads
+        self.__next_frame: Optional[RecordedFrame] = None
+        self.__first_received_at: Optional[int] = None
+        self.__started_at = 0.0
+        self.__msgs_count = 0
+
+    @property
+    def msgs_count(self) -> int:
+        return self.__msgs_count
+
+    async def recv(self) -> StreamMsgResponseType:
+        frame = await self.__wait_next_frame()
+        if frame is None:
+            raise StopAsyncIteration
+        self.__next_frame = None
+        self.__msgs_count += 1
+        return self.__parse(frame)
+
+    async def recv_batch(
+        self, max_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> List[StreamMsgResponseType]:
+        """
+        Waits for the next frame, then also takes the frames already due (up to
+        `max_size` in total), like `PerpetualStreamConnection.recv_batch`.
+        """
+
+        batch = [await self.recv()]
+        while len(batch) < max_size:
+            frame = self.__peek_frame()
+            if frame is None or self.__get_delay(frame) > 0:
+                break
+            self.__next_frame = None
+            self.__msgs_count += 1
+            batch.append(self.__parse(frame))
+        return batch
+
+    async def batches(
+        self, max_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> AsyncIterator[List[StreamMsgResponseType]]:
+        while True:
+            try:
+                batch = await self.recv_batch(max_size)
+            except StopAsyncIteration:
+                return
+            yield batch
+
+    def close(self):
+        self.__frames.close()  # type: ignore[attr-defined]
+
+    def __aiter__(self) -> AsyncIterator[StreamMsgResponseType]:
+        return self
+
+    async def __anext__(self) -> StreamMsgResponseType:
+        return await self.recv()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ):
+        self.close()
+
+    def __parse(self, frame: RecordedFrame) -> StreamMsgResponseType:
+        payload = frame.payload
+        return self.__msg_model_class.model_validate_json(
+            payload if self.__bytes_payloads else payload.decode("utf-8")
+        )
+
+    def __peek_frame(self) -> Optional[RecordedFrame]:
+        if self.__next_frame is None:
+            self.__next_frame = next(self.__frames, None)
+        return self.__next_frame
+
+    async def __wait_next_frame(self) -> Optional[RecordedFrame]:
+        frame = self.__peek_frame()
+        if frame is None:
+            return None
+        delay = self.__get_delay(frame)
+        # Yields to the loop even when replaying as fast as possible, so that the
+        # consumer doesn't starve the other tasks
+        await asyncio.sleep(max(delay, 0))
+        return frame
+
+    def __get_delay(self, frame: RecordedFrame) -> float:
+        if self.__speed is None:
+            return 0
+        now = asyncio.get_running_loop().time()
+        if self.__first_received_at is None:
+            self.__first_received_at = frame.received_at
+            self.__started_at = now
+        elapsed = (frame.received_at - self.__first_received_at) / 1e9 / self.__speed
+        return self.__started_at + elapsed - now
@@ -0,0 +1,299 @@
+"""
+Lightweight records for the high-frequency public streams, an alternative to
+`WrappedStreamResponse[T]` when the cost of the pydantic models matters.
+
+Records are named tuples with the same field names (and field values) as the
+corresponding models, so they can usually be used in their place, and are built
+by decoders specialized for each stream message. Enum fields hold the raw values
+(e.g. `trade_type` is `"TRADE"`, not `TradeType.TRADE`), which is also what the
+models hold as they're validated with `use_enum_values`.
+
+`FixedPointOrderbookDecoder` goes further for the orderbooks stream: prices and
+quantities are decoded straight to integer ticks and lots, which `TickOrderBook`
+applies without creating any `Decimal`.
+"""
+
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from pydantic_core import from_json
+
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbooks import OffGridValueException, OrderbookUpdateModel
+from x10.utils.http import StreamDataType
+
+RecordType = TypeVar("RecordType")
+
+_STREAM_DATA_TYPES = frozenset(StreamDataType._value2member_map_)
+
+
+class OrderbookQuantityRecord(NamedTuple):
+    qty: Decimal
+    price: Decimal
+
+
+class OrderbookUpdateRecord(NamedTuple):
+    market: str
+    bid: List[OrderbookQuantityRecord]
+    ask: List[OrderbookQuantityRecord]
+
+
+class PublicTradeRecord(NamedTuple):
+    """
+    `side` and `trade_type` are the values of `OrderSide` and `TradeType`.
+    """
+
+    id: int
+    market: str
+    side: str
+    trade_type: str
+    timestamp: int
+    price: Decimal
+    qty: Decimal
+
+
+class CandleRecord(NamedTuple):
+    open: Decimal
+    low: Decimal
+    high: Decimal
+    close: Decimal
+    volume: Decimal
+    timestamp: int
+
+
+class FundingRateRecord(NamedTuple):
+    market: str
+    funding_rate: Decimal
+    timestamp: int
+
+
+class OrderbookTicksRecord(NamedTuple):
+    """
+    Orderbook update with `(ticks, lots)` levels, multiples of the market
+    `min_price_change` and `min_order_size_change`.
+    """
+
+    market: str
+    bid: List[Tuple[int, int]]
+    ask: List[Tuple[int, int]]
+
+
+class StreamRecord(NamedTuple):
+    """
+    Stream message decoded by a `StreamRecordDecoder`, `data` is the record built
+    by its `decode_data` (generic named tuples require Python 3.11).
+    """
+
+    type: Optional[str]
+    data: Optional[Any]
+    error: Optional[str]
+    ts: int
+    seq: int
+
+
+def _decode_quantities(levels: List[dict]) -> List[OrderbookQuantityRecord]:
+    return [
+        OrderbookQuantityRecord(Decimal(level["q"]), Decimal(level["p"]))
+        for level in levels
+    ]
+
+
+def decode_orderbook_update(data: dict) -> OrderbookUpdateRecord:
+    return OrderbookUpdateRecord(
+        data["m"], _decode_quantities(data["b"]), _decode_quantities(data["a"])
+    )
+
+
+def decode_public_trades(data: List[dict]) -> List[PublicTradeRecord]:
+    return [
+        PublicTradeRecord(
+            trade["i"],
+            trade["m"],
+            trade["S"],
+            trade["tT"],
+            trade["T"],
+            Decimal(trade["p"]),
+            Decimal(trade["q"]),
+        )
+        for trade in data
+    ]
+
+
+def decode_candles(data: List[dict]) -> List[CandleRecord]:
+    return [
+        CandleRecord(
+            Decimal(candle["o"]),
+            Decimal(candle["l"]),
+            Decimal(candle["h"]),
+            Decimal(candle["c"]),
+            Decimal(candle["v"]),
+            candle["T"],
+        )
+        for candle in data
+    ]
+
+
+def decode_funding_rate(data: dict) -> FundingRateRecord:
+    return FundingRateRecord(data["m"], Decimal(data["f"]), data["T"])
+
+
+class StreamRecordDecoder(Generic[RecordType]):
+    """
+    Decodes stream messages to `StreamRecord`, can be used in place of
+    `WrappedStreamResponse[T]` to parse the messages of a stream.
+    """
+
+    def __init__(self, decode_data: Callable[[Any], RecordType]):
+        self.decode_data = decode_data
+
+    def model_validate_json(self, payload: str | bytes) -> StreamRecord:
+        message = from_json(payload)
+        msg_type = message.get("type")
+        if msg_type is not None and msg_type not in _STREAM_DATA_TYPES:
+            msg_type = StreamDataType.UNKNOWN.value
+        data = message.get("data")
+        return StreamRecord(
+            msg_type,
+            self.decode_data(data) if data is not None else None,
+            message.get("error"),
+            message["ts"],
+            message["seq"],
+        )
+
+
+# Decoded strings are memoized, prices and sizes repeat a lot on the stream
+_FIXED_POINT_CACHE_SIZE = 65_536
+
+
+class FixedPointScale:
+    """
+    Converts decimal strings to integer multiples of `step` without going through
+    `Decimal`: the digits are parsed as an integer scaled by the number of decimals
+    of `step`, then divided by it.
+
+    Values which aren't a multiple of `step` are rejected, like
+    `TickOrderBook.to_ticks` and `TickOrderBook.to_lots` do.
+    """
+
+    __slots__ = ("step", "__decimals", "__step_units", "__cache")
+
+    def __init__(self, step: Decimal):
+        if step <= 0:
+            raise ValueError("step must be positive")
+        exponent = step.normalize().as_tuple().exponent
+        assert isinstance(exponent, int)
+        self.step = step
+        self.__decimals = max(-exponent, 0)
+        self.__step_units = int(step.scaleb(self.__decimals))
+        self.__cache: Dict[str, int] = {}
+
+    def to_units(self, value: str) -> int:
+        """
+        :raises OffGridValueException: the value isn't a multiple of `step`.
+        """
+
+        units = self.__cache.get(value)
+        if units is None:
+            if len(self.__cache) >= _FIXED_POINT_CACHE_SIZE:
+                self.__cache.clear()
+            units = self.__parse(value)
+            self.__cache[value] = units
+        return units
+
+    def to_decimal(self, units: int) -> Decimal:
+        return units * self.step
+
+    def __parse(self, value: str) -> int:
+        int_part, _, fraction = value.partition(".")
+        fraction = fraction.rstrip("0")
+        if len(fraction) <= self.__decimals and int_part.lstrip("-").isdigit():
+            scaled = int(int_part + fraction.ljust(self.__decimals, "0"))
+            if scaled % self.__step_units == 0:
+                return scaled // self.__step_units
+        # Exponent notation, or a value off the `step` grid
+        units, remainder = divmod(Decimal(value), self.step)
+        if remainder:
+            raise OffGridValueException(f"{value} is not a multiple of {self.step}")
+        return int(units)
+
+
+class FixedPointOrderbookDecoder(StreamRecordDecoder[Optional[OrderbookTicksRecord]]):
+    """
+    Decodes orderbooks stream messages to `OrderbookTicksRecord`, with the precision
+    of each market taken from its `TradingConfigModel`.
+
+    Updates of markets without a trading config are skipped: they're decoded with
+    `data` set to `None`, which `OrderBookManager` and `OrderBook.apply_stream_event`
+    ignore (still checking their `seq`). This lets a decoder with the configs of the
+    tracked markets only parse the all-markets stream.
+
+    A message with a price or quantity off the grid of its market raises
+    `OffGridValueException` when parsed, `OrderBook` and `OrderBookManager` then
+    resync.
+
+    A `TickOrderBook` applying these records has to be created with the same
+    trading config.
+    """
+
+    def __init__(self, trading_configs: Mapping[str, TradingConfigModel]):
+        super().__init__(self.decode_orderbook_update)
+        self.__scales: Dict[str, Tuple[FixedPointScale, FixedPointScale]] = {
+            market_name: (
+                FixedPointScale(trading_config.min_price_change),
+                FixedPointScale(trading_config.min_order_size_change),
+            )
+            for market_name, trading_config in trading_configs.items()
+        }
+
+    def decode_orderbook_update(self, data: dict) -> Optional[OrderbookTicksRecord]:
+        scales = self.__scales.get(data["m"])
+        if scales is None:
+            return None
+        to_ticks = scales[0].to_units
+        to_lots = scales[1].to_units
+        return OrderbookTicksRecord(
+            data["m"],
+            [(to_ticks(level["p"]), to_lots(level["q"])) for level in data["b"]],
+            [(to_ticks(level["p"]), to_lots(level["q"])) for level in data["a"]],
+        )
+
+    def to_model(self, record: OrderbookTicksRecord) -> OrderbookUpdateModel:
+        """
+        Converts a decoded update back to `Decimal` values.
+        """
+
+        price_scale, qty_scale = self.__scales[record.market]
+        return OrderbookUpdateModel(
+            market=record.market,
+            bid=[
+                {
+                    "price": price_scale.to_decimal(ticks),
+                    "qty": qty_scale.to_decimal(lots),
+                }
+                for ticks, lots in record.bid
+            ],
+            ask=[
+                {
+                    "price": price_scale.to_decimal(ticks),
+                    "qty": qty_scale.to_decimal(lots),
+                }
+                for ticks, lots in record.ask
+            ],
+        )
+
+
+ORDERBOOK_UPDATE_DECODER = StreamRecordDecoder(decode_orderbook_update)
+PUBLIC_TRADES_DECODER = StreamRecordDecoder(decode_public_trades)
+CANDLES_DECODER = StreamRecordDecoder(decode_candles)
+FUNDING_RATE_DECODER = StreamRecordDecoder(decode_funding_rate)
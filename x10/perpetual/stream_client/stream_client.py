@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Type
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 from x10.perpetual.accounts import AccountStreamDataModel
 from x10.perpetual.candles import CandleInterval, CandleModel, CandleType
@@ -6,10 +6,22 @@ from x10.perpetual.funding_rates import FundingRateModel
 from x10.perpetual.orderbooks import OrderbookUpdateModel
 from x10.perpetual.stream_client.perpetual_stream_connection import (
     PerpetualStreamConnection,
+    StreamMsgParser,
     StreamMsgResponseType,
 )
+from x10.perpetual.stream_client.reconnect import ReconnectPolicy
+from x10.perpetual.stream_client.records import (
+    CANDLES_DECODER,
+    FUNDING_RATE_DECODER,
+    ORDERBOOK_UPDATE_DECODER,
+    PUBLIC_TRADES_DECODER,
+)
+from x10.perpetual.stream_client.stream_queue import StreamQueueConfig
 from x10.perpetual.trades import PublicTradeModel
-from x10.utils.http import WrappedStreamResponse, get_url
+from x10.utils.http import LazyStreamResponseParser, WrappedStreamResponse, get_url
+
+if TYPE_CHECKING:
+    from x10.perpetual.stream_client.recording import StreamRecorder
 
 
 class PerpetualStreamClient:
@@ -18,38 +30,105 @@ class PerpetualStreamClient:
     """
 
     __api_url: str
+    __queue_config: Optional[StreamQueueConfig]
+    __reconnect_policy: Optional[ReconnectPolicy]
+    __bytes_payloads: bool
+    __recorder: Optional["StreamRecorder"]
+
+    def __init__(
+        self,
+        *,
+        api_url: str,
+        queue_config: Optional[StreamQueueConfig] = None,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
+        bytes_payloads: bool = False,
+        recorder: Optional["StreamRecorder"] = None,
+    ):
+        """
+        :param queue_config: bounds the queue of received messages of each stream.
+        :param reconnect_policy: makes the streams reconnect when disconnected, see
+        `PerpetualStreamConnection.on_reconnect` to resync on reconnection.
+        :param bytes_payloads: parse the frames as `bytes`, skipping their decoding.
+        :param recorder: records the traffic of the streams, a recorder should only
+        be used by one stream at a time.
+        """
 
-    def __init__(self, *, api_url: str):
         super().__init__()
 
         self.__api_url = api_url
+        self.__queue_config = queue_config
+        self.__reconnect_policy = reconnect_policy
+        self.__bytes_payloads = bytes_payloads
+        self.__recorder = recorder
 
-    def subscribe_to_orderbooks(self, market_name: Optional[str] = None):
+    def subscribe_to_orderbooks(
+        self,
+        market_name: Optional[str] = None,
+        records: bool = False,
+        decoder: Optional[StreamMsgParser] = None,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ):
         """
         https://api.docs.extended.exchange/#orderbooks-stream
+
+        :param records: receive `StreamRecord` named tuples instead of models,
+        see `x10.perpetual.stream_client.records`.
+        :param decoder: parses the messages instead, e.g. a
+        `FixedPointOrderbookDecoder`.
+        :param on_message: handles the messages as soon as they are received, see
+        `PerpetualStreamConnection`.
         """
 
         url = self.__get_url("/orderbooks/<market?>", market=market_name)
-        return self.__connect(url, WrappedStreamResponse[OrderbookUpdateModel])
+        if decoder:
+            return self.__connect(url, decoder, on_message=on_message)
+        if records:
+            return self.__connect(url, ORDERBOOK_UPDATE_DECODER, on_message=on_message)
+        return self.__connect(
+            url, WrappedStreamResponse[OrderbookUpdateModel], on_message=on_message
+        )
 
-    def subscribe_to_public_trades(self, market_name: Optional[str] = None):
+    def subscribe_to_public_trades(
+        self,
+        market_name: Optional[str] = None,
+        records: bool = False,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ):
         """
         https://api.docs.extended.exchange/#trades-stream
         """
 
         url = self.__get_url("/publicTrades/<market?>", market=market_name)
-        return self.__connect(url, WrappedStreamResponse[List[PublicTradeModel]])
+        if records:
+            return self.__connect(url, PUBLIC_TRADES_DECODER, on_message=on_message)
+        return self.__connect(
+            url, WrappedStreamResponse[List[PublicTradeModel]], on_message=on_message
+        )
 
-    def subscribe_to_funding_rates(self, market_name: Optional[str] = None):
+    def subscribe_to_funding_rates(
+        self,
+        market_name: Optional[str] = None,
+        records: bool = False,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ):
         """
         https://api.docs.extended.exchange/#funding-rates-stream
         """
 
         url = self.__get_url("/funding/<market?>", market=market_name)
-        return self.__connect(url, WrappedStreamResponse[FundingRateModel])
+        if records:
+            return self.__connect(url, FUNDING_RATE_DECODER, on_message=on_message)
+        return self.__connect(
+            url, WrappedStreamResponse[FundingRateModel], on_message=on_message
+        )
 
     def subscribe_to_candles(
-        self, market_name: str, candle_type: CandleType, interval: CandleInterval
+        self,
+        market_name: str,
+        candle_type: CandleType,
+        interval: CandleInterval,
+        records: bool = False,
+        on_message: Optional[Callable[[Any], None]] = None,
     ):
         """
         https://api.docs.extended.exchange/#candles-stream
@@ -63,16 +142,35 @@ class PerpetualStreamClient:
                 "interval": interval,
             },
         )
-        return self.__connect(url, WrappedStreamResponse[List[CandleModel]])
+        if records:
+            return self.__connect(url, CANDLES_DECODER, on_message=on_message)
+        return self.__connect(
+            url, WrappedStreamResponse[List[CandleModel]], on_message=on_message
+        )
 
-    def subscribe_to_account_updates(self, api_key: str):
+    def subscribe_to_account_updates(
+        self,
+        api_key: str,
+        lazy: bool = False,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ):
         """
         https://api.docs.extended.exchange/#account-updates-stream
+
+        :param lazy: receive `LazyStreamResponse` messages, whose data is only
+        validated when accessed (e.g. to only validate the orders of the updates).
         """
 
         url = self.__get_url("/account")
+        if lazy:
+            return self.__connect(
+                url,
+                LazyStreamResponseParser(AccountStreamDataModel),
+                api_key,
+                on_message,
+            )
         return self.__connect(
-            url, WrappedStreamResponse[AccountStreamDataModel], api_key
+            url, WrappedStreamResponse[AccountStreamDataModel], api_key, on_message
         )
 
     def __get_url(
@@ -84,10 +182,20 @@ class PerpetualStreamClient:
     ) -> str:
         return get_url(f"{self.__api_url}{path}", query=query, **path_params)
 
-    @staticmethod
     def __connect(
+        self,
         stream_url: str,
-        msg_model_class: Type[StreamMsgResponseType],
+        msg_model_class: StreamMsgParser[StreamMsgResponseType],
         api_key: Optional[str] = None,
+        on_message: Optional[Callable[[StreamMsgResponseType], None]] = None,
     ) -> PerpetualStreamConnection[StreamMsgResponseType]:
-        return PerpetualStreamConnection(stream_url, msg_model_class, api_key)
+        return PerpetualStreamConnection(
+            stream_url,
+            msg_model_class,
+            api_key,
+            self.__queue_config,
+            self.__reconnect_policy,
+            bytes_payloads=self.__bytes_payloads,
+            on_message=on_message,
+            recorder=self.__recorder,
+        )
@@ -0,0 +1,148 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Hashable, List, Optional
+
+from strenum import StrEnum
+
+from x10.errors import X10Error
+
+
+class OverflowPolicy(StrEnum):
+    # Drop the oldest queued message to make room for the new one
+    DROP_OLDEST = "DROP_OLDEST"
+    # Replace the queued message with the same key (see `conflation_key`), falls
+    # back to `DROP_OLDEST` when there is none
+    CONFLATE = "CONFLATE"
+    # Drop all queued messages and disconnect, the consumer then has to resync
+    DISCONNECT = "DISCONNECT"
+
+
+@dataclass(frozen=True)
+class StreamQueueConfig:
+    """
+    Bounds the queue of received messages of a stream, which is unbounded by
+    default: a consumer slower than the stream would make it grow without limit.
+
+    Conflating orderbook deltas creates sequence gaps, `OrderBook` detects them and
+    resyncs from a new snapshot.
+    """
+
+    max_size: int
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    # Computes the conflation key (e.g. the market) of a raw message, which is
+    # `bytes` if the stream is created with `bytes_payloads`
+    conflation_key: Optional[Callable[[str | bytes], Hashable]] = None
+
+    def __post_init__(self):
+        if self.max_size < 1:
+            raise ValueError("max_size must be positive")
+        if self.overflow_policy == OverflowPolicy.CONFLATE and not self.conflation_key:
+            raise ValueError("conflation_key is required to conflate messages")
+
+
+class StreamOverflowException(X10Error):
+    """
+    Raised by a stream disconnected because its queue overflowed (see
+    `OverflowPolicy.DISCONNECT`).
+    """
+
+
+class StreamMsgQueue:
+    """
+    Queue of the raw messages of a stream, `None` marking the end of the stream.
+    Unbounded unless a `StreamQueueConfig` is given.
+    """
+
+    def __init__(self, config: StreamQueueConfig | None = None):
+        self.__config = config
+        self.__items: Deque[str | bytes | None | List] = deque()
+        self.__not_empty = asyncio.Event()
+        # Queued entries by conflation key, entries are then `[key, payload]` lists
+        self.__entries_by_key: Optional[Dict[Hashable, List]] = (
+            {}
+            if config and config.overflow_policy == OverflowPolicy.CONFLATE
+            else None
+        )
+        self.__dropped_count = 0
+        self.__conflated_count = 0
+        self.__overflowed = False
+
+    @property
+    def dropped_count(self) -> int:
+        return self.__dropped_count
+
+    @property
+    def conflated_count(self) -> int:
+        return self.__conflated_count
+
+    @property
+    def overflowed(self) -> bool:
+        return self.__overflowed
+
+    def qsize(self) -> int:
+        return len(self.__items)
+
+    def empty(self) -> bool:
+        return not self.__items
+
+    def put_nowait(self, payload: str | bytes) -> bool:
+        """
+        Returns `False` if the stream has to be disconnected.
+        """
+
+        if self.__overflowed:
+            return False
+
+        config = self.__config
+        entries_by_key = self.__entries_by_key
+        item: str | bytes | List = payload
+        if entries_by_key is not None:
+            assert config and config.conflation_key
+            key = config.conflation_key(payload)
+            if len(self.__items) >= config.max_size:
+                entry = entries_by_key.get(key)
+                if entry is not None:
+                    entry[1] = payload
+                    self.__conflated_count += 1
+                    return True
+            item = [key, payload]
+            entries_by_key[key] = item
+
+        if config and len(self.__items) >= config.max_size:
+            if config.overflow_policy == OverflowPolicy.DISCONNECT:
+                self.__items.clear()
+                self.__dropped_count += config.max_size
+                self.__overflowed = True
+                return False
+            self.__drop_oldest()
+
+        self.__items.append(item)
+        self.__not_empty.set()
+        return True
+
+    def put_end(self):
+        self.__items.append(None)
+        self.__not_empty.set()
+
+    def get_nowait(self) -> str | bytes | None:
+        if not self.__items:
+            raise asyncio.QueueEmpty
+        item = self.__items.popleft()
+        if isinstance(item, list):
+            key, payload = item
+            assert self.__entries_by_key is not None
+            if self.__entries_by_key.get(key) is item:
+                del self.__entries_by_key[key]
+            return payload
+        return item
+
+    async def get(self) -> str | bytes | None:
+        while not self.__items:
+            self.__not_empty.clear()
+            await self.__not_empty.wait()
+        return self.get_nowait()
+
+    def __drop_oldest(self):
+        self.__dropped_count += 1
+        self.get_nowait()
@@ -0,0 +1,399 @@
+import decimal
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterator, Tuple
+
+import numpy as np
+
+from x10.perpetual.configuration import EndpointConfig
+from x10.perpetual.markets import TradingConfigModel
+from x10.perpetual.orderbook import ImpactDetails, OrderBook, OrderBookEntry
+from x10.perpetual.orderbooks import (
+    OffGridValueException,
+    OrderbookQuantityModel,
+    OrderbookUpdateModel,
+)
+from x10.perpetual.stream_client.perpetual_stream_connection import StreamMsgParser
+from x10.perpetual.stream_client.records import (
+    FixedPointOrderbookDecoder,
+    OrderbookTicksRecord,
+)
+from x10.perpetual.stream_client.stream_queue import StreamQueueConfig
+
+# Prices (and most sizes) repeat a lot around the top of the book, so converted
+# values are memoized: hashing a `Decimal` is much cheaper than dividing it.
+_CONVERSION_CACHE_SIZE = 65_536
+
+
+def _to_steps(value: decimal.Decimal, step: decimal.Decimal, name: str) -> int:
+    steps, remainder = divmod(value, step)
+    if remainder:
+        raise OffGridValueException(f"{name} {value} is not a multiple of {step}")
+    return int(steps)
+
+
+class _TickLevels:
+    """
+    One side of the book. Price ticks and quantity lots are kept in two parallel
+    integer arrays, sorted so that the best level is always the last element:
+    top-of-book reads are O(1) and most updates (close to the top) only shift a few
+    elements. Asks are stored with negated ticks to get that order.
+
+    `boundary` is the worst tracked key once the side has been trimmed to a max
+    depth, levels beyond it are unknown.
+    """
+
+    __slots__ = ("keys", "lots", "sign", "boundary")
+
+    def __init__(self, sign: int):
+        self.keys = array("q")
+        self.lots = array("q")
+        self.sign = sign
+        self.boundary: int | None = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def best(self) -> Tuple[int, int] | None:
+        if not self.keys:
+            return None
+        return self.keys[-1] * self.sign, self.lots[-1]
+
+    def levels(self) -> Iterator[Tuple[int, int]]:
+        """
+        Yields `(ticks, lots)` pairs from the best level to the worst one.
+        """
+
+        keys = self.keys
+        lots = self.lots
+        sign = self.sign
+        for i in range(len(keys) - 1, -1, -1):
+            yield keys[i] * sign, lots[i]
+
+    def set_levels(self, levels: list[Tuple[int, int]]):
+        sign = self.sign
+        levels.sort(key=lambda level: level[0] * sign)
+        self.keys = array("q", [ticks * sign for ticks, _ in levels])
+        self.lots = array("q", [lots for _, lots in levels])
+        self.boundary = None
+
+    def trim(self, max_depth: int | None):
+        excess = len(self.keys) - max_depth if max_depth is not None else 0
+        if excess > 0:
+            del self.keys[:excess]
+            del self.lots[:excess]
+            self.boundary = self.keys[0]
+
+
+class TickOrderBook(OrderBook):
+    """
+    Orderbook engine storing prices and quantities as integer ticks and lots
+    (multiples of `min_price_change` and `min_order_size_change`) in contiguous
+    arrays, instead of `Decimal` keys mapped to `OrderBookEntry` objects.
+
+    Exposes the same API as `OrderBook`, `Decimal` values are only created when
+    the book is queried. Updates can also be given as `OrderbookTicksRecord`, see
+    `fixed_point_decoding`.
+    """
+
+    @staticmethod
+    async def create(  # type: ignore[override]
+        endpoint_config: EndpointConfig,
+        market_name: str,
+        trading_config: TradingConfigModel,
+        best_ask_change_callback: Callable[[OrderBookEntry], None] | None = None,
+        best_bid_change_callback: Callable[[OrderBookEntry], None] | None = None,
+        start=False,
+        max_depth: int | None = None,
+        coalesce_callbacks=False,
+        min_callback_interval: float = 0,
+        stream_queue_config: StreamQueueConfig | None = None,
+        fixed_point_decoding=False,
+    ) -> "TickOrderBook":
+        ob = TickOrderBook(
+            endpoint_config,
+            market_name,
+            trading_config,
+            best_ask_change_callback,
+            best_bid_change_callback,
+            max_depth,
+            coalesce_callbacks,
+            min_callback_interval,
+            stream_queue_config,
+            fixed_point_decoding,
+        )
+        if start:
+            await ob.start_orderbook()
+        return ob
+
+    def __init__(
+        self,
+        endpoint_config: EndpointConfig,
+        market_name: str,
+        trading_config: TradingConfigModel,
+        best_ask_change_callback: Callable[[OrderBookEntry], None] | None = None,
+        best_bid_change_callback: Callable[[OrderBookEntry], None] | None = None,
+        max_depth: int | None = None,
+        coalesce_callbacks=False,
+        min_callback_interval: float = 0,
+        stream_queue_config: StreamQueueConfig | None = None,
+        fixed_point_decoding=False,
+    ) -> None:
+        """
+        :param fixed_point_decoding: decode the prices and quantities of the stream
+        straight to ticks and lots (see `FixedPointOrderbookDecoder`), instead of
+        `Decimal` values converted afterwards.
+        """
+
+        super().__init__(
+            endpoint_config,
+            market_name,
+            best_ask_change_callback,
+            best_bid_change_callback,
+            max_depth,
+            coalesce_callbacks,
+            min_callback_interval,
+            stream_queue_config,
+        )
+        self.__price_step = trading_config.min_price_change
+        self.__qty_step = trading_config.min_order_size_change
+        self.__ticks_cache: dict[decimal.Decimal, int] = {}
+        self.__lots_cache: dict[decimal.Decimal, int] = {}
+        self._bid_levels = _TickLevels(1)
+        self._ask_levels = _TickLevels(-1)
+        self.__stream_decoder = (
+            FixedPointOrderbookDecoder({market_name: trading_config})
+            if fixed_point_decoding
+            else None
+        )
+
+    def to_ticks(self, price: decimal.Decimal) -> int:
+        """
+        :raises OffGridValueException: the price isn't a multiple of the tick size.
+        """
+
+        ticks = self.__ticks_cache.get(price)
+        if ticks is None:
+            if len(self.__ticks_cache) >= _CONVERSION_CACHE_SIZE:
+                self.__ticks_cache.clear()
+            ticks = _to_steps(price, self.__price_step, "Price")
+            self.__ticks_cache[price] = ticks
+        return ticks
+
+    def to_lots(self, qty: decimal.Decimal) -> int:
+        """
+        :raises OffGridValueException: the quantity isn't a multiple of the lot size.
+        """
+
+        lots = self.__lots_cache.get(qty)
+        if lots is None:
+            if len(self.__lots_cache) >= _CONVERSION_CACHE_SIZE:
+                self.__lots_cache.clear()
+            lots = _to_steps(qty, self.__qty_step, "Quantity")
+            self.__lots_cache[qty] = lots
+        return lots
+
+    def __to_entry(self, level: Tuple[int, int] | None) -> OrderBookEntry | None:
+        if level is None:
+            return None
+        return OrderBookEntry(
+            price=level[0] * self.__price_step,
+            amount=level[1] * self.__qty_step,
+        )
+
+    def __to_tick_deltas(
+        self, deltas: list[OrderbookQuantityModel]
+    ) -> list[Tuple[int, int]]:
+        # This is the hot path of the book, hence the inlined cache lookups
+        # (see `to_ticks` and `to_lots`)
+        ticks_cache = self.__ticks_cache
+        lots_cache = self.__lots_cache
+        tick_deltas = []
+        for delta in deltas:
+            ticks = ticks_cache.get(delta.price)
+            if ticks is None:
+                ticks = self.to_ticks(delta.price)
+            lots_delta = lots_cache.get(delta.qty)
+            if lots_delta is None:
+                lots_delta = self.to_lots(delta.qty)
+            tick_deltas.append((ticks, lots_delta))
+        return tick_deltas
+
+    def __apply_deltas(
+        self, levels: _TickLevels, deltas: list[Tuple[int, int]]
+    ) -> bool:
+        keys = levels.keys
+        lots = levels.lots
+        sign = levels.sign
+        boundary = levels.boundary
+        best_before_update = (keys[-1], lots[-1]) if keys else None
+        for ticks, lots_delta in deltas:
+            key = ticks * sign
+            if boundary is not None and key < boundary:
+                continue
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                new_lots = lots[i] + lots_delta
+                if new_lots == 0:
+                    del keys[i]
+                    del lots[i]
+                else:
+                    lots[i] = new_lots
+            elif lots_delta != 0:
+                keys.insert(i, key)
+                lots.insert(i, lots_delta)
+        return self.__end_deltas(levels, best_before_update)
+
+    def __end_deltas(
+        self, levels: _TickLevels, best_before_update: Tuple[int, int] | None
+    ) -> bool:
+        if self.max_depth is not None and len(levels) > self.max_depth:
+            levels.trim(self.max_depth)
+        if not levels.keys:
+            return False
+        return (levels.keys[-1], levels.lots[-1]) != best_before_update
+
+    def _stream_decoder(self) -> StreamMsgParser | None:
+        return self.__stream_decoder
+
+    def update_orderbook(self, data: OrderbookUpdateModel | OrderbookTicksRecord):
+        """
+        :raises OffGridValueException: a price or quantity of the update is off the
+        grid of the market, the book is then left unchanged.
+        """
+
+        # Both sides are converted before any level changes, so that an update with
+        # an off-grid value is rejected as a whole
+        if isinstance(data, OrderbookTicksRecord):
+            bid_deltas, ask_deltas = data.bid, data.ask
+        else:
+            bid_deltas = self.__to_tick_deltas(data.bid)
+            ask_deltas = self.__to_tick_deltas(data.ask)
+
+        self._invalidate_depth(bids=bool(bid_deltas), asks=bool(ask_deltas))
+        if self.__apply_deltas(self._bid_levels, bid_deltas):
+            self._on_best_bid_change()
+
+        if self.__apply_deltas(self._ask_levels, ask_deltas):
+            self._on_best_ask_change()
+
+    def init_orderbook(self, data: OrderbookUpdateModel | OrderbookTicksRecord):
+        """
+        :raises OffGridValueException: a price or quantity of the snapshot is off the
+        grid of the market, the book is then left unchanged.
+        """
+
+        if isinstance(data, OrderbookTicksRecord):
+            bid_levels, ask_levels = list(data.bid), list(data.ask)
+        else:
+            bid_levels = [(self.to_ticks(bid.price), self.to_lots(bid.qty)) for bid in data.bid]
+            ask_levels = [(self.to_ticks(ask.price), self.to_lots(ask.qty)) for ask in data.ask]
+
+        self._invalidate_depth(bids=True, asks=True)
+        self._bid_levels.set_levels(bid_levels)
+        self._ask_levels.set_levels(ask_levels)
+        self._bid_levels.trim(self.max_depth)
+        self._ask_levels.trim(self.max_depth)
+
+    def best_bid(self) -> OrderBookEntry | None:
+        return self.__to_entry(self._bid_levels.best())
+
+    def best_ask(self) -> OrderBookEntry | None:
+        return self.__to_entry(self._ask_levels.best())
+
+    def _depth_levels(self, bids: bool) -> Tuple[np.ndarray, np.ndarray]:
+        levels = self._bid_levels if bids else self._ask_levels
+        # Copies, `frombuffer` views would prevent the arrays from being resized
+        ticks = np.array(levels.keys, dtype=np.int64)[::-1] * levels.sign
+        lots = np.array(levels.lots, dtype=np.int64)[::-1]
+        return (
+            ticks * float(self.__price_step),
+            lots * float(self.__qty_step),
+        )
+
+    def is_truncated(self, side: str) -> bool:
+        levels = self.__get_levels(side)
+        return levels is not None and levels.boundary is not None
+
+    def __get_levels(self, side: str) -> _TickLevels | None:
+        if side == "SELL":
+            return self._bid_levels
+        elif side == "BUY":
+            return self._ask_levels
+        return None
+
+    def __price_impact_notional(
+        self, notional: decimal.Decimal, levels: _TickLevels
+    ) -> ImpactDetails | None:
+        # Notional is expressed in `ticks * lots` units, so that full levels are
+        # consumed with integer arithmetic only
+        remaining_to_spend = notional / (self.__price_step * self.__qty_step)
+        total_lots: int | decimal.Decimal = 0
+        weighted_sum: int | decimal.Decimal = 0
+        for ticks, lots in levels.levels():
+            level_value = ticks * lots
+            if remaining_to_spend >= level_value:
+                remaining_to_spend -= level_value
+                weighted_sum += level_value
+                total_lots += lots
+            else:
+                total_lots += remaining_to_spend / ticks
+                weighted_sum += remaining_to_spend
+                remaining_to_spend = decimal.Decimal(0)
+            if remaining_to_spend <= 0:
+                break
+
+        if remaining_to_spend > 0:
+            return None
+        average_ticks = decimal.Decimal(weighted_sum) / total_lots
+        return ImpactDetails(
+            price=average_ticks * self.__price_step,
+            amount=total_lots * self.__qty_step,
+        )
+
+    def __price_impact_qty(
+        self, qty: decimal.Decimal, levels: _TickLevels
+    ) -> ImpactDetails | None:
+        qty_lots = qty / self.__qty_step
+        remaining_lots: int | decimal.Decimal = (
+            int(qty_lots) if qty_lots == qty_lots.to_integral_value() else qty_lots
+        )
+        total_lots: int | decimal.Decimal = 0
+        total_spent: int | decimal.Decimal = 0
+        for ticks, lots in levels.levels():
+            take = min(remaining_lots, lots)
+            total_spent += take * ticks
+            total_lots += take
+            remaining_lots -= take
+            if remaining_lots <= 0:
+                break
+
+        if remaining_lots > 0:
+            return None
+        average_ticks = decimal.Decimal(total_spent) / total_lots
+        return ImpactDetails(
+            price=average_ticks * self.__price_step,
+            amount=total_lots * self.__qty_step,
+        )
+
+    def calculate_price_impact_notional(
+        self, notional: decimal.Decimal, side: str
+    ) -> ImpactDetails | None:
+        if notional <= 0:
+            return None
+        levels = self.__get_levels(side)
+        if levels is None:
+            return None
+        impact = self.__price_impact_notional(notional, levels) if levels else None
+        return self._check_tracked_depth(impact, side)
+
+    def calculate_price_impact_qty(
+        self, qty: decimal.Decimal, side: str
+    ) -> ImpactDetails | None:
+        if qty <= 0:
+            return None
+        levels = self.__get_levels(side)
+        if levels is None:
+            return None
+        impact = self.__price_impact_qty(qty, levels) if levels else None
+        return self._check_tracked_depth(impact, side)
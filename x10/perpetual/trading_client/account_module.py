@@ -143,16 +143,16 @@ class AccountModule(BaseModule):
 
         url = self._get_url("/user/orders/<order_id>", order_id=order_id)
 
-        return await send_get_request(await self.get_session(), url, OpenOrderModel, api_key=self._get_api_key())
+        return await send_get_request(await self.get_client(), url, OpenOrderModel, api_key=self._get_api_key())
 
-    async def get_order_by_external_id(self, external_id: str) -> WrappedApiResponse[list[OpenOrderModel]]:
+    async def get_order_by_external_id(self, external_id: str) -> WrappedApiResponse[List[OpenOrderModel]]:
         """
         https://api.docs.extended.exchange/#get-order-by-external-id
         """
 
         url = self._get_url("/user/orders/external/<external_id>", external_id=external_id)
 
-        return await send_get_request(await self.get_session(), url, list[OpenOrderModel], api_key=self._get_api_key())
+        return await send_get_request(await self.get_client(), url, List[OpenOrderModel], api_key=self._get_api_key())
 
     async def get_trades(
         self,
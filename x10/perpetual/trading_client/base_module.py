@@ -4,8 +4,7 @@ from aiosonic import HTTPClient
 from x10.errors import X10Error
 from x10.perpetual.accounts import StarkPerpetualAccount
 from x10.perpetual.configuration import EndpointConfig
-from x10.utils.http import CLIENT_TIMEOUT, get_url
-from aiosonic.timeout import Timeouts
+from x10.utils.http import create_http_client, get_url
 
 
 class BaseModule:
@@ -13,6 +12,7 @@ class BaseModule:
     __api_key: Optional[str]
     __stark_account: Optional[StarkPerpetualAccount]
     __client: Optional[HTTPClient]
+    __owns_client: bool
 
     def __init__(
         self,
@@ -20,12 +20,14 @@ class BaseModule:
         *,
         api_key: Optional[str] = None,
         stark_account: Optional[StarkPerpetualAccount] = None,
+        client: Optional[HTTPClient] = None,
     ):
         super().__init__()
         self.__endpoint_config = endpoint_config
         self.__api_key = api_key
         self.__stark_account = stark_account
-        self.__client = None
+        self.__client = client
+        self.__owns_client = client is None
 
     def _get_url(
         self, path: str, *, query: Optional[Dict] = None, **path_params
@@ -51,7 +53,17 @@ class BaseModule:
 
     async def get_client(self) -> HTTPClient:
         if self.__client is None:
-            created_client = HTTPClient()
+            created_client = create_http_client()
             self.__client = created_client
 
         return self.__client
+
+    async def close_session(self):
+        """
+        Closes the HTTP client connections if the client was created by this module.
+        A client passed to the constructor is owned (and closed) by the caller.
+        """
+
+        if self.__client and self.__owns_client:
+            await self.__client.connector.cleanup()
+            self.__client = None
@@ -1,13 +1,22 @@
-from typing import List, Optional
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
 
 from x10.perpetual.orders import PerpetualOrderModel, PlacedOrderModel
 from x10.perpetual.trading_client.base_module import BaseModule
-from x10.utils.http import send_delete_request, send_post_request
+from x10.utils.http import (
+    WrappedApiResponse,
+    send_delete_request,
+    send_post_request,
+)
 from x10.utils.log import get_logger
 from x10.utils.model import EmptyModel, X10BaseModel
 
 LOGGER = get_logger(__name__)
 
+DEFAULT_PLACE_ORDERS_CONCURRENCY = 10
+
 
 class _MassCancelRequestModel(X10BaseModel):
     order_ids: Optional[List[int]]
@@ -16,6 +25,41 @@ class _MassCancelRequestModel(X10BaseModel):
     cancel_all: Optional[bool]
 
 
+@dataclass(frozen=True)
+class PlaceOrderResult:
+    order: PerpetualOrderModel
+    response: Optional[WrappedApiResponse[PlacedOrderModel]]
+    error: Optional[Exception]
+    # Seconds from sending the request to its response, waiting for a free slot
+    # excluded
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class PlaceOrdersResult:
+    results: List[PlaceOrderResult]
+    # Seconds to place the whole batch
+    elapsed: float
+
+    @property
+    def errors_count(self) -> int:
+        return sum(1 for result in self.results if not result.ok)
+
+    @property
+    def max_elapsed(self) -> float:
+        return max((result.elapsed for result in self.results), default=0.0)
+
+    @property
+    def mean_elapsed(self) -> float:
+        if not self.results:
+            return 0.0
+        return sum(result.elapsed for result in self.results) / len(self.results)
+
+
 class OrderManagementModule(BaseModule):
     async def place_order(self, order: PerpetualOrderModel):
         """
@@ -37,6 +81,42 @@ class OrderManagementModule(BaseModule):
         )
         return response
 
+    async def place_orders(
+        self,
+        orders: Sequence[PerpetualOrderModel],
+        max_concurrency: int = DEFAULT_PLACE_ORDERS_CONCURRENCY,
+    ) -> PlaceOrdersResult:
+        """
+        Places orders concurrently, with at most `max_concurrency` requests in flight.
+        The API has no bulk order creation endpoint, so there is one request per
+        order. A failed order doesn't fail the batch: the results (responses or
+        errors) are returned in the orders order.
+
+        :param orders: Order objects created by `create_order_object` or
+        `create_order_objects` methods.
+
+        https://api.docs.extended.exchange/#create-order
+        """
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def place(order: PerpetualOrderModel) -> PlaceOrderResult:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await self.place_order(order)
+                except Exception as e:
+                    LOGGER.warning("Failed to place an order: id=%s, error=%s", order.id, e)
+                    return PlaceOrderResult(order, None, e, time.perf_counter() - start)
+                return PlaceOrderResult(order, response, None, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(place(order) for order in orders))
+        return PlaceOrdersResult(list(results), time.perf_counter() - start)
+
     async def cancel_order(self, order_id: int):
         """
         https://api.docs.extended.exchange/#cancel-order
@@ -1,28 +1,67 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-from x10.perpetual.accounts import StarkPerpetualAccount
+from aiosonic import HTTPClient
+
+from x10.perpetual.accounts import AccountLeverage, StarkPerpetualAccount
+from x10.perpetual.assets import AssetOperationModel
+from x10.perpetual.balances import BalanceModel
+from x10.perpetual.candles import CandleModel
 from x10.perpetual.configuration import EndpointConfig
-from x10.perpetual.markets import MarketModel
-from x10.perpetual.order_object import create_order_object
+from x10.perpetual.fees import TradingFeeModel
+from x10.perpetual.funding_rates import FundingRateModel
+from x10.perpetual.markets import MarketModel, MarketStatsModel
+from x10.perpetual.order_object import OrderSigningContext, OrderSigningContexts
+from x10.perpetual.orderbooks import OrderbookUpdateModel
 from x10.perpetual.orders import (
+    OpenOrderModel,
     OrderSide,
     PlacedOrderModel,
     SelfTradeProtectionLevel,
     TimeInForce,
 )
+from x10.perpetual.positions import PositionHistoryModel, PositionModel
+from x10.perpetual.trades import AccountTradeModel
 from x10.perpetual.trading_client.account_module import AccountModule
-from x10.perpetual.trading_client.info_module import InfoModule
+from x10.perpetual.trading_client.info_module import InfoModule, _SettingsModel
 from x10.perpetual.trading_client.markets_information_module import (
     MarketsInformationModule,
 )
 from x10.perpetual.trading_client.order_management_module import OrderManagementModule
-from x10.utils.http import WrappedApiResponse
+from x10.utils.http import (
+    HttpPoolConfig,
+    WrappedApiResponse,
+    create_http_client,
+    warm_up_http_client,
+    warm_up_response_validators,
+)
 from x10.utils.log import get_logger
+from x10.utils.model import EmptyModel
 
 LOGGER = get_logger(__name__)
 
+RESPONSE_MODEL_CLASSES = (
+    int,
+    EmptyModel,
+    _SettingsModel,
+    BalanceModel,
+    MarketStatsModel,
+    OpenOrderModel,
+    OrderbookUpdateModel,
+    PlacedOrderModel,
+    List[AccountLeverage],
+    List[AccountTradeModel],
+    List[AssetOperationModel],
+    List[CandleModel],
+    List[FundingRateModel],
+    List[MarketModel],
+    List[OpenOrderModel],
+    List[PositionHistoryModel],
+    List[PositionModel],
+    List[TradingFeeModel],
+)
+
 
 class PerpetualTradingClient:
     """
@@ -31,11 +70,14 @@ class PerpetualTradingClient:
 
     __markets: Dict[str, MarketModel] | None
     __stark_account: StarkPerpetualAccount
+    __http_pool_config: HttpPoolConfig
+    __http_client: HTTPClient
 
     __info_module: InfoModule
     __markets_info_module: MarketsInformationModule
     __account_module: AccountModule
     __order_management_module: OrderManagementModule
+    __signing_contexts: OrderSigningContexts
 
     async def place_order(
         self,
@@ -52,24 +94,11 @@ class PerpetualTradingClient:
         builder_fee: Optional[Decimal] = None,
         builder_id: Optional[int] = None,
     ) -> WrappedApiResponse[PlacedOrderModel]:
-        if not self.__stark_account:
-            raise ValueError("Stark account is not set")
-
-        if not self.__markets:
-            markets = await self.__markets_info_module.get_markets()
-            self.__markets = {m.name: m for m in markets.data}
-
-        market = self.__markets.get(market_name)
-        if not market:
-            raise ValueError(f"Market {market_name} not found")
-
-        order = create_order_object(
-            account=self.__stark_account,
-            market=market,
+        signing_context = await self.get_signing_context(market_name)
+        order = signing_context.build_order(
             amount_of_synthetic=amount_of_synthetic,
             price=price,
             side=side,
-            starknet_domain=self.__endpoint_config.starknet_domain,
             post_only=post_only,
             previous_order_external_id=previous_order_id,
             expire_time=expire_time,
@@ -82,33 +111,80 @@ class PerpetualTradingClient:
 
         return await self.__order_management_module.place_order(order)
 
+    async def get_signing_context(self, market_name: str) -> OrderSigningContext:
+        """
+        Signing context of the account for a market, to build orders without the
+        client (e.g. with `PresignedOrderPool`).
+        """
+
+        if not self.__stark_account:
+            raise ValueError("Stark account is not set")
+
+        if not self.__markets:
+            markets = await self.__markets_info_module.get_markets()
+            self.__markets = {m.name: m for m in markets.data}
+
+        market = self.__markets.get(market_name)
+        if not market:
+            raise ValueError(f"Market {market_name} not found")
+
+        return self.__signing_contexts.get(market)
+
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        Opens pooled connections to the API ahead of time, so that placing an order
+        does not pay for a TCP/TLS handshake. Also prebuilds the response validators.
+
+        :param connections: Number of connections to open, defaults to
+            `HttpPoolConfig.warm_connections` (capped at the pool size).
+        """
+
+        warm_up_response_validators(RESPONSE_MODEL_CLASSES)
+
+        if connections is None:
+            connections = self.__http_pool_config.warm_connections
+        connections = min(connections, self.__http_pool_config.size)
+
+        return await warm_up_http_client(
+            self.__http_client,
+            f"{self.__endpoint_config.api_base_url}/info/settings",
+            connections,
+        )
+
     async def close(self):
-        await self.__markets_info_module.close_session()
-        await self.__account_module.close_session()
-        await self.__order_management_module.close_session()
+        await self.__http_client.connector.cleanup()
 
     def __init__(
         self,
         endpoint_config: EndpointConfig,
         stark_account: StarkPerpetualAccount | None = None,
+        http_pool_config: HttpPoolConfig | None = None,
     ):
         api_key = stark_account.api_key if stark_account else None
 
         self.__markets = None
         self.__endpoint_config = endpoint_config
+        self.__http_pool_config = http_pool_config or HttpPoolConfig()
+        self.__http_client = create_http_client(self.__http_pool_config)
 
         if stark_account:
             self.__stark_account = stark_account
+            self.__signing_contexts = OrderSigningContexts(
+                stark_account, endpoint_config.starknet_domain
+            )
 
-        self.__info_module = InfoModule(endpoint_config)
+        self.__info_module = InfoModule(endpoint_config, client=self.__http_client)
         self.__markets_info_module = MarketsInformationModule(
-            endpoint_config, api_key=api_key
+            endpoint_config, api_key=api_key, client=self.__http_client
         )
         self.__account_module = AccountModule(
-            endpoint_config, api_key=api_key, stark_account=stark_account
+            endpoint_config,
+            api_key=api_key,
+            stark_account=stark_account,
+            client=self.__http_client,
         )
         self.__order_management_module = OrderManagementModule(
-            endpoint_config, api_key=api_key
+            endpoint_config, api_key=api_key, client=self.__http_client
         )
 
     @property
@@ -9,5 +9,5 @@ def utc_now():
 def to_epoch_millis(value: datetime):
     assert value.tzinfo == timezone.utc, "`value` must be in UTC"
 
-    # Use ceiling to match the hash_order logic which uses math.ceil
+    # Use ceiling to match the order hash expiration, which uses math.ceil
     return int(math.ceil(value.timestamp() * 1000))
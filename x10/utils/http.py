@@ -1,11 +1,26 @@
+import asyncio
 import itertools
 import re
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
-from aiosonic import HttpResponse, timeout, HTTPClient
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from aiosonic import HttpResponse, timeout, HTTPClient, TCPConnector
+from aiosonic.pools import PoolConfig
 from aiosonic.timeout import Timeouts
 
-from pydantic import GetCoreSchemaHandler
+from pydantic import AliasChoices, GetCoreSchemaHandler, TypeAdapter
 from pydantic_core import CoreSchema, core_schema
 
 from x10.config import DEFAULT_REQUEST_TIMEOUT_SECONDS, USER_AGENT
@@ -29,6 +44,28 @@ class NotAuthorizedException(X10Error):
     pass
 
 
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    """
+    Connection pool settings for the HTTP client shared by the trading client modules.
+
+    :param size: Maximum number of connections kept open to the API host.
+    :param max_conn_idle_ms: Connections idle for longer than this are closed and
+        re-opened on next use. `None` keeps idle connections forever.
+    :param max_conn_requests: Connections are recycled after serving this many
+        requests.
+    :param warm_connections: Number of connections opened by `warm_up_http_client`.
+    """
+
+    size: int = 30
+    max_conn_idle_ms: Optional[int] = 60_000
+    max_conn_requests: int = 1000
+    warm_connections: int = 0
+
+
+DEFAULT_HTTP_POOL_CONFIG = HttpPoolConfig()
+
+
 class RequestHeader(Enum):
     ACCEPT = "Accept"
     API_KEY = "X-Api-Key"
@@ -77,8 +114,10 @@ class StreamDataType(Enum):
     def __get_pydantic_core_schema__(
         cls, _source_type: Any, _handler: GetCoreSchemaHandler
     ) -> CoreSchema:
+        # Known types are kept as their value (e.g. `"SNAPSHOT"`), a member given
+        # when building a message is converted the same way
         return core_schema.no_info_plain_validator_function(
-            lambda v: v if v in cls._value2member_map_ else cls.UNKNOWN
+            lambda v: v.value if isinstance(v, cls) else v if v in cls._value2member_map_ else cls.UNKNOWN
         )
 
 
@@ -90,12 +129,204 @@ class WrappedStreamResponse(X10BaseModel, Generic[ApiResponseType]):
     seq: int
 
 
+class _RawStreamResponse(X10BaseModel):
+    type: Optional[StreamDataType] = None
+    data: Any = None
+    error: Optional[str] = None
+    ts: int
+    seq: int
+
+
+_STREAM_DATA_VALIDATORS: Dict[Any, TypeAdapter] = {}
+
+
+def _get_stream_data_validator(key: Any, annotation: Any) -> TypeAdapter:
+    validator = _STREAM_DATA_VALIDATORS.get(key)
+    if validator is None:
+        validator = TypeAdapter(Optional[annotation])
+        _STREAM_DATA_VALIDATORS[key] = validator
+    return validator
+
+
+class LazyStreamResponse(Generic[ApiResponseType]):
+    """
+    Stream message whose envelope (`type`, `error`, `ts` and `seq`) is parsed right
+    away, while `data` is kept as decoded JSON and only validated when accessed:
+    messages can be filtered without paying for the validation of their data.
+    """
+
+    __slots__ = ("type", "error", "ts", "seq", "raw_data", "__data_class", "__data")
+
+    type: Optional[StreamDataType]
+    error: Optional[str]
+    ts: int
+    seq: int
+    raw_data: Any
+
+    def __init__(self, data_class: Type[ApiResponseType], raw: _RawStreamResponse):
+        self.type = raw.type
+        self.error = raw.error
+        self.ts = raw.ts
+        self.seq = raw.seq
+        self.raw_data = raw.data
+        self.__data_class = data_class
+        self.__data: Optional[ApiResponseType] = None
+
+    @property
+    def data(self) -> Optional[ApiResponseType]:
+        if self.__data is None and self.raw_data is not None:
+            validator = _get_stream_data_validator(
+                self.__data_class, self.__data_class
+            )
+            self.__data = validator.validate_python(self.raw_data)
+        return self.__data
+
+    def get_data_field(self, name: str) -> Any:
+        """
+        Validates a single field of `data` (e.g. `orders` of `AccountStreamDataModel`),
+        without validating the others.
+        """
+
+        if self.__data is not None:
+            return getattr(self.__data, name)
+        if not isinstance(self.raw_data, dict):
+            return None
+
+        keys, validator, default = _get_stream_data_field(self.__data_class, name)
+        for key in keys:
+            if key in self.raw_data:
+                return validator.validate_python(self.raw_data[key])
+        return default
+
+
+_STREAM_DATA_FIELDS: Dict[Any, Tuple[List[str], TypeAdapter, Any]] = {}
+
+
+class LazyStreamResponseParser(Generic[ApiResponseType]):
+    """
+    Can be used in place of `WrappedStreamResponse[T]` to parse the stream messages
+    as `LazyStreamResponse[T]`.
+    """
+
+    def __init__(self, data_class: Type[ApiResponseType]):
+        self.data_class = data_class
+
+    def model_validate_json(
+        self, payload: str | bytes
+    ) -> LazyStreamResponse[ApiResponseType]:
+        return LazyStreamResponse(
+            self.data_class, _RawStreamResponse.model_validate_json(payload)
+        )
+
+
+def _get_stream_data_field(
+    data_class: Any, name: str
+) -> Tuple[List[str], TypeAdapter, Any]:
+    """
+    Returns the JSON keys, the validator and the default value of a data field.
+    """
+
+    stream_data_field = _STREAM_DATA_FIELDS.get((data_class, name))
+    if stream_data_field is None:
+        field = data_class.model_fields[name]
+        alias = field.validation_alias
+        if isinstance(alias, AliasChoices):
+            keys = [choice for choice in alias.choices if isinstance(choice, str)]
+        else:
+            keys = [alias if isinstance(alias, str) else name]
+        stream_data_field = (
+            keys,
+            _get_stream_data_validator((data_class, name), field.annotation),
+            field.get_default(),
+        )
+        _STREAM_DATA_FIELDS[(data_class, name)] = stream_data_field
+    return stream_data_field
+
+
+_RESPONSE_VALIDATORS: Dict[Any, TypeAdapter] = {}
+
+
+def get_response_validator(
+    model_class: Type[ApiResponseType],
+) -> TypeAdapter[WrappedApiResponse[ApiResponseType]]:
+    """
+    Returns the validator for `WrappedApiResponse[model_class]`, building it on first use.
+    Parametrizing the generic model is costly, so it's done once per response type.
+    """
+
+    validator = _RESPONSE_VALIDATORS.get(model_class)
+    if validator is None:
+        # Read this to get more context re the type ignore:
+        # https://github.com/python/mypy/issues/13619
+        validator = TypeAdapter(WrappedApiResponse[model_class])  # type: ignore[valid-type]
+        _RESPONSE_VALIDATORS[model_class] = validator
+    return validator
+
+
+def warm_up_response_validators(model_classes: Iterable[Any]):
+    """
+    Prebuilds the response validators, so that the first request of each type
+    doesn't pay for the validator creation.
+    """
+
+    for model_class in model_classes:
+        get_response_validator(model_class)
+
+
 def parse_response_to_model(
-    response_text: str, model_class: Type[ApiResponseType]
+    response_text: str | bytes, model_class: Type[ApiResponseType]
 ) -> WrappedApiResponse[ApiResponseType]:
-    # Read this to get more context re the type ignore:
-    # https://github.com/python/mypy/issues/13619
-    return WrappedApiResponse[model_class].model_validate_json(response_text)  # type: ignore[valid-type]
+    return get_response_validator(model_class).validate_json(response_text)
+
+
+def create_http_client(pool_config: Optional[HttpPoolConfig] = None) -> HTTPClient:
+    pool_config = pool_config or DEFAULT_HTTP_POOL_CONFIG
+    connector = TCPConnector(
+        pool_configs={
+            ":default": PoolConfig(
+                size=pool_config.size,
+                max_conn_requests=pool_config.max_conn_requests,
+                max_conn_idle_ms=pool_config.max_conn_idle_ms,
+            )
+        },
+        timeouts=CLIENT_TIMEOUT,
+    )
+    return HTTPClient(connector=connector)
+
+
+async def warm_up_http_client(client: HTTPClient, url: str, connections: int) -> int:
+    """
+    Opens up to `connections` pooled connections by sending concurrent GET requests
+    to `url`, so that the first requests on the hot path reuse an established
+    (TLS) connection.
+
+    Returns the number of requests that completed.
+    """
+
+    if connections <= 0:
+        return 0
+
+    headers = __get_headers()
+    LOGGER.debug("Warming up %s connections to %s", connections, url)
+
+    async def open_connection():
+        response = await client.get(url, headers=headers)
+        # Reading the body releases the connection back to the pool
+        await response.text()
+
+    results = await asyncio.gather(
+        *[open_connection() for _ in range(connections)], return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        LOGGER.warning(
+            "Failed to warm up %s of %s connections to %s: %s",
+            len(errors),
+            connections,
+            url,
+            errors[0],
+        )
+    return connections - len(errors)
 
 
 def get_url(
@@ -262,4 +493,4 @@ def __get_headers(
     if request_headers:
         headers.update(request_headers)
 
-    return headers
\ No newline at end of file
+    return headers